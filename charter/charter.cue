@@ -82,6 +82,11 @@ import (
 //   // gaps.next_gate         — nearest unsatisfied gate (by phase)
 // #GapAnalysis accepts any graph with resources + roots + topology.
 // Works with both #Graph (small) and #GraphLite (large, precomputed).
+//
+// Large charters: `toposort.py --charter charter.json --cue` emits
+// _precomputed_gaps (missing resources/types, root check, gate status,
+// next gate). Pass it as Precomputed to skip those comprehensions:
+//   gaps: #GapAnalysis & {Charter: c, Graph: g, Precomputed: _precomputed_gaps}
 #GapAnalysis: {
 	Charter: #Charter
 	Graph: {
@@ -91,6 +96,20 @@ import (
 		...
 	}
 
+	// Optional: results from toposort.py --charter
+	Precomputed?: {
+		missing_resources: {[string]: true}
+		missing_types: {[string]: true}
+		root_satisfied: bool
+		gate_status: [string]: {
+			missing: {[string]: true}
+			satisfied: bool
+			ready:     bool
+		}
+		next_gate: string
+	}
+	_usePre: Precomputed != _|_
+
 	// ── Present state ────────────────────────────────────────────
 	_present: {for name, _ in Graph.resources {(name): true}}
 	_types_present: {
@@ -103,7 +122,8 @@ import (
 
 	// ── Missing resources ────────────────────────────────────────
 	missing_resources: {
-		if Charter.scope.required_resources != _|_ {
+		if _usePre {Precomputed.missing_resources}
+		if !_usePre && Charter.scope.required_resources != _|_ {
 			for name, _ in Charter.scope.required_resources
 			if _present[name] == _|_ {(name): true}
 		}
@@ -112,7 +132,8 @@ import (
 
 	// ── Missing types ────────────────────────────────────────────
 	missing_types: {
-		if Charter.scope.required_types != _|_ {
+		if _usePre {Precomputed.missing_types}
+		if !_usePre && Charter.scope.required_types != _|_ {
 			for t, _ in Charter.scope.required_types
 			if _types_present[t] == _|_ {(t): true}
 		}
@@ -121,17 +142,20 @@ import (
 
 	// ── Root check ───────────────────────────────────────────────
 	_root_satisfied: bool
-	if Charter.scope.root == _|_ {
+	if _usePre {
+		_root_satisfied: Precomputed.root_satisfied
+	}
+	if !_usePre && Charter.scope.root == _|_ {
 		_root_satisfied: true
 	}
 
 	// String root: must exist and be a graph root
-	if (Charter.scope.root & string) != _|_ {
+	if !_usePre && (Charter.scope.root & string) != _|_ {
 		_root_satisfied: Graph.roots[Charter.scope.root] != _|_
 	}
 
 	// Struct root: all named roots must be graph roots
-	if (Charter.scope.root & {[string]: true}) != _|_ {
+	if !_usePre && (Charter.scope.root & {[string]: true}) != _|_ {
 		let _root_struct = Charter.scope.root & {[string]: true}
 		_root_satisfied: len([
 			for name, _ in _root_struct
@@ -162,7 +186,8 @@ import (
 
 	// ── Gate status ──────────────────────────────────────────────
 	gate_status: {
-		if Charter.gates != _|_ {
+		if _usePre {Precomputed.gate_status}
+		if !_usePre && Charter.gates != _|_ {
 			for gname, gate in Charter.gates {
 				(gname): {
 					_missing: {
@@ -192,7 +217,7 @@ import (
 		if !gs.satisfied {(gname): gs.missing}
 	}
 
-	// ── Next gate (lowest phase among unsatisfied) ───────────────
+	// ── Next gate (lowest phase among unsatisfied, then name) ────
 	_unsatisfied_with_phase: [
 		for gname, gs in gate_status
 		if !gs.satisfied && Charter.gates[gname].phase != _|_ {
@@ -200,9 +225,17 @@ import (
 			phase: Charter.gates[gname].phase
 		},
 	]
-	_sorted_unsatisfied: list.Sort(_unsatisfied_with_phase, {x: {}, y: {}, less: x.phase < y.phase})
+	// list.Sort is not stable: break phase ties by gate name
+	_sorted_unsatisfied: list.Sort(_unsatisfied_with_phase, {
+		x:    {}
+		y:    {}
+		less: x.phase < y.phase || (x.phase == y.phase && x.name < y.name)
+	})
 	next_gate: *"" | string
-	if len(_sorted_unsatisfied) > 0 {
+	if _usePre {
+		next_gate: Precomputed.next_gate
+	}
+	if !_usePre && len(_sorted_unsatisfied) > 0 {
 		next_gate: _sorted_unsatisfied[0].name
 	}
 
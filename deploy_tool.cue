@@ -1,6 +1,7 @@
 package apercue
 
 import (
+	"list"
 	"tool/cli"
 	"tool/exec"
 	"tool/file"
@@ -12,8 +13,7 @@ import (
 // Validated at `cue vet` time.
 
 _deploy_spec: tools.#DeploySpec & {
-	toposort_source:    "./self-charter/charter.cue"
-	precomputed_output: "self-charter/precomputed.cue"
+	toposort_sources: ["./self-charter/"]
 	vet_packages: ["./self-charter/"]
 	build_command: "build"
 	serve_port:    *"8384" | string @tag(port)
@@ -24,18 +24,29 @@ _deploy_spec: tools.#DeploySpec & {
 command: deploy: {
 	$short: "Precompute topology, validate, and build all site data"
 
-	toposort: exec.Run & {
-		cmd: ["python3", "tools/toposort.py", _deploy_spec.toposort_source, "--cue"]
-		stdout: string
+	// One process precomputes every graph package and writes each
+	// precomputed.cue in place.
+	if _deploy_spec.precomputed_output == _|_ {
+		toposort: exec.Run & {
+			cmd: list.Concat([["python3", "tools/toposort.py", "--discover"], _deploy_spec.toposort_sources])
+		}
 	}
-	write_precomputed: file.Create & {
-		filename: _deploy_spec.precomputed_output
-		contents: toposort.stdout
+
+	// v0.9 form: one source, output written to precomputed_output.
+	if _deploy_spec.precomputed_output != _|_ {
+		toposort_single: exec.Run & {
+			cmd: ["python3", "tools/toposort.py", _deploy_spec.toposort_source, "--cue"]
+			stdout: string
+		}
+		toposort: file.Create & {
+			filename: _deploy_spec.precomputed_output
+			contents: toposort_single.stdout
+		}
 	}
 
 	vet: exec.Run & {
-		cmd: ["cue", "vet", _deploy_spec.vet_packages[0]]
-		$after: write_precomputed
+		cmd: list.Concat([["cue", "vet"], _deploy_spec.vet_packages])
+		$after: toposort
 	}
 
 	build_all: exec.Run & {
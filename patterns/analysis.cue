@@ -150,6 +150,37 @@ import (
 	is_connected: count == 1
 }
 
+// #ConnectedComponentsPrecomputed — Components from Python union-find.
+//
+// #ConnectedComponents expands reach sets per node, which is among the
+// slowest patterns on merged multi-team graphs. toposort.py computes the
+// same components with a path-compressed union-find in near-linear time;
+// labels are the lexicographically first member, as here.
+//
+// Usage:
+//   python3 tools/toposort.py charter.cue --fields component,size,orphans --cue > precomputed.cue
+//   cc: patterns.#ConnectedComponentsPrecomputed & {Precomputed: _precomputed_components}
+//
+#ConnectedComponentsPrecomputed: {
+	Precomputed: {
+		component: [string]: string
+		size: [string]:      int
+		orphans: {[string]: true}
+	}
+
+	// Same outputs as #ConnectedComponents
+	components: {
+		for name, label in Precomputed.component {
+			(label): (name): true
+		}
+	}
+	isolated: Precomputed.orphans
+	sizes:    Precomputed.size
+
+	count: len([for c, _ in Precomputed.size {c}])
+	is_connected: count == 1
+}
+
 // ═══════════════════════════════════════════════════════════════════════════
 // SUBGRAPH EXTRACTION
 // ═══════════════════════════════════════════════════════════════════════════
@@ -13,13 +13,18 @@
 //   prov:used (source domain + resources), prov:generated (target domain)
 //   prov:startedAtTime, prov:wasAssociatedWith, prov:hadMember
 //   time:Instant, time:inXSDDateTimeStamp
+//   time:Duration, time:numericDuration, time:unitType (when duration_ms is set)
 //   dcterms:type (event kind), dcterms:title, dcterms:description
 //
 // Extension terms (apercue:):
 //   apercue:ContextEvent (class), apercue:ContextEventLog (class)
 //   apercue:outcome (success/conflict/partial — no W3C equivalent)
+//   apercue:inputSize, apercue:outputSize (operation sizes)
 //
 // Export: cue export -e event_log.event_report --out json
+//
+// tools/eventlog.py keeps an append-only log of these events and renders
+// the same event_report incrementally, without a CUE list of Events.
 
 package patterns
 
@@ -82,6 +87,19 @@ import (
 					if ev.description != _|_ {
 						"dcterms:description": ev.description
 					}
+					if ev.duration_ms != _|_ {
+						"time:hasDuration": {
+							"@type":                "time:Duration"
+							"time:numericDuration": ev.duration_ms / 1000
+							"time:unitType": {"@id": "time:unitSecond"}
+						}
+					}
+					if ev.input_size != _|_ {
+						"apercue:inputSize": ev.input_size
+					}
+					if ev.output_size != _|_ {
+						"apercue:outputSize": ev.output_size
+					}
 					// OWL-Time instant for the event timestamp
 					"time:hasTime": {
 						"@type":                   "time:Instant"
@@ -20,7 +20,8 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 
 // #AnalyzableGraph — Minimal interface for patterns that analyze a graph.
 //
-// Both #Graph and #GraphLite satisfy this. Use it as the Graph type
+// Both #Graph and #GraphLite (with full ancestor/dependent sets)
+// satisfy this. Use it as the Graph type
 // in analysis patterns (CPM, compliance, etc.) to avoid forcing the
 // expensive _path computation that #Graph requires.
 //
@@ -184,7 +185,15 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 // #GraphLite — fast graph for large DAGs with Python-precomputed topology.
 //
 // Skips the expensive recursive _ancestors, _path, and O(n²) dependents.
-// Requires Precomputed with ancestors + dependents from tools/toposort.py.
+// Requires Precomputed from tools/toposort.py with either the full
+// ancestors + dependents sets or compact reach labels (--fields depth,reach).
+// Reach labels are per-node post-order intervals, typically a small
+// fraction of the O(n²) sets. They stay the stored form: in reach mode
+// resources carry no _ancestors and there is no dependents map, so
+// evaluating the graph never pays for the closure. #ReachQuery and
+// #ReachSet expand only the names a projection asks about. Patterns that
+// scan every node's closure (#ImpactQuery, #CriticalityRank, ...) need
+// the full sets.
 // CUE still validates all schemas, types, and structural constraints.
 //
 // PERFORMANCE: _path was removed because CUE's recursive struct references
@@ -196,6 +205,12 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 //   python3 tools/toposort.py charter.cue --cue > precomputed.cue
 //   graph: patterns.#GraphLite & {Input: _tasks, Precomputed: _precomputed}
 //
+//   // Compact mode
+//   graph: patterns.#GraphLite & {
+//     Input: _tasks
+//     Precomputed: {depth: _precomputed.depth, reach: _precomputed.reach}
+//   }
+//
 #GraphLite: {
 	Input: [_#SafeID]: {
 		name: _#SafeID
@@ -204,11 +219,28 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 		...
 	}
 
-	// Required: pre-computed from Python toposort
+	// Required: pre-computed from Python toposort — full sets or reach labels
 	Precomputed: {
 		depth: [_#SafeID]: int
-		ancestors: [_#SafeID]: {[_#SafeID]: true}
-		dependents: [_#SafeID]: {[_#SafeID]: true}
+		ancestors?: [_#SafeID]: {[_#SafeID]: true}
+		dependents?: [_#SafeID]: {[_#SafeID]: true}
+		// down: self + dependents, up: self + ancestors, as [lo, hi]
+		// ranges over each direction's post-order list
+		reach?: {
+			down: _#ReachLabels
+			up:   _#ReachLabels
+		}
+	}
+	_useSets:  Precomputed.ancestors != _|_ && Precomputed.dependents != _|_
+	_useReach: !_useSets && Precomputed.reach != _|_
+	// One of the two closures must be provided
+	_hasClosure: true & (_useSets || _useReach)
+
+	// Post-order position per node in the down labels (for #ReachQuery)
+	_downPos: {
+		if _useReach {
+			for i, n in Precomputed.reach.down.order {(n): i}
+		}
 	}
 
 	// Validation: all dependency references must exist
@@ -227,8 +259,8 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 	resources: {
 		for rname, r in Input {
 			(rname): r & {
-				_depth:     Precomputed.depth[rname]
-				_ancestors: Precomputed.ancestors[rname]
+				_depth: Precomputed.depth[rname]
+				if _useSets {_ancestors: Precomputed.ancestors[rname]}
 			}
 		}
 	}
@@ -247,8 +279,70 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 	}
 	leaves: {for rname, _ in resources if _hasDependents[rname] == _|_ {(rname): true}}
 
-	// Dependents from Python — no O(n²) CUE scan
-	dependents: Precomputed.dependents
+	// Dependents from Python — no O(n²) CUE scan (full sets only;
+	// use #ReachSet with reach labels)
+	if _useSets {dependents: Precomputed.dependents}
+}
+
+// _#ReachLabels — one direction of toposort.py's compact reachability index.
+// Node n covers order[k] for every k in its [lo, hi] intervals (itself included).
+_#ReachLabels: {
+	order: [..._#SafeID]
+	intervals: [_#SafeID]: [...[int, int]]
+}
+
+// #ReachQuery — Is Ancestor a transitive dependency of Descendant?
+//
+// With reach labels this is a scan of Ancestor's few intervals — no set
+// is expanded. With full sets it is a struct lookup.
+//
+// Usage:
+//   q: #ReachQuery & {Graph: graph, Ancestor: "repo-scaffold", Descendant: "site-build"}
+//   // q.reachable = true
+//
+#ReachQuery: {
+	Graph:      #GraphLite
+	Ancestor:   string
+	Descendant: string
+
+	reachable: [
+		if Graph._useReach {
+			let _pos = Graph._downPos[Descendant]
+			Ancestor != Descendant && len([
+				for iv in Graph.Precomputed.reach.down.intervals[Ancestor]
+				if iv[0] <= _pos && _pos <= iv[1] {iv},
+			]) > 0
+		},
+		Graph.Precomputed.ancestors[Descendant][Ancestor] != _|_,
+	][0]
+}
+
+// #ReachSet — One node's ancestors or dependents, expanded on demand.
+//
+// With reach labels only Name's own intervals are expanded, in O(|set|);
+// with full sets it is the stored set. Name itself is left out.
+//
+// Usage:
+//   up:   #ReachSet & {Graph: graph, Name: "site-build"}
+//   down: #ReachSet & {Graph: graph, Name: "repo-scaffold", Direction: "down"}
+//   // up.members = {"repo-scaffold": true, ...}, up.count = 4
+//
+#ReachSet: {
+	Graph:     #GraphLite
+	Name:      string
+	Direction: *"up" | "down"
+
+	members: {
+		if Graph._useReach {
+			let _labels = Graph.Precomputed.reach[Direction]
+			for iv in _labels.intervals[Name]
+			for k in list.Range(iv[0], iv[1]+1, 1)
+			if _labels.order[k] != Name {(_labels.order[k]): true}
+		}
+		if Graph._useSets && Direction == "up" {Graph.Precomputed.ancestors[Name]}
+		if Graph._useSets && Direction == "down" {Graph.Precomputed.dependents[Name]}
+	}
+	count: len([for k, _ in members {k}])
 }
 
 // #ImpactQuery — Find all resources affected if target goes down
@@ -360,6 +454,62 @@ _#SafeLabel: =~"^[a-zA-Z][a-zA-Z0-9_-]*$"
 	], {x: {}, y: {}, less: x.score > y.score})
 }
 
+// #CriticalityRankPrecomputed — #CriticalityRank from Python-precomputed rankings.
+//
+// #CriticalityRank scans every resource's _ancestors for every resource —
+// O(n²). toposort.py counts transitive dependents from bitsets in O(V+E)
+// and emits the list already sorted (most depended-on first).
+//
+// Usage:
+//   python3 tools/toposort.py charter.cue --fields criticality,risk_score --cue > precomputed.cue
+//   crit: patterns.#CriticalityRankPrecomputed & {Precomputed: _precomputed_risk}
+//
+#CriticalityRankPrecomputed: {
+	Precomputed: {
+		criticality: [...{name: string, dependents: int}]
+		...
+	}
+
+	ranked: Precomputed.criticality
+}
+
+// #RiskScorePrecomputed — #RiskScore from Python-precomputed scores.
+//
+// Same entries as #RiskScore, pre-sorted by score in Python, so CUE does
+// neither the O(n²) scan nor the list.Sort. When Centrality is given,
+// each entry also carries betweenness and dependency PageRank as extra
+// blast-radius signals.
+//
+// Usage:
+//   python3 tools/toposort.py charter.cue --fields risk_score,betweenness,pagerank --cue > precomputed.cue
+//   risk: patterns.#RiskScorePrecomputed & {
+//     Precomputed: _precomputed_risk
+//     Centrality:  _precomputed_centrality
+//   }
+//
+#RiskScorePrecomputed: {
+	Precomputed: {
+		risk_score: [...{name: string, direct: int, transitive: int, score: int}]
+		...
+	}
+	Centrality?: {
+		betweenness?: [string]: number
+		pagerank?: [string]:    number
+	}
+
+	ranked: [
+		for r in Precomputed.risk_score {
+			r
+			if Centrality != _|_ && Centrality.betweenness != _|_ {
+				betweenness: Centrality.betweenness[r.name]
+			}
+			if Centrality != _|_ && Centrality.pagerank != _|_ {
+				pagerank: Centrality.pagerank[r.name]
+			}
+		},
+	]
+}
+
 // #ImmediateDependents — Find resources that directly depend on target
 //
 // Usage:
@@ -117,12 +117,12 @@ _lifecyclePhaseList: ["package", "bootstrap", "bind", "deploy", "verify", "drift
 
 // #DriftEntry captures a single declared-vs-live divergence.
 #DriftEntry: {
-	resource: string
-	field:    string
-	declared: _
-	observed: _
-	severity: *"warning" | "critical" | "info"
-	action?:  string // remediation command if available
+	resource:  string
+	field:     string
+	declared?: _ // absent when the field is missing from the declared side
+	observed?: _ // absent when the field is missing from the observed side
+	severity:  *"warning" | "critical" | "info"
+	action?:   string // remediation command if available
 }
 
 // #DriftReport compares declared state (from CUE) against observed state.
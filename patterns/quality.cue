@@ -24,6 +24,10 @@ import "apercue.ca/vocab"
 //   - Completeness: gap analysis (missing resources/types)
 //   - Consistency: compliance rules (structural invariants)
 //   - Accessibility: graph connectivity (roots, leaves, components)
+//
+// Large graphs: `toposort.py --void --cue` also emits _precomputed_quality
+// (entity, root, leaf and layer counts from the same single pass):
+//   _quality: #DataQualityReport & {Graph: g, Precomputed: _precomputed_quality}
 #DataQualityReport: {
 	Graph: #AnalyzableGraph
 
@@ -43,15 +47,39 @@ import "apercue.ca/vocab"
 	MissingResources?: int
 	MissingTypes?:     int
 
-	// ── Computed metrics ─────────────────────────────────────────
+	// Optional: graph counts from toposort.py --void
+	Precomputed?: {
+		entities:  int
+		roots:     int
+		leaves:    int
+		layers:    int
+		non_roots: int
+	}
+	_usePre: Precomputed != _|_
 
-	_entity_count: len(Graph.resources)
-	_root_count:   len(Graph.roots)
-	_leaf_count:   len(Graph.leaves)
-	_layer_count:  len(Graph.topology)
+	// ── Computed metrics ─────────────────────────────────────────
 
-	// Dependency coverage: fraction of non-root resources (have dependencies)
-	_non_roots: len([for name, _ in Graph.resources if Graph.roots[name] == _|_ {1}])
+	_entity_count: int
+	_root_count:   int
+	_leaf_count:   int
+	_layer_count:  int
+	_non_roots:    int
+	if _usePre {
+		_entity_count: Precomputed.entities
+		_root_count:   Precomputed.roots
+		_leaf_count:   Precomputed.leaves
+		_layer_count:  Precomputed.layers
+		_non_roots:    Precomputed.non_roots
+	}
+	if !_usePre {
+		_entity_count: len(Graph.resources)
+		_root_count:   len(Graph.roots)
+		_leaf_count:   len(Graph.leaves)
+		_layer_count:  len(Graph.topology)
+
+		// Dependency coverage: fraction of non-root resources (have dependencies)
+		_non_roots: len([for name, _ in Graph.resources if Graph.roots[name] == _|_ {1}])
+	}
 	_dep_coverage: {
 		if _entity_count > 0 {
 			_non_roots * 100 / _entity_count
@@ -103,13 +103,32 @@ import "apercue.ca/vocab"
 // (Renamed from #ValidateGraph to avoid collision with graph.cue's structural validator)
 // Usage:
 //   validatedGraph: patterns.#ValidateTypes & {Input: myResources}
+//
+// For large inventories, tools/contracts.py checks every resource against
+// the exported registry in one pass and emits _expanded. Pass it as
+// Precomputed to skip the per-resource contract evaluation:
+//   validatedGraph: patterns.#ValidateTypes & {Input: myResources, Precomputed: _expanded}
 #ValidateTypes: {
 	Input: [string]: _
 
+	// Output of contracts.py --cue (_expanded): Input with derived depends_on.
+	// contracts.py only emits it for a valid run; each entry is unified
+	// with its Input so a stale or diverged file fails here.
+	Precomputed?: [string]: _
+
+	_usePre: Precomputed != _|_
+
 	// Apply type contracts to each resource
 	Output: {
-		for name, res in Input {
-			(name): (#ApplyTypeContracts & {Input: res}).Output
+		if _usePre {
+			for name, _ in Input {
+				(name): Input[name] & Precomputed[name]
+			}
+		}
+		if !_usePre {
+			for name, res in Input {
+				(name): (#ApplyTypeContracts & {Input: res}).Output
+			}
 		}
 	}
 
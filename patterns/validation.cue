@@ -434,18 +434,28 @@ import (
 	// validation toolchains.
 	//
 	// Export: cue export -e compliance.shacl_report --out json
+	shacl_report: (#_ComplianceShacl & {Results: results, Summary: summary}).report
+}
+
+// #_ComplianceShacl — sh:ValidationReport for a compliance results list.
+// #ComplianceCheck and #ComplianceCheckPrecomputed both project through
+// it, so the two reports cannot diverge.
+#_ComplianceShacl: {
+	Results: [...]
+	Summary: {failed: int, ...}
+
 	_severity_iri: {
 		"critical": "sh:Violation"
 		"warning":  "sh:Warning"
 		"info":     "sh:Info"
 	}
 
-	shacl_report: {
+	report: {
 		"@context":    vocab.context["@context"]
 		"@type":       "sh:ValidationReport"
-		"sh:conforms": summary.failed == 0
+		"sh:conforms": Summary.failed == 0
 		"sh:result": [
-			for r in results if !r.passed
+			for r in Results if !r.passed
 			for v in r.violations {
 				"@type": "sh:ValidationResult"
 				"sh:focusNode": {"@id": v.resource}
@@ -473,3 +483,40 @@ import (
 		]
 	}
 }
+
+// #ComplianceCheckPrecomputed — Compliance results from Python bitsets.
+//
+// #ComplianceCheck rescans every resource's @type and walks dependents
+// once per rule. tools/compliance.py evaluates all rules in one pass over
+// @type bitsets and per-node type masks and emits the same results list
+// (same violations, same order); this pattern derives summary and
+// shacl_report from it exactly as #ComplianceCheck does.
+//
+// Usage:
+//   cue export ./dir/ -e rules --out json > rules.json
+//   python3 tools/compliance.py ./dir/ --rules rules.json --cue > compliance_precomputed.cue
+//   compliance: patterns.#ComplianceCheckPrecomputed & {Precomputed: _precomputed_compliance}
+//
+#ComplianceCheckPrecomputed: {
+	Precomputed: {
+		results: [...{
+			name:     string
+			severity: "warning" | "critical" | "info"
+			matching: int
+			violations: [...#Violation]
+			passed: bool
+		}]
+	}
+
+	results: Precomputed.results
+
+	summary: {
+		total: len(results)
+		passed: len([for r in results if r.passed {1}])
+		failed: len([for r in results if !r.passed {1}])
+		critical_failures: len([for r in results if !r.passed && r.severity == "critical" {1}])
+	}
+
+	// SHACL ValidationReport — same projection as #ComplianceCheck
+	shacl_report: (#_ComplianceShacl & {Results: results, Summary: summary}).report
+}
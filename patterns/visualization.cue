@@ -238,3 +238,60 @@ import (
 		},
 	]
 }
+
+// #DependencyMatrixPrecomputed - Dependency matrix from Python-precomputed CSR data.
+//
+// #DependencyMatrix builds Dependents by scanning every resource for every
+// resource — O(V²). toposort.py --matrix emits the same relation as sparse
+// CSR rows in topological layer order; this pattern expands it in O(V+E).
+// For large graphs, skip CUE entirely and render the JSON matrix (or the
+// --matrix-bits sidecar) on the client.
+//
+// Usage:
+//   python3 tools/toposort.py charter.cue --cue --matrix > precomputed.cue
+//   matrix: patterns.#DependencyMatrixPrecomputed & {Precomputed: _precomputed_matrix}
+#DependencyMatrixPrecomputed: {
+	Precomputed: {
+		order: [...string]
+		layers: [...int] // Row offset where each topology layer starts
+		adjacency: {row_ptr: [...int], col_idx: [...int]}
+		reachability?: {row_ptr: [...int], col_idx: [...int]}
+	}
+
+	let _order = Precomputed.order
+	let _adj = Precomputed.adjacency
+
+	// Same shape as #DependencyMatrix
+	Dependencies: {
+		for i, name in _order {
+			(name): [for k in list.Range(_adj.row_ptr[i], _adj.row_ptr[i+1], 1) {_order[_adj.col_idx[k]]}]
+		}
+	}
+
+	// Transpose via struct accumulation — one pass over the edges
+	_dependentsSet: {
+		for name in _order {(name): {}}
+		for i, name in _order
+		for k in list.Range(_adj.row_ptr[i], _adj.row_ptr[i+1], 1) {
+			(_order[_adj.col_idx[k]]): (name): true
+		}
+	}
+	Dependents: {
+		for name, s in _dependentsSet {
+			(name): [for d, _ in s {d}]
+		}
+	}
+
+	Roots: [for i, name in _order if _adj.row_ptr[i] == _adj.row_ptr[i+1] {name}]
+	Leaves: [for name, s in _dependentsSet if len(s) == 0 {name}]
+
+	// Transitive reachability (ancestors) as struct-as-set, when provided
+	if Precomputed.reachability != _|_ {
+		let _reach = Precomputed.reachability
+		Reachable: {
+			for i, name in _order {
+				(name): {for k in list.Range(_reach.row_ptr[i], _reach.row_ptr[i+1], 1) {(_order[_reach.col_idx[k]]): true}}
+			}
+		}
+	}
+}
@@ -22,6 +22,11 @@ import "apercue.ca/vocab"
 // The output is valid VoID JSON-LD: a void:Dataset with void:classPartition
 // entries for each @type, void:propertyPartition for dependency edges,
 // and void:vocabulary for each W3C namespace in use.
+//
+// Large graphs: `toposort.py --void --cue` emits _precomputed_void with
+// every statistic from one pass (plus exact triple counts with --jsonld).
+// Pass it as Precomputed to skip the per-type rescans:
+//   void_dataset: #VoIDDataset & {Graph: g, Precomputed: _precomputed_void}
 #VoIDDataset: {
 	Graph: #AnalyzableGraph
 
@@ -35,25 +40,56 @@ import "apercue.ca/vocab"
 	SparqlEndpoint?: string
 	DataDump?:       string
 
+	// Optional: statistics from toposort.py --void
+	Precomputed?: {
+		entities: int
+		triples:  int
+		classes:  int
+		type_counts: {[string]: int}
+		links:           int
+		has_depends_on:  int
+		has_description: int
+		// Triples counted in the real JSON-LD exports (--jsonld)
+		exact_triples?: int
+	}
+	_usePre: Precomputed != _|_
+
 	// ── Computed statistics ───────────────────────────────────────
 
 	// Total entities (resources)
-	_entity_count: len(Graph.resources)
+	_entity_count: int
+	if _usePre {
+		_entity_count: Precomputed.entities
+	}
+	if !_usePre {
+		_entity_count: len(Graph.resources)
+	}
 
 	// Total triples estimate: each resource has @type, @id, name = 3 base
 	// + 1 per depends_on edge + 1 if description present
-	_triple_count: {
-		let _base = _entity_count * 3
-		let _deps = len([for _, res in Graph.resources if res.depends_on != _|_ {for _, _ in res.depends_on {1}}])
-		let _descs = len([for _, res in Graph.resources if res.description != _|_ {1}])
-		_base + _deps + _descs
+	_triple_count: int
+	if _usePre {
+		_triple_count: *Precomputed.exact_triples | Precomputed.triples
+	}
+	if !_usePre {
+		_triple_count: {
+			let _base = _entity_count * 3
+			let _deps = len([for _, res in Graph.resources if res.depends_on != _|_ {for _, _ in res.depends_on {1}}])
+			let _descs = len([for _, res in Graph.resources if res.description != _|_ {1}])
+			_base + _deps + _descs
+		}
 	}
 
 	// Distinct types used
 	_all_types: {
-		for _, res in Graph.resources {
-			for t, _ in res["@type"] {
-				(t): true
+		if _usePre {
+			for t, _ in Precomputed.type_counts {(t): true}
+		}
+		if !_usePre {
+			for _, res in Graph.resources {
+				for t, _ in res["@type"] {
+					(t): true
+				}
 			}
 		}
 	}
@@ -61,17 +97,34 @@ import "apercue.ca/vocab"
 
 	// Type partition: count resources per type
 	_type_counts: {
-		for t, _ in _all_types {
-			(t): len([for _, res in Graph.resources if res["@type"][t] != _|_ {1}])
+		if _usePre {Precomputed.type_counts}
+		if !_usePre {
+			for t, _ in _all_types {
+				(t): len([for _, res in Graph.resources if res["@type"][t] != _|_ {1}])
+			}
 		}
 	}
 
 	// Property usage: count how many resources use each property
-	_has_depends_on: len([for _, res in Graph.resources if res.depends_on != _|_ {1}])
-	_has_description: len([for _, res in Graph.resources if res.description != _|_ {1}])
+	_has_depends_on: int
+	_has_description: int
+	if _usePre {
+		_has_depends_on:  Precomputed.has_depends_on
+		_has_description: Precomputed.has_description
+	}
+	if !_usePre {
+		_has_depends_on: len([for _, res in Graph.resources if res.depends_on != _|_ {1}])
+		_has_description: len([for _, res in Graph.resources if res.description != _|_ {1}])
+	}
 
 	// Total dependency links
-	_link_count: len([for _, res in Graph.resources if res.depends_on != _|_ {for _, _ in res.depends_on {1}}])
+	_link_count: int
+	if _usePre {
+		_link_count: Precomputed.links
+	}
+	if !_usePre {
+		_link_count: len([for _, res in Graph.resources if res.depends_on != _|_ {for _, _ in res.depends_on {1}}])
+	}
 
 	// ── VoID JSON-LD output ──────────────────────────────────────
 
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Bulk #ComplianceCheck evaluator — every rule at once over @type bitsets.
+
+#ComplianceCheck in patterns/validation.cue rescans every resource's @type
+for each rule's selector. For every match it then walks the dependents or
+dependencies and looks up their types, so the work is paid once per rule.
+This tool does the graph work once:
+
+  type bitsets     @type -> int bitset over resource positions
+  type masks       per resource, an int mask over type indices for its own
+                   types, its direct dependencies' types, its transitive
+                   dependencies' types and its transitive dependents' types
+                   (one forward and one reverse pass over the DAG)
+
+Each rule then reduces to bitwise operations. The matched set is the OR
+of its match_types bitsets, and the violators of a type assertion are
+matched & ~(OR of the "has a neighbour of type t" bitsets), cached per
+(assertion, type) across rules. The output has the same
+results / summary / shacl_report shape as #ComplianceCheck, with the same
+violation order. dependents means transitive dependents, as in #Graph.
+--cue emits `_precomputed_compliance` for #ComplianceCheckPrecomputed.
+
+Rules are a JSON list of #ComplianceRule, e.g. from
+`cue export ./dir/ -e rules --out json`.
+
+Usage:
+    python3 tools/compliance.py ./examples/recipe-ingredients/recipe.cue --rules rules.json
+    python3 tools/compliance.py graph.json --rules rules.json --cue > compliance_precomputed.cue
+    python3 tools/compliance.py graph.json --rules rules.json --shacl > report.jsonld
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+
+from eventlog import domain_of, load_context, record
+from toposort import descendant_bitsets, iter_bits, load_resources, toposort
+
+SEVERITY_IRI = {
+    "critical": "sh:Violation",
+    "warning": "sh:Warning",
+    "info": "sh:Info",
+}
+
+# Type-requirement assertions, in #ComplianceCheck's _v1.._v7 order,
+# with the per-node mask each one tests.
+TYPE_CHECKS = {
+    "requires_dependent_type": "dependents",
+    "requires_dependency_type": "dependencies",
+    "requires_transitive_dependency_type": "ancestors",
+}
+CHECK_ORDER = (
+    "requires_dependent_type",
+    "requires_dependency_type",
+    "must_not_be_root",
+    "must_not_be_leaf",
+    "min_dependents",
+    "max_depth",
+    "requires_transitive_dependency_type",
+)
+
+
+class TypeIndex:
+    """@type bitsets and per-node neighbour type masks for one graph."""
+
+    def __init__(self, resources: dict):
+        self.resources = resources
+        self.order, self.depth = toposort(resources)
+        self.names = list(resources)
+        pos = {n: i for i, n in enumerate(self.names)}
+        self.types = sorted({t for r in resources.values() for t in r.get("@type") or {}})
+        tix = {t: i for i, t in enumerate(self.types)}
+
+        n = len(self.names)
+        self.own = [0] * n
+        self.by_type = {t: 0 for t in self.types}
+        deps = [[] for _ in range(n)]
+        has_dependent = 0
+        for i, name in enumerate(self.names):
+            r = resources[name]
+            for t in r.get("@type") or {}:
+                self.own[i] |= 1 << tix[t]
+                self.by_type[t] |= 1 << i
+            for d in r.get("depends_on") or {}:
+                if d in pos:
+                    deps[i].append(pos[d])
+                    has_dependent |= 1 << pos[d]
+
+        self.masks = {"dependencies": [0] * n, "ancestors": [0] * n, "dependents": [0] * n}
+        direct, anc, desc = self.masks["dependencies"], self.masks["ancestors"], self.masks["dependents"]
+        for name in self.order:
+            i = pos[name]
+            for d in deps[i]:
+                direct[i] |= self.own[d]
+                anc[i] |= self.own[d] | anc[d]
+        for name in reversed(self.order):
+            i = pos[name]
+            for d in deps[i]:
+                desc[d] |= self.own[i] | desc[i]
+
+        self.roots = sum(1 << pos[m] for m in self.order if self.depth[m] == 0)
+        self.leaves = ((1 << n) - 1) & ~has_dependent
+        self.tix = tix
+        self.pos = pos
+        self._has = {}
+        self._dependent_counts = None
+
+    def match(self, types) -> int:
+        bits = 0
+        for t in types:
+            bits |= self.by_type.get(t, 0)
+        return bits
+
+    def has(self, kind: str, t: str) -> int:
+        """Bitset of resources whose `kind` mask contains type t (cached)."""
+        key = (kind, t)
+        if key not in self._has:
+            bits = 0
+            if t in self.tix:
+                bit = 1 << self.tix[t]
+                for i, m in enumerate(self.masks[kind]):
+                    if m & bit:
+                        bits |= 1 << i
+            self._has[key] = bits
+        return self._has[key]
+
+    def dependent_counts(self) -> list[int]:
+        """Transitive dependent count per resource, in self.names order."""
+        if self._dependent_counts is None:
+            desc = descendant_bitsets(self.resources, self.order)
+            by_name = {name: bin(b).count("1") for name, b in zip(self.order, desc)}
+            self._dependent_counts = [by_name[n] for n in self.names]
+        return self._dependent_counts
+
+
+def evaluate_rule(index: TypeIndex, rule: dict) -> dict:
+    """One #ComplianceCheck results entry."""
+    names = index.names
+    match = index.match(rule.get("match_types") or {})
+    violations = []
+    for check in CHECK_ORDER:
+        if check not in rule:
+            continue
+        if check in TYPE_CHECKS:
+            ok = 0
+            for t in rule[check]:
+                ok |= index.has(TYPE_CHECKS[check], t)
+            violations += [{"resource": names[i], "check": check} for i in iter_bits(match & ~ok)]
+        elif check == "must_not_be_root":
+            violations += [{"resource": names[i], "check": check} for i in iter_bits(match & index.roots)]
+        elif check == "must_not_be_leaf":
+            violations += [{"resource": names[i], "check": check} for i in iter_bits(match & index.leaves)]
+        elif check == "min_dependents":
+            counts = index.dependent_counts()
+            violations += [
+                {"resource": names[i], "check": check, "actual": counts[i], "required": rule[check]}
+                for i in iter_bits(match) if counts[i] < rule[check]
+            ]
+        elif check == "max_depth":
+            violations += [
+                {"resource": names[i], "check": check,
+                 "actual": index.depth[names[i]], "required": rule[check]}
+                for i in iter_bits(match) if index.depth[names[i]] > rule[check]
+            ]
+
+    matching = bin(match).count("1")
+    severity = rule.get("severity", "warning")
+    cond = rule.get("conditional_severity")
+    if cond and matching and match & ~index.by_type.get(cond["when_tagged"], 0) == 0:
+        severity = cond["then_severity"]
+
+    return {
+        "name": rule["name"],
+        "severity": severity,
+        "matching": matching,
+        "violations": violations,
+        "passed": not violations,
+    }
+
+
+def shacl_report(results: list[dict], context: dict) -> dict:
+    """#ComplianceCheck.shacl_report for the given results.
+
+    context is vocab.context's @context, whose @base (urn:resource:)
+    resolves sh:focusNode ids as the CUE report does.
+    """
+    out = []
+    for r in results:
+        if r["passed"]:
+            continue
+        severity = {"@id": SEVERITY_IRI[r["severity"]]}
+        for v in r["violations"]:
+            entry = {
+                "@type": "sh:ValidationResult",
+                "sh:focusNode": {"@id": v["resource"]},
+                "sh:sourceConstraintComponent": {"@id": "apercue:" + v["check"]},
+                "sh:resultSeverity": severity,
+                "sh:resultMessage": f"{r['name']}: {v['check']} on {v['resource']}",
+                "sh:sourceShape": {"@id": "apercue:rule/" + r["name"]},
+                "sh:resultAnnotation": {
+                    "@type": "sh:ResultAnnotation",
+                    "sh:annotationProperty": {"@id": "dcterms:source"},
+                    "sh:annotationValue": r["name"],
+                },
+            }
+            if "actual" in v:
+                entry["sh:detail"] = {
+                    "@type": "sh:ValidationResult",
+                    "sh:resultMessage": f"actual: {v['actual']}, required: {v['required']}",
+                    "sh:resultSeverity": severity,
+                }
+            out.append(entry)
+    return {
+        "@context": context,
+        "@type": "sh:ValidationReport",
+        "sh:conforms": all(r["passed"] for r in results),
+        "sh:result": out,
+    }
+
+
+def evaluate(resources: dict, rules: list[dict], context: dict) -> dict:
+    index = TypeIndex(resources)
+    results = [evaluate_rule(index, rule) for rule in rules]
+    return {
+        "results": results,
+        "summary": {
+            "total": len(rules),
+            "passed": sum(r["passed"] for r in results),
+            "failed": sum(not r["passed"] for r in results),
+            "critical_failures": sum(not r["passed"] and r["severity"] == "critical" for r in results),
+        },
+        "shacl_report": shacl_report(results, context),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Evaluate #ComplianceRule lists in bulk over @type bitsets"
+    )
+    parser.add_argument("source", help="CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--rules", required=True, metavar="FILE", help="JSON list of #ComplianceRule")
+    out = parser.add_mutually_exclusive_group()
+    out.add_argument("--cue", action="store_true",
+                     help="Emit _precomputed_compliance for #ComplianceCheckPrecomputed")
+    out.add_argument("--shacl", action="store_true", help="Emit only the sh:ValidationReport")
+    parser.add_argument("--context", metavar="FILE",
+                        help="JSON-LD context for shacl_report (default: site/vocab/context.jsonld)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with open(args.rules) as f:
+        rules = json.load(f)
+    if isinstance(rules, dict):
+        rules = rules.get("Rules") or rules.get("rules") or []
+    resources = load_resources(args.source, args.expr)
+    report = evaluate(resources, rules, load_context(args.context))
+
+    if args.cue:
+        print("package main\n")
+        body = json.dumps({"results": report["results"]}, indent="\t")
+        print(f"_precomputed_compliance: {body}")
+    elif args.shacl:
+        json.dump(report["shacl_report"], sys.stdout, indent=2)
+        print()
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    s = report["summary"]
+    violations = sum(len(r["violations"]) for r in report["results"])
+    sys.stderr.write(f"Compliance: {s['total']} rules over {len(resources)} resources, "
+                     f"{s['passed']} passed, {s['failed']} failed "
+                     f"({s['critical_failures']} critical), {violations} violations\n")
+    domain = domain_of(args.source)
+    record("validate", domain, domain, started,
+           resources={v["resource"] for r in report["results"] for v in r["violations"]},
+           outcome="success" if s["failed"] == 0 else "conflict",
+           input_size=len(resources), output_size=violations,
+           description=f"{s['total']} compliance rules, {s['failed']} failed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
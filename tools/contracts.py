@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Bulk #ApplyTypeContracts — type-registry expansion for whole inventories.
+
+#ApplyTypeContracts in patterns/type-contracts.cue consults
+vocab.#TypeRegistry once per resource per @type. It unifies required
+fields, derives structural_deps edges and collects grants, and the derived
+depends_on then feeds #Graph again. This pre-pass loads the exported
+registry once and compiles one merged contract per distinct @type
+combination, so a 20k-resource inventory with a handful of type mixes
+compiles a handful of contracts. Each resource is then expanded in one
+pass:
+
+  violations      required fields that are missing or of the wrong kind, in
+                  the same form as #ApplyTypeContracts' unification failures
+  depends_on      explicit depends_on merged with structural_deps targets,
+                  as _allDeps does. Targets that are not resources are
+                  listed under unresolved (#Graph.valid would be false)
+  grants          {resource: {action: true}}, as #ApplyTypeContracts.grants
+
+The augmented resource map (#ApplyTypeContracts.Output for every resource)
+is written with --out as JSON, which toposort.py reads directly, or with
+--cue as `_expanded` for #ValidateTypes' Precomputed or #GraphLite's Input.
+Neither is written on any violation or unresolved structural target: the
+report goes to stdout (stderr under --cue) instead and the exit code is 1.
+
+Contracts read every field of a resource, so sources are loaded whole:
+JSON and NDJSON directly, and .cue files and package dirs through
+`cue export` (toposort.py's regex parser keeps only name, @type and
+depends_on). Snapshots carry no resource bodies and are rejected.
+
+Registry JSON is {TypeName: {description, requires?, grants?, structural_deps?}}.
+A `requires` value that is a kind name ("string", "int", "float",
+"number", "bool", "list", "struct", "_") checks the kind. Any other value
+must match exactly, as it would under CUE unification.
+
+Usage:
+    python3 tools/contracts.py inventory.json --registry registry.json --out expanded.json
+    python3 tools/toposort.py expanded.json --fields depth,earliest --cue > precomputed.cue
+    python3 tools/contracts.py ./infra/ --expr _resources --registry registry.json --cue > expanded.cue
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from eventlog import domain_of, record
+from toposort import NDJSON_SUFFIXES, SNAPSHOT_SUFFIX, iter_ndjson
+
+KINDS = {
+    "string": lambda v: isinstance(v, str),
+    "int": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "float": lambda v: isinstance(v, float),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "bool": lambda v: isinstance(v, bool),
+    "list": lambda v: isinstance(v, list),
+    "struct": lambda v: isinstance(v, dict),
+    "_": lambda v: True,
+}
+
+
+def load_registry(path: str) -> dict:
+    with open(path) as f:
+        registry = json.load(f)
+    for name, entry in registry.items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: registry entry {name!r} is not a struct")
+    return registry
+
+
+def load_full_resources(source: str, expr: str) -> dict:
+    """Resource map with every field kept, from JSON, NDJSON or cue export."""
+    if source == "-":
+        return json.load(sys.stdin)
+    if source.endswith(SNAPSHOT_SUFFIX):
+        raise ValueError(f"{source}: snapshots hold no resource fields; pass the JSON or CUE source")
+    if source.endswith(NDJSON_SUFFIXES):
+        with open(source) as f:
+            return {r["name"]: r for r in iter_ndjson(f, source)}
+    if source.endswith(".json"):
+        with open(source) as f:
+            return json.load(f)
+    cmd = ["cue", "export", source, "-e", expr, "--out", "json"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    except FileNotFoundError:
+        raise ValueError(f"{source}: CUE sources need the cue binary (or export to JSON first)")
+    if result.returncode != 0:
+        raise ValueError(f"cue export failed: {result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+class ContractCache:
+    """Merged contract per distinct @type set, compiled on first use."""
+
+    def __init__(self, registry: dict):
+        self.registry = registry
+        self._contracts: dict[frozenset, dict] = {}
+        self.unknown_types: set[str] = set()
+
+    def get(self, types) -> dict:
+        key = frozenset(types)
+        contract = self._contracts.get(key)
+        if contract is None:
+            requires: list[tuple[str, str, object]] = []
+            structural: list[tuple[str, str]] = []
+            grants: dict[str, bool] = {}
+            for t in sorted(key):
+                entry = self.registry.get(t)
+                if entry is None:
+                    self.unknown_types.add(t)
+                    continue
+                for field, expected in (entry.get("requires") or {}).items():
+                    requires.append((t, field, expected))
+                for field in entry.get("structural_deps") or []:
+                    structural.append((t, field))
+                for action in entry.get("grants") or []:
+                    grants[action] = True
+            contract = self._contracts[key] = {
+                "requires": requires,
+                "structural": structural,
+                "grants": grants,
+            }
+        return contract
+
+    def __len__(self) -> int:
+        return len(self._contracts)
+
+
+def check_field(resource: dict, field: str, expected) -> tuple[str, object] | None:
+    """(problem, actual) when resource[field] does not unify with expected."""
+    if field not in resource:
+        return "missing", None
+    actual = resource[field]
+    if isinstance(expected, str) and expected in KINDS:
+        return None if KINDS[expected](actual) else ("kind", actual)
+    return None if actual == expected else ("value", actual)
+
+
+def expand(resources: dict, registry: dict) -> dict:
+    """Expand every resource against the registry. Returns the report."""
+    cache = ContractCache(registry)
+    output = {}
+    grants = {}
+    violations = []
+    inferred = []
+    unresolved = []
+    for name, r in resources.items():
+        contract = cache.get(r.get("@type") or {})
+        for t, field, expected in contract["requires"]:
+            problem = check_field(r, field, expected)
+            if problem:
+                v = {"resource": name, "type": t, "field": field, "problem": problem[0], "expected": expected}
+                if problem[0] != "missing":
+                    v["actual"] = problem[1]
+                violations.append(v)
+
+        deps = dict(r.get("depends_on") or {})
+        for t, field in contract["structural"]:
+            target = r.get(field)
+            if not isinstance(target, str):
+                continue
+            if target not in deps:
+                inferred.append({"resource": name, "type": t, "field": field, "target": target})
+            deps[target] = True
+            if target not in resources:
+                unresolved.append({"resource": name, "field": field, "target": target})
+
+        out = dict(r)
+        if deps or "depends_on" in r:
+            out["depends_on"] = deps
+        output[name] = out
+        grants[name] = contract["grants"]
+
+    return {
+        "Output": output,
+        "grants": grants,
+        "violations": violations,
+        "inferred_edges": inferred,
+        "unresolved": unresolved,
+        "summary": {
+            "resources": len(resources),
+            "contracts": len(cache),
+            "violations": len(violations),
+            "inferred_edges": len(inferred),
+            "unresolved": len(unresolved),
+            "unknown_types": sorted(cache.unknown_types),
+            "valid": not violations and not unresolved,
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Expand #TypeRegistry contracts (requires, structural_deps, grants) in bulk"
+    )
+    parser.add_argument("source", help="JSON or NDJSON file, CUE file or package dir (via cue export), or - for stdin")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for .cue files and package dirs (default: _tasks)")
+    parser.add_argument("--registry", required=True, metavar="FILE", help="Exported #TypeRegistry JSON")
+    parser.add_argument("--out", metavar="FILE", help="Write the augmented resource map (JSON) here")
+    parser.add_argument("--cue", action="store_true",
+                        help="Emit _expanded / _expanded_grants as CUE instead of the JSON report")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        registry = load_registry(args.registry)
+        resources = load_full_resources(args.source, args.expr)
+    except ValueError as e:
+        parser.error(str(e))
+    report = expand(resources, registry)
+    s = report["summary"]
+
+    # An invalid expansion is never written: #ValidateTypes trusts _expanded
+    if args.out and s["valid"]:
+        with open(args.out, "w") as f:
+            json.dump(report["Output"], f, indent=2)
+            f.write("\n")
+    if args.cue and s["valid"]:
+        expanded = json.dumps(report["Output"], indent="\t")
+        grants = json.dumps(report["grants"], indent="\t")
+        print("package main\n")
+        print(f"_expanded: {expanded}\n")
+        print(f"_expanded_grants: {grants}")
+    else:
+        out = sys.stderr if args.cue else sys.stdout
+        json.dump({k: v for k, v in report.items() if k != "Output"}, out, indent=2)
+        out.write("\n")
+
+    sys.stderr.write(f"Contracts: {s['resources']} resources over {s['contracts']} type combinations, "
+                     f"{s['violations']} violations, {s['inferred_edges']} inferred edges "
+                     f"({s['unresolved']} unresolved)"
+                     f"{', unknown types ' + ','.join(s['unknown_types']) if s['unknown_types'] else ''}\n")
+    domain = domain_of(args.source)
+    record("validate", domain, domain, started,
+           resources={v["resource"] for v in report["violations"]},
+           outcome="success" if s["valid"] else "conflict",
+           input_size=s["resources"], output_size=s["inferred_edges"],
+           description=f"type contracts: {s['violations']} violations, {s['inferred_edges']} inferred edges")
+    return 0 if s["valid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,11 +8,25 @@ package tools
 // #DeploySpec declares a deployment pipeline.
 // The pipeline is: precompute topology → validate → build → (optional sync).
 #DeploySpec: {
-	// CUE file to read resources from (for toposort.py)
-	toposort_source: =~"\\.cue$"
+	// CUE files or package directories to precompute. toposort.py --discover
+	// finds every #Graph/#GraphLite Input in them and writes precomputed.cue
+	// next to each package — all graphs in one Python process.
+	toposort_sources: [=~"(\\.cue|/)$", ...=~"(\\.cue|/)$"] // at least one
 
-	// Where to write precomputed topology
-	precomputed_output: =~"\\.cue$"
+	// Single-source form (v0.9). Still accepted: it seeds toposort_sources.
+	toposort_source?: =~"\\.cue$"
+	if toposort_source != _|_ {
+		toposort_sources: *[toposort_source] | _
+	}
+
+	// v0.9 output path. Only valid with the single-source form: the deploy
+	// command then runs toposort.py on toposort_source and writes its CUE
+	// output here instead of running --discover.
+	precomputed_output?: =~"\\.cue$"
+	if precomputed_output != _|_ {
+		toposort_source:  string
+		toposort_sources: [toposort_source]
+	}
 
 	// Packages to validate after precomputation
 	vet_packages: [_, ...string] // at least one
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Hash-indexed drift engine — #DriftReport for fleet-sized snapshots.
+
+#DriftReport in patterns/lifecycle.cue computes only missing and extra;
+every consumer hand-writes its field comparisons, and injecting a large
+observed snapshot with -t observed=@file.json makes evaluation slow. This
+tool decodes the declared export and the observed snapshot one resource
+at a time and hashes each resource's canonical form. Only resources
+whose declared and observed hashes differ are deep-diffed. The output
+has the #DriftReport shape, with the `drifts` filled in as #DriftEntry
+records:
+
+  missing, extra   {name: true}
+  drifts           [{resource, field, declared?, observed?, severity, action?}]
+  summary          total_declared/observed/missing/extra/drifted, in_sync
+
+`field` is a dotted path into the resource. A field missing on one side
+has no `declared` (or `observed`) key, so it is told apart from a field
+explicitly set to null. --fields limits the comparison, and hashing, to the given
+top-level fields. --ignore drops runtime-only fields such as timestamps,
+so that in-sync resources hash equal and skip the deep diff.
+
+Severity comes from --rules, a JSON list of
+{resource?, field?, type?, severity, action?}. resource and field are
+fnmatch globs and type is a declared @type. The first matching rule wins.
+action is a template over {resource}, {field}, {declared} and {observed}
+(empty for a missing side); any other braces are kept as written.
+Unmatched entries get #DriftEntry's default, "warning".
+
+Periodic mode (--interval N) re-reads both inputs every N seconds. It
+keeps the previous run's hashes, and a resource whose declared and observed
+hashes are both unchanged reuses its previous diff instead of being deep-
+diffed again. --state FILE persists those hashes between separate runs.
+
+Inputs are JSON objects {name: resource} or NDJSON (.ndjson/.jsonl), with
+one resource per line keyed by `name`. Every resource must be a JSON
+object. NDJSON is streamed line by line; a
+JSON object is read into memory whole and decoded one resource at a time.
+Exits 1 when anything drifted.
+
+Usage:
+    cue export ./infra/ -e bootstrap.resources > declared.json
+    python3 tools/drift.py declared.json observed.json > drift.json
+    python3 tools/drift.py declared.json observed.ndjson --ignore uptime,last_seen --rules rules.json
+    python3 tools/drift.py declared.json observed.ndjson --state .cache/drift.json --ndjson
+    python3 tools/drift.py declared.json observed.ndjson --interval 300 --out drift.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+
+from graphdiff import node_hash
+
+DEFAULT_SEVERITY = "warning"
+# Diffs are stored as dicts since version 2 (tuples used null for a missing side)
+STATE_VERSION = 2
+SEVERITIES = ("critical", "warning", "info")
+# Only these placeholders are substituted; other braces (jsonpath={.spec}) stay literal
+ACTION_FIELD = re.compile(r"\{(resource|field|declared|observed)\}")
+
+
+# ── Streaming input ────────────────────────────────────────────────
+
+
+def iter_resources(path: str):
+    """Yield (name, resource) from a JSON object or NDJSON file, one at a time.
+
+    NDJSON is read line by line. A JSON object is read into memory as text
+    and walked entry by entry with raw_decode, so only one parsed resource
+    is alive at a time. Truncated or malformed input raises ValueError.
+    """
+    if path.endswith((".ndjson", ".jsonl")):
+        with open(path) as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    r = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{lineno}: {e.msg}") from None
+                if not isinstance(r, dict):
+                    raise ValueError(f"{path}:{lineno}: resource is not a JSON object")
+                name = r.get("name")
+                if not isinstance(name, str):
+                    raise ValueError(f"{path}:{lineno}: resource has no string `name`")
+                yield name, r
+        return
+
+    with open(path) as f:
+        text = f.read()
+    decoder = json.JSONDecoder()
+    ws = " \t\r\n"
+    end = len(text)
+
+    def skip(i):
+        while i < end and text[i] in ws:
+            i += 1
+        if i == end:
+            raise ValueError(f"{path}: truncated JSON at offset {i}")
+        return i
+
+    def decode(i):
+        try:
+            return decoder.raw_decode(text, i)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e.msg} (offset {e.pos})") from None
+
+    i = len(text) - len(text.lstrip(ws))
+    if text[i:i + 1] != "{":
+        raise ValueError(f"{path}: expected a JSON object of resources")
+    i = skip(i + 1)
+    if text[i] == "}":
+        return
+    while True:
+        name, i = decode(i)
+        if not isinstance(name, str):
+            raise ValueError(f"{path}: expected a string key at offset {i}")
+        i = skip(i)
+        if text[i] != ":":
+            raise ValueError(f"{path}: expected ':' at offset {i}")
+        start = skip(i + 1)
+        resource, i = decode(start)
+        if not isinstance(resource, dict):
+            raise ValueError(f"{path}: resource {name!r} is not a JSON object (offset {start})")
+        yield name, resource
+        i = skip(i)
+        if text[i] == "}":
+            return
+        if text[i] != ",":
+            raise ValueError(f"{path}: expected ',' or '}}' at offset {i}")
+        i = skip(i + 1)
+
+
+def project(resource: dict, fields: set[str] | None, ignore: set[str]) -> dict:
+    """The part of a resource that is compared (and hashed)."""
+    return {
+        k: v for k, v in resource.items()
+        if k not in ignore and (fields is None or k in fields)
+    }
+
+
+# ── Diff ───────────────────────────────────────────────────────────
+
+
+def deep_diff(declared, observed, path: str = "") -> list[dict]:
+    """{field, declared?, observed?} for every leaf that differs.
+
+    Structs recurse key by key; lists and scalars compare as whole values.
+    A key missing on one side leaves that side out of its entry.
+    """
+    if isinstance(declared, dict) and isinstance(observed, dict):
+        out = []
+        for key in sorted(set(declared) | set(observed)):
+            sub = f"{path}.{key}" if path else key
+            if key not in observed:
+                out.append({"field": sub, "declared": declared[key]})
+            elif key not in declared:
+                out.append({"field": sub, "observed": observed[key]})
+            else:
+                out.extend(deep_diff(declared[key], observed[key], sub))
+        return out
+    if declared != observed:
+        return [{"field": path or ".", "declared": declared, "observed": observed}]
+    return []
+
+
+def load_rules(path: str | None) -> list[dict]:
+    if not path:
+        return []
+    with open(path) as f:
+        rules = json.load(f)
+    if isinstance(rules, dict):
+        rules = rules.get("rules", [])
+    for i, rule in enumerate(rules):
+        if rule.get("severity") not in SEVERITIES:
+            raise ValueError(f"{path}: rule {i} severity must be one of {', '.join(SEVERITIES)}")
+    return rules
+
+
+def classify(resource: str, field: str, types: list[str], rules: list[dict]) -> dict:
+    """First matching rule -> {severity, action?}."""
+    for rule in rules:
+        if "resource" in rule and not fnmatch.fnmatchcase(resource, rule["resource"]):
+            continue
+        if "field" in rule and not fnmatch.fnmatchcase(field, rule["field"]):
+            continue
+        if "type" in rule and rule["type"] not in types:
+            continue
+        return rule
+    return {"severity": DEFAULT_SEVERITY}
+
+
+def drift_entries(name: str, diffs: list, types: list[str], rules: list[dict]) -> list[dict]:
+    entries = []
+    for diff in diffs:
+        rule = classify(name, diff["field"], types, rules)
+        entry = {"resource": name, **diff, "severity": rule["severity"]}
+        if rule.get("action"):
+            values = {"declared": "", "observed": "", **entry}
+            entry["action"] = ACTION_FIELD.sub(lambda m: str(values[m.group(1)]), rule["action"])
+        entries.append(entry)
+    return entries
+
+
+# ── Engine ─────────────────────────────────────────────────────────
+
+
+def empty_state() -> dict:
+    return {"version": STATE_VERSION, "declared": {}, "observed": {}, "diffs": {}}
+
+
+def detect(declared_path: str, observed_path: str, rules: list[dict],
+           fields: set[str] | None, ignore: set[str], state: dict) -> tuple[dict, dict, dict]:
+    """One drift pass. Returns (report, new state, stats).
+
+    Pass 1 hashes every observed resource. Pass 2 streams declared and
+    sorts each name into missing, in sync (equal hashes), reused (both
+    hashes unchanged since `state`) or pending. Pass 3 re-streams
+    observed and deep-diffs the pending ones only.
+    """
+    obs_hash = {}
+    for name, r in iter_resources(observed_path):
+        obs_hash[name] = node_hash(project(r, fields, ignore))
+
+    new = empty_state()
+    new["observed"] = obs_hash
+    missing = {}
+    pending = {}
+    stats = {"in_sync": 0, "reused": 0, "diffed": 0}
+    for name, r in iter_resources(declared_path):
+        proj = project(r, fields, ignore)
+        h = node_hash(proj)
+        new["declared"][name] = h
+        if name not in obs_hash:
+            missing[name] = True
+        elif h == obs_hash[name]:
+            stats["in_sync"] += 1
+        elif (state["declared"].get(name) == h and state["observed"].get(name) == obs_hash[name]
+              and name in state["diffs"]):
+            new["diffs"][name] = state["diffs"][name]
+            stats["reused"] += 1
+        else:
+            pending[name] = (proj, sorted(r.get("@type") or {}))
+
+    if pending:
+        for name, r in iter_resources(observed_path):
+            if name in pending:
+                proj, types = pending[name]
+                new["diffs"][name] = {
+                    "types": types,
+                    "diffs": deep_diff(proj, project(r, fields, ignore)),
+                }
+                stats["diffed"] += 1
+
+    drifts = []
+    for name in sorted(new["diffs"]):
+        d = new["diffs"][name]
+        drifts.extend(drift_entries(name, d["diffs"], d["types"], rules))
+    extra = {n: True for n in sorted(obs_hash) if n not in new["declared"]}
+    missing = dict(sorted(missing.items()))
+
+    report = {
+        "missing": missing,
+        "extra": extra,
+        "drifts": drifts,
+        "summary": {
+            "total_declared": len(new["declared"]),
+            "total_observed": len(obs_hash),
+            "total_missing": len(missing),
+            "total_extra": len(extra),
+            "total_drifted": len(drifts),
+            "in_sync": not missing and not extra and not drifts,
+        },
+    }
+    return report, new, stats
+
+
+def load_state(path: str | None) -> dict:
+    if not path or not os.path.exists(path):
+        return empty_state()
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        return empty_state()
+    return {**empty_state(), **state}
+
+
+def save_state(path: str, state: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def write_report(report: dict, out_path: str | None, ndjson: bool) -> None:
+    out = open(out_path + ".tmp", "w") if out_path else sys.stdout
+    if ndjson:
+        for entry in report["drifts"]:
+            out.write(json.dumps(entry) + "\n")
+    else:
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    if out_path:
+        out.close()
+        os.replace(out_path + ".tmp", out_path)
+    else:
+        out.flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Streaming, hash-indexed drift detection (#DriftReport / #DriftEntry shape)"
+    )
+    parser.add_argument("declared", help="Declared resources: JSON object or NDJSON")
+    parser.add_argument("observed", help="Observed snapshot: JSON object or NDJSON")
+    parser.add_argument("--rules", metavar="FILE", help="Severity rules JSON (first match wins)")
+    parser.add_argument("--fields", help="Compare only these top-level fields (comma-separated)")
+    parser.add_argument("--ignore", default="", help="Top-level fields to leave out (comma-separated)")
+    parser.add_argument("--ndjson", action="store_true", help="Emit drift entries one per line")
+    parser.add_argument("--state", metavar="FILE", help="Hash state carried between runs")
+    parser.add_argument("--interval", type=float, metavar="SECONDS",
+                        help="Re-check every SECONDS, reusing the previous run's hashes")
+    parser.add_argument("--out", metavar="FILE", help="Write the report here (replaced atomically)")
+    args = parser.parse_args()
+
+    try:
+        rules = load_rules(args.rules)
+    except ValueError as e:
+        parser.error(str(e))
+    fields = {f for f in args.fields.split(",") if f} if args.fields else None
+    ignore = {f for f in args.ignore.split(",") if f}
+    state = load_state(args.state)
+
+    while True:
+        started = time.monotonic()
+        try:
+            report, state, stats = detect(args.declared, args.observed, rules, fields, ignore, state)
+        except ValueError as e:
+            parser.error(str(e))
+        write_report(report, args.out, args.ndjson)
+        if args.state:
+            save_state(args.state, state)
+
+        s = report["summary"]
+        by_severity = {}
+        for entry in report["drifts"]:
+            by_severity[entry["severity"]] = by_severity.get(entry["severity"], 0) + 1
+        severities = ", ".join(f"{n} {k}" for k, n in sorted(by_severity.items())) or "none"
+        sys.stderr.write(f"Drift: {s['total_declared']} declared, {s['total_observed']} observed, "
+                         f"{s['total_missing']} missing, {s['total_extra']} extra, "
+                         f"{s['total_drifted']} drifted ({severities}); "
+                         f"{stats['in_sync']} hash-equal, {stats['reused']} reused, "
+                         f"{stats['diffed']} diffed in {time.monotonic() - started:.2f}s\n")
+
+        if args.interval is None:
+            return 0 if s["in_sync"] else 1
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
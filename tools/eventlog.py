@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""Append-only #ContextEvent log with an incremental #ContextEventLog projector.
+
+#ContextEventLog in patterns/context_event.cue projects a CUE list of
+vocab.#ContextEvent records, so the list is assembled by hand and the whole
+event_report is recomputed every time. This module keeps the events on disk
+instead:
+
+  segments     <dir>/events-NNNNNN.jsonl, one #ContextEvent per line. A new
+               segment starts every --segment-events events (default 10000)
+  time index   <dir>/index.json, listing each segment's file, first sequence
+               number, count and first/last timestamp. Time-range reads
+               open only the segments that overlap the range
+  projector    renders only the events past the last projected sequence
+               number into an existing event_report JSON-LD. It keeps the
+               same @ids as #ContextEventLog over the whole log
+
+Every event is a #ContextEvent, with the optional duration_ms, input_size and
+output_size metrics. Tools record events through record(). It is a no-op
+unless $APERCUE_EVENT_LOG names a log directory, so one environment
+variable switches on the audit trail for toposort.py (project),
+compliance.py, contracts.py and validate-w3c.py (validate) and federate.py
+(merge). `run` wraps any other
+command, such as a build export, and records it.
+
+Usage:
+    export APERCUE_EVENT_LOG=.cache/events
+    python3 tools/toposort.py ./self-charter/charter.cue --cue > precomputed.cue
+    python3 tools/eventlog.py run --type export --source self-charter --target site \\
+        --out site/data/projections.json -- cue export ./self-charter/ -e projections --out json
+    python3 tools/eventlog.py list --since 2026-03-01T00:00:00
+    python3 tools/eventlog.py project --out site/data/event-report.jsonld
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+ENV_VAR = "APERCUE_EVENT_LOG"
+SEGMENT_EVENTS = 10000
+EVENT_TYPES = ("merge", "validate", "project", "export")
+OUTCOMES = ("success", "conflict", "partial")
+DEFAULT_AGENT = "urn:agent:federation-controller"
+CONTEXT_FILE = Path(__file__).resolve().parent.parent / "site" / "vocab" / "context.jsonld"
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def safe_id(text: str) -> str:
+    """Coerce a path or label into a #SafeID domain name."""
+    text = re.sub(r"[^a-zA-Z0-9_.-]+", "-", text).strip("-.") or "unknown"
+    return text if text[0].isalpha() else "d-" + text
+
+
+def domain_of(source: str) -> str:
+    """Domain name for a tool's input: its package directory, else its file stem."""
+    if source == "-":
+        return "stdin"
+    path = Path(source).resolve()
+    if path.is_file() and path.suffix == ".cue":
+        path = path.parent
+    return safe_id(path.name if path.is_dir() else path.stem)
+
+
+# ── Log ────────────────────────────────────────────────────────────
+
+
+class EventLog:
+    """Segmented JSONL event store with a time index; appends are flock-serialized."""
+
+    def __init__(self, root: str, segment_events: int = SEGMENT_EVENTS):
+        self.root = Path(root)
+        self.segment_events = segment_events
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _lock(self):
+        import fcntl  # POSIX-only; imported here so tools without a log stay portable
+
+        with open(self.root / ".lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def segments(self) -> list[dict]:
+        try:
+            with open(self.root / "index.json") as f:
+                return json.load(f)["segments"]
+        except FileNotFoundError:
+            return []
+
+    def _save_index(self, segments: list[dict]) -> None:
+        tmp = self.root / "index.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segments": segments}, f, indent=1)
+        os.replace(tmp, self.root / "index.json")
+
+    def append(self, event: dict) -> int:
+        """Append one event; returns its sequence number."""
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock():
+            segments = self.segments()
+            if not segments or segments[-1]["count"] >= self.segment_events:
+                first_seq = segments[-1]["first_seq"] + segments[-1]["count"] if segments else 0
+                segments.append({
+                    "file": f"events-{len(segments) + 1:06d}.jsonl",
+                    "first_seq": first_seq,
+                    "count": 0,
+                    "first": event["timestamp"],
+                    "last": event["timestamp"],
+                })
+            seg = segments[-1]
+            with open(self.root / seg["file"], "a") as f:
+                f.write(line)
+            seq = seg["first_seq"] + seg["count"]
+            seg["count"] += 1
+            seg["first"] = min(seg["first"], event["timestamp"])
+            seg["last"] = max(seg["last"], event["timestamp"])
+            self._save_index(segments)
+        return seq
+
+    def read(self, start: int = 0, since: str | None = None, until: str | None = None):
+        """Yield (seq, event) from sequence number start, within [since, until].
+
+        Segments entirely before start or outside the time range are
+        skipped via the index without being opened.
+        """
+        for seg in self.segments():
+            if seg["first_seq"] + seg["count"] <= start:
+                continue
+            if (since and seg["last"] < since) or (until and seg["first"] > until):
+                continue
+            with open(self.root / seg["file"]) as f:
+                for k, line in enumerate(f):
+                    seq = seg["first_seq"] + k
+                    if seq < start or k >= seg["count"]:
+                        continue
+                    event = json.loads(line)
+                    if (since and event["timestamp"] < since) or (until and event["timestamp"] > until):
+                        continue
+                    yield seq, event
+
+    def count(self) -> int:
+        segments = self.segments()
+        return segments[-1]["first_seq"] + segments[-1]["count"] if segments else 0
+
+
+# ── Recording ──────────────────────────────────────────────────────
+
+
+def make_event(type: str, source_domain: str, target_domain: str, resources=(), outcome: str = "success",
+               duration_ms: float | None = None, input_size: int | None = None,
+               output_size: int | None = None, description: str | None = None,
+               provenance_ref: str | None = None, timestamp: str | None = None) -> dict:
+    """A vocab.#ContextEvent dict; optional fields are omitted when None."""
+    if type not in EVENT_TYPES:
+        raise ValueError(f"event type must be one of {', '.join(EVENT_TYPES)}")
+    if outcome not in OUTCOMES:
+        raise ValueError(f"outcome must be one of {', '.join(OUTCOMES)}")
+    event = {
+        "timestamp": timestamp or now(),
+        "type": type,
+        "source_domain": safe_id(source_domain),
+        "target_domain": safe_id(target_domain),
+        "resources": sorted({safe_id(r) for r in resources}),
+        "outcome": outcome,
+    }
+    optional = {
+        "provenance_ref": provenance_ref,
+        "description": description,
+        "duration_ms": round(duration_ms, 3) if duration_ms is not None else None,
+        "input_size": input_size,
+        "output_size": output_size,
+    }
+    event.update({k: v for k, v in optional.items() if v is not None})
+    return event
+
+
+def record(type: str, source_domain: str, target_domain: str, started: float | None = None,
+           log: str | None = None, **fields) -> dict | None:
+    """Append an event to $APERCUE_EVENT_LOG (or log); no-op when neither is set.
+
+    started is a time.perf_counter() reading; the duration is measured
+    up to now. A log that cannot be written warns on stderr and never
+    fails the calling tool.
+    """
+    root = log or os.environ.get(ENV_VAR)
+    if not root:
+        return None
+    if started is not None:
+        fields["duration_ms"] = (time.perf_counter() - started) * 1000
+    event = make_event(type, source_domain, target_domain, **fields)
+    try:
+        EventLog(root).append(event)
+    except OSError as e:
+        sys.stderr.write(f"eventlog: cannot append to {root}: {e}\n")
+        return None
+    return event
+
+
+# ── Projection ─────────────────────────────────────────────────────
+
+
+def event_id(seq: int, ev: dict) -> str:
+    return f"urn:event:{ev['source_domain']}-{ev['target_domain']}-{ev['type']}-{seq}"
+
+
+def activity(seq: int, ev: dict, agent: str) -> dict:
+    """One #ContextEventLog event_report activity node."""
+    node = {
+        "@type": ["prov:Activity", "apercue:ContextEvent"],
+        "@id": event_id(seq, ev),
+        "dcterms:title": f"{ev['type']}: {ev['source_domain']} → {ev['target_domain']}",
+        "dcterms:type": ev["type"],
+        "prov:startedAtTime": ev["timestamp"],
+        "prov:wasAssociatedWith": {"@id": agent},
+        "apercue:outcome": ev["outcome"],
+        "prov:used": [{"@id": "urn:domain:" + ev["source_domain"]}]
+                     + [{"@id": "urn:resource:" + r} for r in ev["resources"]],
+        "prov:generated": {"@id": "urn:domain:" + ev["target_domain"]},
+    }
+    if "provenance_ref" in ev:
+        node["prov:wasInformedBy"] = {"@id": ev["provenance_ref"]}
+    if "description" in ev:
+        node["dcterms:description"] = ev["description"]
+    if "duration_ms" in ev:
+        node["time:hasDuration"] = {
+            "@type": "time:Duration",
+            "time:numericDuration": ev["duration_ms"] / 1000,
+            "time:unitType": {"@id": "time:unitSecond"},
+        }
+    if "input_size" in ev:
+        node["apercue:inputSize"] = ev["input_size"]
+    if "output_size" in ev:
+        node["apercue:outputSize"] = ev["output_size"]
+    node["time:hasTime"] = {
+        "@type": "time:Instant",
+        "@id": f"urn:instant:{ev['source_domain']}-{ev['target_domain']}-{seq}",
+        "time:inXSDDateTimeStamp": ev["timestamp"],
+    }
+    return node
+
+
+def load_context(path: str | None) -> dict:
+    with open(path or CONTEXT_FILE) as f:
+        return json.load(f)["@context"]
+
+
+def project(log: EventLog, out_path: str, agent: str = DEFAULT_AGENT, context_path: str | None = None) -> dict:
+    """Render events past the last projected one into out_path's event_report.
+
+    <out_path>.state.json remembers how many events are already in the
+    report. Without it, or when the agent changed, the report is rebuilt
+    from the start of the log.
+    """
+    state_path = out_path + ".state.json"
+    state = {}
+    if os.path.exists(state_path) and os.path.exists(out_path):
+        with open(state_path) as f:
+            state = json.load(f)
+    if state.get("agent") != agent:
+        state = {}
+    start = state.get("projected", 0)
+
+    activities, domains, members = [], {}, []
+    context = None
+    if start:
+        with open(out_path) as f:
+            report = json.load(f)
+        context = report["@context"]
+        for node in report["@graph"]:
+            types = node["@type"] if isinstance(node["@type"], list) else [node["@type"]]
+            if "apercue:ContextEvent" in types:
+                activities.append(node)
+            elif "prov:Entity" in types:
+                domains[node["dcterms:title"]] = node
+            elif "apercue:ContextEventLog" in types:
+                members = node["prov:hadMember"]
+    context = context or load_context(context_path)
+
+    new = 0
+    seq = start - 1
+    for seq, ev in log.read(start):
+        activities.append(activity(seq, ev, agent))
+        members.append({"@id": event_id(seq, ev)})
+        for d in (ev["source_domain"], ev["target_domain"]):
+            domains.setdefault(d, {"@type": "prov:Entity", "@id": "urn:domain:" + d, "dcterms:title": d})
+        new += 1
+
+    graph = activities + [domains[d] for d in sorted(domains)] + [
+        {
+            "@type": ["prov:Collection", "apercue:ContextEventLog"],
+            "@id": "urn:collection:context-event-log",
+            "dcterms:title": "Context Event Log",
+            "prov:hadMember": members,
+        },
+        {"@type": ["prov:Agent", "prov:SoftwareAgent"], "@id": agent},
+    ]
+    tmp = out_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"@context": context, "@graph": graph}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, out_path)
+    with open(state_path, "w") as f:
+        json.dump({"projected": seq + 1, "agent": agent}, f)
+    return {"events": len(activities), "new": new, "domains": len(domains)}
+
+
+def summarize(events) -> dict:
+    """#ContextEventLog.summary, plus duration totals per type."""
+    by_type = {t: 0 for t in EVENT_TYPES}
+    by_outcome = {o: 0 for o in OUTCOMES}
+    duration = {t: 0.0 for t in EVENT_TYPES}
+    domains = set()
+    total = 0
+    for _, ev in events:
+        total += 1
+        by_type[ev["type"]] += 1
+        by_outcome[ev["outcome"]] += 1
+        duration[ev["type"]] += ev.get("duration_ms", 0)
+        domains.update((ev["source_domain"], ev["target_domain"]))
+    return {
+        "total_events": total,
+        "domains": len(domains),
+        "by_type": by_type,
+        "by_outcome": by_outcome,
+        "duration_ms_by_type": {t: round(d, 3) for t, d in duration.items()},
+    }
+
+
+# ── CLI ────────────────────────────────────────────────────────────
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Append-only #ContextEvent log and incremental projector")
+    parser.add_argument("--log", default=os.environ.get(ENV_VAR),
+                        help=f"Log directory (default: ${ENV_VAR})")
+    parser.add_argument("--segment-events", type=int, default=SEGMENT_EVENTS, metavar="N",
+                        help=f"Events per segment file (default: {SEGMENT_EVENTS})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run a command and record it as an event")
+    p_run.add_argument("--type", choices=EVENT_TYPES, default="export")
+    p_run.add_argument("--source", required=True, help="Source domain")
+    p_run.add_argument("--target", required=True, help="Target domain")
+    p_run.add_argument("--out", metavar="FILE",
+                       help="Write the command's stdout here; its size becomes output_size")
+    p_run.add_argument("--description")
+    p_run.add_argument("cmd", nargs=argparse.REMAINDER, help="-- command ...")
+
+    p_list = sub.add_parser("list", help="Print events as JSON lines")
+    p_list.add_argument("--since", help="RFC 3339 lower bound")
+    p_list.add_argument("--until", help="RFC 3339 upper bound")
+
+    p_sum = sub.add_parser("summary", help="#ContextEventLog summary with duration totals")
+    p_sum.add_argument("--since")
+    p_sum.add_argument("--until")
+
+    p_proj = sub.add_parser("project", help="Render new events into an event_report JSON-LD")
+    p_proj.add_argument("--out", required=True, metavar="FILE")
+    p_proj.add_argument("--agent", default=DEFAULT_AGENT, help="prov:Agent @id (as #ContextEventLog.Agent)")
+    p_proj.add_argument("--context", metavar="FILE", help="JSON-LD context (default: site/vocab/context.jsonld)")
+    args = parser.parse_args()
+
+    if not args.log:
+        parser.error(f"no log directory: pass --log or set ${ENV_VAR}")
+    log = EventLog(args.log, args.segment_events)
+
+    if args.command == "run":
+        cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+        if not cmd:
+            parser.error("run needs a command after --")
+        started = time.perf_counter()
+        out = open(args.out + ".tmp", "wb") if args.out else None
+        rc = subprocess.run(cmd, stdout=out).returncode
+        size = None
+        if out:
+            out.close()
+            size = os.path.getsize(args.out + ".tmp")
+            if rc == 0:
+                os.replace(args.out + ".tmp", args.out)
+            else:
+                os.remove(args.out + ".tmp")
+        log.append(make_event(args.type, args.source, args.target,
+                              duration_ms=(time.perf_counter() - started) * 1000,
+                              outcome="success" if rc == 0 else "partial", output_size=size,
+                              description=args.description or " ".join(cmd) + ("" if rc == 0 else f" (exit {rc})")))
+        return rc
+
+    if args.command == "list":
+        for seq, ev in log.read(since=args.since, until=args.until):
+            print(json.dumps({"seq": seq, **ev}, ensure_ascii=False))
+        return 0
+
+    if args.command == "summary":
+        json.dump(summarize(log.read(since=args.since, until=args.until)), sys.stdout, indent=2)
+        print()
+        return 0
+
+    stats = project(log, args.out, args.agent, args.context)
+    sys.stderr.write(f"Event log: {stats['new']} new of {stats['events']} events projected, "
+                     f"{stats['domains']} domains, {len(log.segments())} segments -> {args.out}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
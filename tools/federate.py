@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""Streaming federation merge — #FederatedMerge for many domains.
+
+#FederatedMerge in patterns/federation.cue evaluates every domain's graph
+in one CUE process. It detects collisions by unifying ownership structs,
+so it stops at the first conflict and runs out of memory with dozens of
+domains. This tool reads each domain's exported #FederatedContext (or just
+its `jsonld`) one file at a time:
+
+  @id index        hash table @id -> owning domain. Every namespace and @id
+                   collision is reported with all of its owners, and only the
+                   first owner's node is kept
+  cross-edges      validated against the index with #FederatedMerge's
+                   messages, then added as dcterms:requires links
+  merged @graph    written to --out incrementally, node by node, followed
+                   by the cross-edge triples, under the first domain's
+                   @context without its @base (every @id is absolute)
+  closure          dcterms:requires across all domains, including cross-edges:
+                   the domains each domain transitively depends on, and for
+                   every --impact target, the @ids that transitively depend on
+                   it, grouped by domain
+
+Arguments are FILE or DOMAIN=FILE. Without DOMAIN=, the domain comes from
+the export's Domain field, or else from the file name. The namespace comes
+from Namespace or the context's @base. Exits 1 on any collision,
+cross-edge error or dcterms:requires cycle (a cyclic merge cannot feed
+#Graph).
+
+Usage:
+    cue export ./team-a/ -e ctx --out json > a.json
+    python3 tools/federate.py a.json b.json c.json --out merged.jsonld
+    python3 tools/federate.py a.json b.json --cross-edges edges.json --impact a:postgres
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict, deque
+
+from eventlog import record
+
+REQUIRES = "dcterms:requires"
+
+
+def load_domain(spec: str) -> tuple[str, str, dict, list]:
+    """DOMAIN=FILE or FILE -> (domain, namespace, context, @graph)."""
+    domain, sep, path = spec.partition("=")
+    if not sep:
+        domain, path = None, spec
+    with open(path) as f:
+        doc = json.load(f)
+    jsonld = doc.get("jsonld", doc)
+    context = jsonld.get("@context") or {}
+    domain = domain or doc.get("Domain") or os.path.splitext(os.path.basename(path))[0]
+    namespace = doc.get("Namespace") or context.get("@base")
+    if not namespace:
+        raise ValueError(f"{path}: no Namespace or @context @base")
+    return domain, namespace, context, jsonld.get("@graph") or []
+
+
+CROSS_EDGE_KEYS = ("source_domain", "source", "target_domain", "target")
+
+
+def load_cross_edges(path: str) -> list[dict]:
+    """JSON list of #CrossEdge; every entry needs all four string keys."""
+    with open(path) as f:
+        edges = json.load(f)
+    if not isinstance(edges, list):
+        raise ValueError(f"{path}: expected a JSON list of cross-edges")
+    for i, edge in enumerate(edges):
+        missing = [k for k in CROSS_EDGE_KEYS if not isinstance(edge, dict) or not isinstance(edge.get(k), str)]
+        if missing:
+            raise ValueError(f"{path}: cross-edge {i} lacks string {', '.join(missing)}")
+    return edges
+
+
+def requires_of(node: dict) -> list[str]:
+    req = node.get(REQUIRES) or []
+    if isinstance(req, dict):
+        req = [req]
+    return [r["@id"] if isinstance(r, dict) else r for r in req]
+
+
+class Federation:
+    """@id index, edges and collisions accumulated one domain at a time."""
+
+    def __init__(self, out=None):
+        self.out = out
+        self.domains: list[str] = []
+        self.namespaces: dict[str, str] = {}
+        self.ns_owners: dict[str, list[str]] = defaultdict(list)
+        self.ids: dict[str, int] = {}
+        self.owner: list[int] = []
+        self.id_owners: dict[str, list[str]] = {}
+        self.names: dict[str, set] = {}
+        self.edges: list[tuple[int, str]] = []
+        self.written = 0
+        self.context = None
+
+    def _write(self, node: dict) -> None:
+        if self.out is None:
+            return
+        if self.written == 0:
+            self.out.write('{\n"@context": ' + json.dumps(self.context) + ',\n"@graph": [\n')
+        else:
+            self.out.write(",\n")
+        self.out.write(json.dumps(node))
+        self.written += 1
+
+    def add_domain(self, domain: str, namespace: str, context: dict, graph: list) -> None:
+        if domain in self.namespaces:
+            raise ValueError(f"domain '{domain}' given twice")
+        if self.context is None:
+            self.context = {k: v for k, v in context.items() if k != "@base"}
+        d = len(self.domains)
+        self.domains.append(domain)
+        self.namespaces[domain] = namespace
+        self.ns_owners[namespace].append(domain)
+        names = self.names[domain] = set()
+
+        for node in graph:
+            nid = node.get("@id")
+            if not isinstance(nid, str):
+                continue
+            if nid.startswith(namespace):
+                names.add(nid[len(namespace):])
+            if nid in self.ids:
+                owners = self.id_owners.setdefault(nid, [self.domains[self.owner[self.ids[nid]]]])
+                owners.append(domain)
+                continue
+            i = self.ids[nid] = len(self.owner)
+            self.owner.append(d)
+            for target in requires_of(node):
+                self.edges.append((i, target))
+            self._write(node)
+
+    def add_cross_edges(self, cross_edges: list) -> list[dict]:
+        """#FederatedMerge._cross_edge_errors, then links for the valid edges."""
+        errors = []
+        for side in ("source", "target"):
+            for edge in cross_edges:
+                if edge[f"{side}_domain"] not in self.namespaces:
+                    errors.append({"error": f"{side} domain '{edge[side + '_domain']}' not in Sources"})
+        for side in ("source", "target"):
+            for edge in cross_edges:
+                d = edge[f"{side}_domain"]
+                if d in self.names and edge[side] not in self.names[d]:
+                    errors.append({"error": f"resource '{edge[side]}' not found in domain '{d}'"})
+
+        for edge in cross_edges:
+            sd, td = edge["source_domain"], edge["target_domain"]
+            if sd not in self.namespaces or td not in self.namespaces:
+                continue
+            source = self.namespaces[sd] + edge["source"]
+            target = self.namespaces[td] + edge["target"]
+            if source in self.ids:
+                self.edges.append((self.ids[source], target))
+            self._write({"@id": source, REQUIRES: {"@id": target}})
+        return errors
+
+    def finish(self) -> None:
+        if self.out is None:
+            return
+        if self.written == 0:
+            self.out.write('{\n"@context": ' + json.dumps(self.context or {}) + ',\n"@graph": [')
+        self.out.write("\n]\n}\n")
+
+    # ── Cross-domain closure ───────────────────────────────────────
+
+    def adjacency(self) -> tuple[list[list[int]], list[list[int]], int]:
+        """(deps, dependents, unresolved) over @id positions."""
+        deps = [[] for _ in self.owner]
+        dependents = [[] for _ in self.owner]
+        unresolved = 0
+        for i, target in self.edges:
+            j = self.ids.get(target)
+            if j is None:
+                unresolved += 1
+                continue
+            deps[i].append(j)
+            dependents[j].append(i)
+        return deps, dependents, unresolved
+
+    def domain_closure(self, deps, dependents) -> tuple[dict, list[str]]:
+        """Domains each domain transitively depends on; cycle members if any.
+
+        One Kahn pass over @ids carries a bitmask of the domains upstream
+        of each node; a domain's closure is the OR over its nodes.
+        """
+        n = len(self.owner)
+        indeg = [len(d) for d in deps]
+        queue = deque(i for i in range(n) if indeg[i] == 0)
+        upstream = [0] * n
+        seen = 0
+        while queue:
+            i = queue.popleft()
+            seen += 1
+            for c in dependents[i]:
+                upstream[c] |= upstream[i] | (1 << self.owner[i])
+                indeg[c] -= 1
+                if indeg[c] == 0:
+                    queue.append(c)
+        cycle = []
+        if seen != n:
+            by_pos = {i: nid for nid, i in self.ids.items()}
+            cycle = sorted(by_pos[i] for i in range(n) if indeg[i] > 0)
+
+        per_domain = [0] * len(self.domains)
+        for i, mask in enumerate(upstream):
+            per_domain[self.owner[i]] |= mask
+        closure = {}
+        for d, mask in enumerate(per_domain):
+            mask &= ~(1 << d)
+            closure[self.domains[d]] = {
+                self.domains[k]: True for k in range(len(self.domains)) if mask >> k & 1
+            }
+        return closure, cycle
+
+    def impact(self, target: str, dependents) -> dict:
+        """@ids transitively depending on target, grouped by domain."""
+        start = self.resolve(target)
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for c in dependents[queue.popleft()]:
+                if c not in seen:
+                    seen.add(c)
+                    queue.append(c)
+        seen.discard(start)
+        by_pos = {i: nid for nid, i in self.ids.items()}
+        grouped = defaultdict(dict)
+        for i in sorted(seen, key=by_pos.get):
+            grouped[self.domains[self.owner[i]]][by_pos[i]] = True
+        return {"target": by_pos[start], "affected": dict(sorted(grouped.items())), "count": len(seen)}
+
+    def resolve(self, ref: str) -> int:
+        """Full @id or DOMAIN:name -> position."""
+        if ref in self.ids:
+            return self.ids[ref]
+        domain, sep, name = ref.partition(":")
+        if sep and domain in self.namespaces and self.namespaces[domain] + name in self.ids:
+            return self.ids[self.namespaces[domain] + name]
+        raise KeyError(f"--impact {ref!r}: no such @id or DOMAIN:name")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Stream-merge #FederatedContext exports with collision and cross-edge checks"
+    )
+    parser.add_argument("sources", nargs="+", metavar="[DOMAIN=]FILE",
+                        help="Exported #FederatedContext (or its jsonld) per domain")
+    parser.add_argument("--cross-edges", metavar="FILE",
+                        help="JSON list of {source_domain, source, target_domain, target}")
+    parser.add_argument("--out", metavar="FILE", help="Write the merged JSON-LD here, incrementally")
+    parser.add_argument("--impact", action="append", default=[], metavar="ID",
+                        help="Cross-domain dependents of an @id or DOMAIN:name (repeatable)")
+    args = parser.parse_args()
+
+    out = open(args.out, "w") if args.out else None
+    fed = Federation(out)
+    timings = {}
+    try:
+        for spec in args.sources:
+            started = time.perf_counter()
+            domain = load_domain(spec)
+            before = len(fed.owner)
+            fed.add_domain(*domain)
+            timings[domain[0]] = (started, time.perf_counter(), len(domain[3]), len(fed.owner) - before)
+        cross_edges = load_cross_edges(args.cross_edges) if args.cross_edges else []
+        errors = fed.add_cross_edges(cross_edges)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    finally:
+        fed.finish()
+        if out:
+            out.close()
+
+    deps, dependents, unresolved = fed.adjacency()
+    closure, cycle = fed.domain_closure(deps, dependents)
+    ns_collisions = {ns: owners for ns, owners in sorted(fed.ns_owners.items()) if len(owners) > 1}
+    impacts = []
+    for ref in args.impact:
+        try:
+            impacts.append(fed.impact(ref, dependents))
+        except KeyError as e:
+            parser.error(str(e.args[0]))
+
+    report = {
+        "namespace_collisions": ns_collisions,
+        "id_collisions": dict(sorted(fed.id_owners.items())),
+        "cross_edge_errors": errors,
+        "domain_closure": closure,
+        "cycle": cycle,
+        "impact": impacts,
+        "summary": {
+            "source_count": len(fed.domains),
+            "total_resources": len(fed.owner),
+            "cross_edges": len(cross_edges),
+            "cross_edge_errors": len(errors),
+            "namespace_collisions": len(ns_collisions),
+            "id_collisions": len(fed.id_owners),
+            "unresolved_requires": unresolved,
+            "namespaces": fed.namespaces,
+            "valid": not errors and not ns_collisions and not fed.id_owners and not cycle,
+        },
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+    s = report["summary"]
+    sys.stderr.write(f"Federation: {s['source_count']} domains, {s['total_resources']} resources, "
+                     f"{s['id_collisions']} @id / {s['namespace_collisions']} namespace collisions, "
+                     f"{s['cross_edges']} cross-edges ({s['cross_edge_errors']} errors)"
+                     f"{', cycle across ' + str(len(cycle)) + ' @ids' if cycle else ''}\n")
+
+    target = os.path.splitext(os.path.basename(args.out))[0] if args.out else "federation"
+    for domain, (started, finished, nodes, kept) in timings.items():
+        collided = [nid for nid, owners in fed.id_owners.items() if domain in owners]
+        ns = fed.namespaces[domain]
+        record("merge", domain, target, duration_ms=(finished - started) * 1000,
+               resources=[nid[len(ns):] if nid.startswith(ns) else nid for nid in collided],
+               outcome="conflict" if collided or len(fed.ns_owners[ns]) > 1 else "success",
+               input_size=nodes, output_size=kept,
+               description=f"federated into {target} with {len(fed.domains) - 1} other domains")
+    return 0 if s["valid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
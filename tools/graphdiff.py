@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Linear-time graph diff with incremental closure deltas — #GraphDiff for large graphs.
+
+#GraphDiff in patterns/analysis.cue needs both versions fully evaluated
+in CUE first, which does not finish on release-sized graphs. This tool
+reads the two resource maps directly and produces the same fields:
+
+  added_nodes, removed_nodes   {name: {type: true}}
+  type_changes                 {name: {added_types, removed_types}}
+  added_edges, removed_edges   [{source, target}]
+  summary                      counts + has_changes
+
+Each node's canonical form (types, edges, other fields) is hashed; nodes
+with equal hashes are skipped without a field-by-field comparison, so the
+structural diff is O(V+E).
+
+It also reports closure_changes: how each node's ancestor and dependent
+sets moved. Neither closure is computed in full. After-side ancestors are
+recomputed only for nodes downstream of a changed edge, and Before-side
+ancestors only for those nodes, removed nodes and their direct
+dependencies; everywhere else the two sides agree. Dependent deltas are
+the inverse of the ancestor deltas. --before-closure loads Before
+ancestors from `toposort.py` JSON output instead.
+
+Usage:
+    python3 tools/graphdiff.py before.json after.json > diff.json
+    python3 tools/graphdiff.py v1/charter.cue v2/charter.cue --no-closure
+    python3 tools/toposort.py v1.json > v1-topo.json
+    python3 tools/graphdiff.py v1.json v2.json --before-closure v1-topo.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import defaultdict, deque
+
+from toposort import load_resources, toposort
+
+
+def node_hash(resource: dict) -> str:
+    """Hash of a resource's canonical JSON form (keys sorted, sets as sorted keys)."""
+    return hashlib.sha256(json.dumps(resource, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _types(resource: dict) -> dict:
+    return {t: True for t in sorted(resource.get("@type") or {})}
+
+
+def _deps(resource: dict) -> dict:
+    return resource.get("depends_on") or {}
+
+
+def structural_diff(before: dict, after: dict) -> dict:
+    """Node, type and edge delta between two resource maps, in #GraphDiff shape.
+
+    Also returns changed_nodes: names present in both whose canonical
+    form differs for any reason, including fields #GraphDiff ignores.
+    """
+    added_nodes = {n: _types(after[n]) for n in sorted(after) if n not in before}
+    removed_nodes = {n: _types(before[n]) for n in sorted(before) if n not in after}
+
+    type_changes = {}
+    changed_nodes = {}
+    added_edges = []
+    removed_edges = []
+    for name in sorted(set(before) | set(after)):
+        b = before.get(name)
+        a = after.get(name)
+        if b is not None and a is not None:
+            if node_hash(b) == node_hash(a):
+                continue
+            changed_nodes[name] = True
+            bt, at = b.get("@type") or {}, a.get("@type") or {}
+            if bt.keys() != at.keys():
+                type_changes[name] = {
+                    "added_types": {t: True for t in sorted(at) if t not in bt},
+                    "removed_types": {t: True for t in sorted(bt) if t not in at},
+                }
+        bd = _deps(b) if b is not None else {}
+        ad = _deps(a) if a is not None else {}
+        added_edges.extend({"source": d, "target": name} for d in sorted(ad) if d not in bd)
+        removed_edges.extend({"source": d, "target": name} for d in sorted(bd) if d not in ad)
+
+    summary = {
+        "added_node_count": len(added_nodes),
+        "removed_node_count": len(removed_nodes),
+        "type_change_count": len(type_changes),
+        "added_edge_count": len(added_edges),
+        "removed_edge_count": len(removed_edges),
+    }
+    summary["has_changes"] = any(summary.values())
+    summary["changed_node_count"] = len(changed_nodes)
+    return {
+        "added_nodes": added_nodes,
+        "removed_nodes": removed_nodes,
+        "type_changes": type_changes,
+        "added_edges": added_edges,
+        "removed_edges": removed_edges,
+        "changed_nodes": changed_nodes,
+        "summary": summary,
+    }
+
+
+def upward(resources: dict, name: str) -> dict[str, bool]:
+    """One node's ancestors, by DFS over depends_on."""
+    seen = {}
+    stack = list(_deps(resources[name]))
+    while stack:
+        dep = stack.pop()
+        if dep not in seen:
+            seen[dep] = True
+            stack.extend(_deps(resources[dep]))
+    return seen
+
+
+def region_ancestors(resources: dict, region: set, extra=()) -> dict[str, dict[str, bool]]:
+    """Ancestor sets for region, extra and the region's outside dependencies.
+
+    Region nodes are closed in topological order; every node outside it
+    that is read is closed once by DFS. Nothing else is materialised, so
+    the cost follows the region and the cone above it rather than V².
+    """
+    out = {name: upward(resources, name) for name in extra if name in resources}
+    order, _ = toposort(resources)
+    for name in order:
+        if name not in region:
+            continue
+        acc = {}
+        for dep in _deps(resources[name]):
+            acc[dep] = True
+            if dep not in out:
+                out[dep] = upward(resources, dep)
+            acc.update(out[dep])
+        out[name] = acc
+    return out
+
+
+def closure_delta(
+    before: dict,
+    after: dict,
+    diff: dict,
+    before_ancestors: dict | None = None,
+) -> tuple[dict, int]:
+    """Per-node ancestor/dependent set changes, recomputed only where edges moved.
+
+    Every node whose ancestor set can differ is downstream (in After) of a
+    changed edge's target or an added node: the changed edge nearest to it
+    on any lost or gained path has its target on an intact After path. So
+    ancestors are recomputed for that region only, in After topological
+    order, taking Before sets as-is for every dependency outside it.
+    Dependent deltas are the inverse relation, plus removed nodes dropping
+    out of their former ancestors' dependents. Before sets are computed
+    only for the nodes this reads (see region_ancestors) unless
+    before_ancestors is given. Returns (changes, number of nodes
+    recomputed).
+    """
+    order, _ = toposort(after)
+
+    seeds = {e["target"] for e in diff["added_edges"] + diff["removed_edges"] if e["target"] in after}
+    seeds.update(diff["added_nodes"])
+
+    children = defaultdict(list)
+    for name, r in after.items():
+        for dep in _deps(r):
+            children[dep].append(name)
+    affected = set(seeds)
+    queue = deque(seeds)
+    while queue:
+        for child in children[queue.popleft()]:
+            if child not in affected:
+                affected.add(child)
+                queue.append(child)
+
+    if before_ancestors is None:
+        region = {n for n in affected if n in before} | set(diff["removed_nodes"])
+        boundary = {dep for n in affected for dep in _deps(after[n]) if dep not in affected}
+        before_ancestors = region_ancestors(before, region, boundary)
+
+    after_ancestors = {}
+    for name in order:
+        if name not in affected:
+            continue
+        acc = {}
+        for dep in _deps(after[name]):
+            acc[dep] = True
+            acc.update(after_ancestors[dep] if dep in affected else before_ancestors[dep])
+        after_ancestors[name] = acc
+
+    changes = defaultdict(lambda: defaultdict(dict))
+    for name in sorted(affected):
+        old = before_ancestors.get(name, {})
+        new = after_ancestors[name]
+        for anc in new:
+            if anc not in old:
+                changes[name]["ancestors_added"][anc] = True
+                changes[anc]["dependents_added"][name] = True
+        for anc in old:
+            if anc not in new:
+                changes[name]["ancestors_removed"][anc] = True
+                if anc in after:
+                    changes[anc]["dependents_removed"][name] = True
+    for name in diff["removed_nodes"]:
+        for anc in before_ancestors.get(name, {}):
+            if anc in after:
+                changes[anc]["dependents_removed"][name] = True
+
+    return {
+        name: {kind: dict(sorted(members.items())) for kind, members in sorted(kinds.items())}
+        for name, kinds in sorted(changes.items())
+    }, len(affected)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Linear-time structural diff of two graph versions (#GraphDiff shape)"
+    )
+    parser.add_argument("before", help="Before: CUE file, JSON file, or package dir")
+    parser.add_argument("after", help="After: CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--no-closure", action="store_true", help="Skip ancestor/dependent deltas")
+    parser.add_argument("--before-closure", metavar="FILE",
+                        help="toposort.py JSON output for Before; reuses its ancestors instead of computing them")
+    args = parser.parse_args()
+
+    before = load_resources(args.before, args.expr)
+    after = load_resources(args.after, args.expr)
+    diff = structural_diff(before, after)
+
+    recomputed = 0
+    if not args.no_closure:
+        before_ancestors = None
+        if args.before_closure:
+            with open(args.before_closure) as f:
+                before_ancestors = json.load(f).get("ancestors")
+            if before_ancestors is None:
+                parser.error(f"{args.before_closure} has no ancestors map (run toposort.py without --fields)")
+        diff["closure_changes"], recomputed = closure_delta(before, after, diff, before_ancestors)
+        diff["summary"]["closure_change_count"] = len(diff["closure_changes"])
+
+    json.dump(diff, sys.stdout, indent=2)
+    print()
+
+    s = diff["summary"]
+    closure = "" if args.no_closure else (
+        f", {s['closure_change_count']} closure changes ({recomputed}/{len(after)} nodes recomputed)"
+    )
+    sys.stderr.write(f"GraphDiff: +{s['added_node_count']}/-{s['removed_node_count']} nodes, "
+                     f"+{s['added_edge_count']}/-{s['removed_edge_count']} edges, "
+                     f"{s['type_change_count']} type changes{closure}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
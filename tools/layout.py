@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""Precomputed layered (Sugiyama) layout for DOT, SVG, and Mermaid output.
+
+#GraphvizDiagram and #MermaidDiagram hand `dot` / Mermaid an unplaced graph,
+and layout dominates render time on large DAGs. Layers are already known
+from toposort depth, so this tool does the rest of the Sugiyama pipeline:
+
+  1. Layering     — depth from toposort.py (no extra work)
+  2. Normalizing  — long edges get dummy nodes, one per skipped layer
+  3. Ordering     — alternating barycenter sweeps, best crossing count kept
+  4. Coordinates  — barycenter-aligned x with minimum separation, y by layer
+
+Results are cached by a hash of the graph and layout parameters, so
+re-rendering an unchanged graph in another format costs only the emit.
+
+Formats:
+  dot      Pinned node positions + routed edges. Render without layout:
+             neato -n2 -Tsvg diagram.dot > diagram.svg
+  svg      Standalone SVG, no Graphviz needed.
+  mermaid  Flowchart with nodes declared layer by layer in crossing-reduced
+           order. Mermaid cannot pin coordinates; declaration order is the
+           only layout hint it honours.
+  json     The raw layout (positions, edge routes, layer order).
+
+Usage:
+    python3 tools/layout.py ./self-charter/charter.cue --format svg > charter.svg
+    python3 tools/layout.py graph.json --format dot --rankdir LR > graph.dot
+    python3 tools/layout.py graph.json --format json --no-cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from toposort import load_resources, toposort
+
+LAYOUT_VERSION = 1
+DEFAULT_CACHE = Path(__file__).resolve().parent.parent / ".cache" / "layout"
+
+# Mirrors #DefaultNodeStyles in patterns/visualization.cue.
+NODE_STYLES = {
+    "LoadBalancer": ("hexagon", "#2196F3", "LB"),
+    "Database": ("cylinder", "#4CAF50", "DB"),
+    "WebServer": ("box", "#FF9800", "WEB"),
+    "Container": ("box3d", "#00BCD4", "CT"),
+    "VM": ("box", "#9C27B0", "VM"),
+    "ProxmoxVM": ("box", "#E65100", "PVE"),
+    "ProxmoxLXC": ("box3d", "#00695C", "LXC"),
+    "VCFResource": ("box", "#1565C0", "VCF"),
+}
+DEFAULT_STYLE = ("box", "#607D8B", "")
+
+# Pinned DOT edges end this far from the target center (points).
+ARROW_GAP = 14.0
+ARROW_LEN = 10.0
+
+
+def graph_hash(resources: dict, params: dict) -> str:
+    """Stable hash of graph structure + layout parameters (cache key)."""
+    h = hashlib.sha256()
+    h.update(json.dumps({"v": LAYOUT_VERSION, "params": params}, sort_keys=True).encode())
+    for name in sorted(resources):
+        r = resources[name]
+        h.update(json.dumps([
+            name,
+            sorted(r.get("@type") or {}),
+            sorted(r.get("depends_on") or {}),
+        ]).encode())
+    return h.hexdigest()
+
+
+def normalize(resources: dict, order: list[str], depth: dict[str, int]):
+    """Split edges spanning more than one layer with dummy nodes.
+
+    Returns (layers, up, down, chains). Node ids are ints: 0..V-1 are real
+    nodes in topological order, higher ids are dummies. chains maps each
+    original edge (dep, name) to its id path from dep down to name.
+    """
+    index = {name: i for i, name in enumerate(order)}
+    node_layer = [depth[name] for name in order]
+    up = defaultdict(list)
+    down = defaultdict(list)
+    chains = {}
+
+    for name in order:
+        v = index[name]
+        for dep in sorted(resources[name].get("depends_on") or {}):
+            u = index[dep]
+            chain = [u]
+            for layer in range(node_layer[u] + 1, node_layer[v]):
+                node_layer.append(layer)
+                chain.append(len(node_layer) - 1)
+            chain.append(v)
+            for a, b in zip(chain, chain[1:]):
+                down[a].append(b)
+                up[b].append(a)
+            chains[(dep, name)] = chain
+
+    layers = [[] for _ in range(max(node_layer, default=-1) + 1)]
+    for node, layer in enumerate(node_layer):
+        layers[layer].append(node)
+    return layers, up, down, chains
+
+
+def count_crossings(layers: list[list[int]], down: dict) -> int:
+    """Count edge crossings between adjacent layers in O(E log V)."""
+    total = 0
+    for upper, lower in zip(layers, layers[1:]):
+        pos = {node: i for i, node in enumerate(lower)}
+        targets = []
+        for node in upper:
+            targets.extend(sorted(pos[c] for c in down[node]))
+        # Crossings = inversions in the target sequence (Fenwick tree)
+        tree = [0] * (len(lower) + 1)
+        seen = 0
+        for t in targets:
+            i = t + 1
+            le = 0
+            while i > 0:
+                le += tree[i]
+                i -= i & -i
+            total += seen - le
+            seen += 1
+            i = t + 1
+            while i <= len(lower):
+                tree[i] += 1
+                i += i & -i
+    return total
+
+
+def _sweep(layers: list[list[int]], adj: dict, rng: range) -> None:
+    """Reorder each layer in rng by barycenter of its neighbours in the previous one."""
+    for li in rng:
+        prev = layers[li - 1] if rng.step > 0 else layers[li + 1]
+        pos = {node: i for i, node in enumerate(prev)}
+        keyed = []
+        for i, node in enumerate(layers[li]):
+            nbrs = adj[node]
+            # Nodes without neighbours keep their current slot
+            bary = sum(pos[n] for n in nbrs) / len(nbrs) if nbrs else float(i)
+            keyed.append((bary, i, node))
+        keyed.sort()
+        layers[li] = [node for _, _, node in keyed]
+
+
+def order_layers(layers: list[list[int]], up: dict, down: dict, iterations: int) -> tuple[list[list[int]], int]:
+    """Barycenter crossing reduction. Returns (best order, its crossing count)."""
+    best = [list(layer) for layer in layers]
+    best_crossings = count_crossings(best, down)
+    current = [list(layer) for layer in layers]
+    for _ in range(iterations):
+        if best_crossings == 0:
+            break
+        _sweep(current, up, range(1, len(current)))
+        _sweep(current, down, range(len(current) - 2, -1, -1))
+        crossings = count_crossings(current, down)
+        if crossings < best_crossings:
+            best = [list(layer) for layer in current]
+            best_crossings = crossings
+    return best, best_crossings
+
+
+def assign_x(layers: list[list[int]], up: dict, down: dict, dx: float, passes: int = 4) -> dict[int, float]:
+    """Place nodes near the mean x of their neighbours, keeping order and spacing.
+
+    Each pass pulls layers toward the adjacent layer (down, then up), then
+    enforces minimum separation left-to-right and recenters the layer so
+    repeated passes don't drift.
+    """
+    x = {}
+    for layer in layers:
+        for i, node in enumerate(layer):
+            x[node] = i * dx
+
+    def place(layer: list[int], adj: dict) -> None:
+        if not layer:
+            return
+        want = []
+        for node in layer:
+            nbrs = adj[node]
+            want.append(sum(x[n] for n in nbrs) / len(nbrs) if nbrs else x[node])
+        placed = [want[0]]
+        for w in want[1:]:
+            placed.append(max(w, placed[-1] + dx))
+        shift = (sum(want) - sum(placed)) / len(placed)
+        for node, p in zip(layer, placed):
+            x[node] = p + shift
+
+    for _ in range(passes):
+        for layer in layers[1:]:
+            place(layer, up)
+        for layer in reversed(layers[:-1]):
+            place(layer, down)
+
+    left = min(x.values(), default=0.0)
+    return {node: round(v - left, 2) for node, v in x.items()}
+
+
+def compute_layout(
+    resources: dict,
+    dx: float = 120.0,
+    dy: float = 100.0,
+    iterations: int = 8,
+) -> dict:
+    """Full Sugiyama pipeline. Returns a JSON-serialisable layout."""
+    order, depth = toposort(resources)
+    layers, up, down, chains = normalize(resources, order, depth)
+    layers, crossings = order_layers(layers, up, down, iterations)
+    x = assign_x(layers, up, down, dx)
+
+    real = len(order)
+    nodes = {order[n]: [x[n], li * dy] for li, layer in enumerate(layers) for n in layer if n < real}
+    edges = [
+        [dep, name, [[x[n], depth[order[chain[0]]] * dy + i * dy] for i, n in enumerate(chain)]]
+        for (dep, name), chain in chains.items()
+    ]
+    return {
+        "version": LAYOUT_VERSION,
+        "nodes": nodes,
+        "edges": edges,
+        "layers": [[order[n] for n in layer if n < real] for layer in layers],
+        "crossings": crossings,
+        "dummies": sum(len(layer) for layer in layers) - real,
+        "width": max((p[0] for p in nodes.values()), default=0.0),
+        "height": max((p[1] for p in nodes.values()), default=0.0),
+    }
+
+
+def cached_layout(resources: dict, cache_dir: Path | None, **params) -> tuple[dict, bool]:
+    """compute_layout with an on-disk cache keyed by graph_hash. Returns (layout, hit)."""
+    if cache_dir is None:
+        return compute_layout(resources, **params), False
+    key = graph_hash(resources, params)
+    path = cache_dir / f"{key}.json"
+    if path.exists():
+        return json.loads(path.read_text()), True
+    layout = compute_layout(resources, **params)
+    layout["hash"] = key
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(layout, separators=(",", ":")))
+    tmp.replace(path)
+    return layout, False
+
+
+def _style(resource: dict) -> tuple[str, str, str]:
+    types = sorted(resource.get("@type") or {})
+    return NODE_STYLES.get(types[0], DEFAULT_STYLE) if types else DEFAULT_STYLE
+
+
+def _oriented(layout: dict, rankdir: str):
+    """Map layout (x across, y down) onto the requested rank direction.
+
+    Returns a function (x, y) -> (X, Y) in a y-down canvas.
+    """
+    h = layout["height"]
+    return {
+        "TB": lambda x, y: (x, y),
+        "BT": lambda x, y: (x, h - y),
+        "LR": lambda x, y: (y, x),
+        "RL": lambda x, y: (h - y, x),
+    }[rankdir]
+
+
+def render_dot(resources: dict, layout: dict, rankdir: str = "TB") -> str:
+    """DOT with pinned positions and edge routes. Render with `neato -n2`."""
+    at = _oriented(layout, rankdir)
+    canvas_h = max(at(x, y)[1] for x in (0, layout["width"]) for y in (0, layout["height"]))
+
+    def xy(x: float, y: float) -> tuple[float, float]:
+        px, py = at(x, y)
+        # Graphviz points: origin bottom-left, y up
+        return px, canvas_h - py
+
+    def pt(p: tuple[float, float]) -> str:
+        return f"{p[0]:.2f},{p[1]:.2f}"
+
+    lines = [
+        "digraph Graph {",
+        '  layout="neato";',
+        '  splines="true";',
+        "",
+        '  graph [fontname="Helvetica", fontsize=12, bgcolor="#FAFAFA"];',
+        '  node [fontname="Helvetica", fontsize=11, margin="0.2"];',
+        '  edge [fontname="Helvetica", fontsize=10, color="#666666"];',
+        "",
+    ]
+    for name, (x, y) in layout["nodes"].items():
+        shape, color, icon = _style(resources[name])
+        label = f"{icon} {name}" if icon else name
+        lines.append(
+            f'  "{name}" [label="{label}", shape="{shape}", fillcolor="{color}", '
+            f'fontcolor="white", style="filled", pos="{pt(xy(x, y))}!"];'
+        )
+    lines.append("")
+    for dep, name, route in layout["edges"]:
+        # Edges point from dependent to dependency, as in #GraphvizDiagram.
+        # Route is stored dependency-first; reverse it and encode the
+        # polyline as degenerate cubic Béziers (prev, next, next). The
+        # spline stops short of the target so the arrowhead ("e,") sits
+        # at the node boundary instead of under its center.
+        pts = [xy(x, y) for x, y in reversed(route)]
+        (ax, ay), (bx, by) = pts[-2], pts[-1]
+        length = max(((bx - ax) ** 2 + (by - ay) ** 2) ** 0.5, 1e-9)
+        ux, uy = (bx - ax) / length, (by - ay) / length
+        tip = (bx - ux * ARROW_GAP, by - uy * ARROW_GAP)
+        pts[-1] = (tip[0] - ux * ARROW_LEN, tip[1] - uy * ARROW_LEN)
+        spline = [pt(pts[0])]
+        for prev, p in zip(pts, pts[1:]):
+            spline.extend([pt(prev), pt(p), pt(p)])
+        lines.append(f'  "{name}" -> "{dep}" [pos="e,{pt(tip)} {" ".join(spline)}"];')
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def render_svg(resources: dict, layout: dict, rankdir: str = "TB") -> str:
+    """Standalone SVG — no Graphviz needed."""
+    at = _oriented(layout, rankdir)
+    margin = 60.0
+    corners = [at(0, 0), at(layout["width"], layout["height"]), at(layout["width"], 0), at(0, layout["height"])]
+    width = max(c[0] for c in corners) + 2 * margin
+    height = max(c[1] for c in corners) + 2 * margin
+
+    def pt(x: float, y: float) -> tuple[float, float]:
+        px, py = at(x, y)
+        return px + margin, py + margin
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="Helvetica" font-size="11">',
+        '<defs><marker id="arrow" viewBox="0 -4 8 8" refX="8" refY="0" markerWidth="6" '
+        'markerHeight="6" orient="auto"><path d="M0,-3L7,0L0,3" fill="#666666"/></marker></defs>',
+        f'<rect width="{width:.0f}" height="{height:.0f}" fill="#FAFAFA"/>',
+        '<g fill="none" stroke="#666666">',
+    ]
+    for _, _, route in layout["edges"]:
+        pts = " ".join(f"{px:.1f},{py:.1f}" for px, py in (pt(x, y) for x, y in reversed(route)))
+        out.append(f'<polyline points="{pts}" marker-end="url(#arrow)"/>')
+    out.append("</g>")
+    for name, (x, y) in layout["nodes"].items():
+        _, color, icon = _style(resources[name])
+        label = escape(f"{icon} {name}" if icon else name)
+        px, py = pt(x, y)
+        w = 7 * len(label) + 16
+        out.append(
+            f'<g><title>{escape(name)}</title>'
+            f'<rect x="{px - w / 2:.1f}" y="{py - 12:.1f}" width="{w}" height="24" rx="4" fill="{color}"/>'
+            f'<text x="{px:.1f}" y="{py + 4:.1f}" text-anchor="middle" fill="white">{label}</text></g>'
+        )
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+def render_mermaid(resources: dict, layout: dict, rankdir: str = "TB") -> str:
+    """Mermaid flowchart, nodes declared in crossing-reduced layer order."""
+    def mid(name: str) -> str:
+        # Injective: "_" doubles first, so a-b, a.b and a_b stay distinct
+        return name.replace("_", "__").replace("-", "_h").replace(".", "_d")
+
+    lines = [f"graph {rankdir}"]
+    for layer in layout["layers"]:
+        for name in layer:
+            lines.append(f"    {mid(name)}[{name}]")
+    lines.append("")
+    for dep, name, _ in layout["edges"]:
+        lines.append(f"    {mid(name)} --> {mid(dep)}")
+    return "\n".join(lines) + "\n"
+
+
+RENDERERS = {
+    "dot": render_dot,
+    "svg": render_svg,
+    "mermaid": render_mermaid,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Layered (Sugiyama) layout with pinned DOT, SVG, or Mermaid output"
+    )
+    parser.add_argument("source", help="CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--format", choices=["dot", "svg", "mermaid", "json"], default="dot")
+    parser.add_argument("--rankdir", choices=["TB", "BT", "LR", "RL"], default="TB")
+    parser.add_argument("--dx", type=float, default=120.0, help="Minimum in-layer node spacing")
+    parser.add_argument("--dy", type=float, default=100.0, help="Layer spacing")
+    parser.add_argument("--iterations", type=int, default=8, help="Barycenter sweep rounds (default: 8)")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE,
+                        help="Layout cache directory (default: .cache/layout)")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute the layout")
+    args = parser.parse_args()
+
+    resources = load_resources(args.source, args.expr)
+    layout, hit = cached_layout(
+        resources, None if args.no_cache else args.cache_dir,
+        dx=args.dx, dy=args.dy, iterations=args.iterations,
+    )
+
+    if args.format == "json":
+        json.dump(layout, sys.stdout, indent=2)
+        print()
+    else:
+        sys.stdout.write(RENDERERS[args.format](resources, layout, args.rankdir))
+
+    sys.stderr.write(f"Layout: {len(layout['nodes'])} nodes, {len(layout['layers'])} layers, "
+                     f"{layout['dummies']} dummies, {layout['crossings']} crossings"
+                     f"{' (cached)' if hit else ''}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Paged JSON-LD export — split a projection into cacheable pages.
+
+Every W3C projection (gaps.shacl_report, provenance.prov_report,
+catalog.dcat_catalog, activity_stream.stream, ...) exports as one
+document, so a consumer that wants one page downloads and parses all of
+it. This post-processor splits the projection's item list (@graph,
+orderedItems, items, sh:result or dcat:dataset; failing those, the one
+list-valued top-level field) into pages under an output directory:
+
+  context.jsonld   the projection's @context, written once. Pages and the
+                   index refer to it by URL instead of repeating it
+  index.jsonld     the projection's other top-level fields, plus links to
+                   the pages
+  page-*.jsonld    the items, one page per file
+
+Activity Streams collections (type OrderedCollection) become an AS2 paged
+collection. Items are taken to be in chronological order and pages are
+numbered from the oldest, page-0000 onwards, --page-size items each. The
+index's `first` is the newest page, and each page lists its items newest
+first with `next` pointing to the page before it. Appending items only
+rewrites the newest page and the index, and full pages never change again.
+
+Every other projection becomes a `void:subset` partition. Page boundaries
+are content-defined: a page ends after an item whose @id hashes to 0 modulo
+--page-size, so pages average --page-size items (capped at 4x). Each page
+is named by the hash of its items. Adding, removing or editing an item
+only replaces the page holding it; the other file names and bytes stay the
+same, and a CDN keeps serving them from cache.
+
+Files whose content is unchanged are not rewritten, and page files that
+no longer belong to the projection are removed.
+
+Page, index and context links are --base + file name. Without --base they
+are relative, which only works when the shared @context sets no @base:
+apercue's vocab context sets "@base": "urn:resource:", against which a
+relative link would resolve to urn:resource:page-....jsonld rather than
+to the sibling file. So --base must be the pages' absolute URL whenever
+the shared context defines @base.
+
+Usage:
+    cue export ./examples/foo/ -e activity_stream.stream --out json > stream.json
+    python3 tools/paginate.py stream.json site/data/stream/ --page-size 50 --base https://example.org/stream/
+    python3 tools/paginate.py report.json site/data/gaps/ --base https://example.org/gaps/
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ITEM_KEYS = ("@graph", "orderedItems", "items", "sh:result", "dcat:dataset")
+AS_CONTEXT = "https://www.w3.org/ns/activitystreams"
+PAGE_PREFIXES = {
+    "void": "http://rdfs.org/ns/void#",
+    "dcterms": "http://purl.org/dc/terms/",
+}
+MAX_PAGE_FACTOR = 4
+
+
+def item_key(item) -> str:
+    """Stable identity of an item: @id, AS2 id or object id, else its JSON."""
+    if isinstance(item, dict):
+        for k in ("@id", "id"):
+            if isinstance(item.get(k), str):
+                return item[k]
+        obj = item.get("object")
+        if isinstance(obj, dict) and isinstance(obj.get("id"), str):
+            return item.get("type", "") + " " + obj["id"]
+    return json.dumps(item, sort_keys=True, separators=(",", ":"))
+
+
+def digest(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def is_activity_stream(doc: dict) -> bool:
+    ctx = doc.get("@context")
+    ctx = ctx if isinstance(ctx, list) else [ctx]
+    return AS_CONTEXT in ctx or doc.get("type") in ("OrderedCollection", "Collection")
+
+
+def split_content_defined(items: list, size: int) -> list[list]:
+    """Pages ending where an item's key hashes to 0 mod size."""
+    pages, page = [], []
+    for item in items:
+        page.append(item)
+        h = int(digest(item_key(item))[:16], 16)
+        if h % size == 0 or len(page) >= size * MAX_PAGE_FACTOR:
+            pages.append(page)
+            page = []
+    if page:
+        pages.append(page)
+    return pages
+
+
+def split_fixed(items: list, size: int) -> list[list]:
+    """Fixed-size pages counted from the first (oldest) item."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def page_context(context_ref: str, shared) -> list:
+    """Context reference plus the page-link prefixes the shared one lacks."""
+    shared = shared if isinstance(shared, list) else [shared]
+    defined = {k for c in shared if isinstance(c, dict) for k in c}
+    missing = {k: v for k, v in PAGE_PREFIXES.items() if k not in defined}
+    return [context_ref, missing] if missing else context_ref
+
+
+def context_base(shared) -> str | None:
+    """The @base a (possibly list-valued) @context sets, if any."""
+    base = None
+    for c in shared if isinstance(shared, list) else [shared]:
+        if isinstance(c, dict) and "@base" in c:
+            base = c["@base"]
+    return base
+
+
+def paginate(doc: dict, size: int, base: str = "", key: str | None = None) -> dict[str, dict]:
+    """{file name: document} for the context, the index and every page."""
+    if key is None:
+        key = next((k for k in ITEM_KEYS if isinstance(doc.get(k), list)), None)
+        if key is None:
+            lists = [k for k, v in doc.items() if k != "@context" and isinstance(v, list)]
+            if len(lists) != 1:
+                raise ValueError(f"no item list found (looked for {', '.join(ITEM_KEYS)}; "
+                                 f"pass --key to pick one)")
+            key = lists[0]
+    elif not isinstance(doc.get(key), list):
+        raise ValueError(f"{key!r} is not a list in this document")
+    items = doc[key]
+    shared = doc.get("@context", {})
+    if not urlsplit(base).scheme and context_base(shared) is not None:
+        raise ValueError(f"the @context sets @base {context_base(shared)!r}, which relative page links "
+                         f"would resolve against; pass --base with the pages' absolute URL")
+    rest = {k: v for k, v in doc.items() if k not in ("@context", key)}
+    files = {"context.jsonld": {"@context": shared}}
+    index_id = base + "index.jsonld"
+
+    if is_activity_stream(doc):
+        ctx = base + "context.jsonld"
+        pages = split_fixed(items, size)
+        names = [f"page-{i:04d}.jsonld" for i in range(len(pages))]
+        for i, (name, page) in enumerate(zip(names, pages)):
+            body = {"@context": ctx, "id": base + name, "type": "OrderedCollectionPage",
+                    "partOf": index_id}
+            if i > 0:
+                body["next"] = base + names[i - 1]
+            body["orderedItems"] = page[::-1]
+            files[name] = body
+        index = {"@context": ctx, **rest, "id": index_id}
+        index["type"] = "OrderedCollection"
+        index["totalItems"] = len(items)
+        if names:
+            index["first"] = base + names[-1]
+            index["last"] = base + names[0]
+    else:
+        ctx = page_context(base + "context.jsonld", shared)
+        subsets = []
+        for page in split_content_defined(items, size):
+            body = json.dumps(page, sort_keys=True, separators=(",", ":"))
+            name = f"page-{digest(body)[:16]}.jsonld"
+            files[name] = {"@context": ctx, "@id": base + name,
+                           "dcterms:isPartOf": {"@id": index_id}, key: page}
+            subsets.append({"@id": base + name, "void:entities": len(page),
+                            "void:dataDump": {"@id": base + name}})
+        index = {"@context": ctx, **rest, "@id": index_id}
+        index["void:entities"] = len(items)
+        index["void:subset"] = subsets
+    files["index.jsonld"] = index
+    return files
+
+
+def write_pages(files: dict[str, dict], out: Path) -> tuple[int, int, int]:
+    """Write changed files, drop stale pages. Returns (written, unchanged, removed)."""
+    out.mkdir(parents=True, exist_ok=True)
+    written = unchanged = removed = 0
+    for name, doc in files.items():
+        text = json.dumps(doc, indent=2, ensure_ascii=False) + "\n"
+        path = out / name
+        if path.exists() and path.read_text(encoding="utf-8") == text:
+            unchanged += 1
+            continue
+        path.write_text(text, encoding="utf-8")
+        written += 1
+    for path in out.glob("page-*.jsonld"):
+        if path.name not in files:
+            path.unlink()
+            removed += 1
+    return written, unchanged, removed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Split an exported JSON-LD projection into stable, linked pages"
+    )
+    parser.add_argument("source", help="Exported projection (JSON), or - for stdin")
+    parser.add_argument("out", help="Output directory")
+    parser.add_argument("--page-size", type=int, default=100, metavar="N",
+                        help="Items per page (average for content-defined pages, default: 100)")
+    parser.add_argument("--base", default="", metavar="URL",
+                        help="Absolute URL prefix for page, index and context links (default: relative; "
+                        "required when the @context sets @base)")
+    parser.add_argument("--key", help="Item list to split (default: first of " + ", ".join(ITEM_KEYS)
+                        + ", else the only list-valued field)")
+    args = parser.parse_args()
+
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    if args.source == "-":
+        doc = json.load(sys.stdin)
+    else:
+        with open(args.source) as f:
+            doc = json.load(f)
+    try:
+        files = paginate(doc, args.page_size, args.base, args.key)
+    except ValueError as e:
+        parser.error(str(e))
+    written, unchanged, removed = write_pages(files, Path(args.out))
+
+    pages = len(files) - 2
+    kind = "AS2 collection" if is_activity_stream(doc) else "void:subset partition"
+    sys.stderr.write(f"Paginate: {pages} pages ({kind}), {written} written, "
+                     f"{unchanged} unchanged, {removed} stale removed -> {args.out}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
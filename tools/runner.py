@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Concurrent executor for #BootstrapPlan and #SmokeTest — streams EARL results.
+
+The scripts #BootstrapPlan and #SmokeTest generate run every command one
+at a time. #BootstrapPlan's script also ignores the health timeout and
+retries that #BootstrapResource declares. This runner reads the patterns'
+exported JSON and runs the same commands with asyncio:
+
+  bootstrap   each resource starts as soon as everything in its depends_on
+              has been created and passed its health check. lifecycle.create
+              runs first. health.command then runs until it exits 0, up to
+              `retries` attempts, and each attempt is killed after `timeout`.
+              A failed resource marks its dependents earl:untested.
+  smoke       once bootstrap succeeds, every #Check runs concurrently. A check
+              passes when its output matches `expected`, as the generated
+              script's grep does.
+
+--jobs caps how many commands run at once. Each finished step is written
+to stdout right away as one earl:Assertion per line (NDJSON). The
+assertion has the same shape as #SmokeTest.earl_report, with the real
+outcome and a time:hasDuration in seconds, as #ContextEventLog records
+durations. --report also writes the whole run as a single JSON-LD document
+under the shared vocab context. Per-step durations and the wall-clock
+saving go to stderr.
+
+Usage:
+    cue export ./infra/ -e bootstrap --out json > bootstrap.json
+    cue export ./infra/ -e verify --out json > verify.json
+    python3 tools/runner.py --bootstrap bootstrap.json --smoke verify.json --jobs 8
+    python3 tools/runner.py --smoke verify.json --report earl.json > /dev/null
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from eventlog import load_context
+
+ASSERTOR = {
+    "@type": "earl:Software",
+    "@id": "urn:agent:graph-engine",
+    "dcterms:title": "apercue graph engine",
+}
+
+DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value) -> float:
+    """'30s', '2m', '500ms', '1h', or a bare number of seconds -> seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = DURATION_RE.match(str(value))
+    if not m:
+        raise ValueError(f"bad duration {value!r} (want e.g. 30s, 2m, 500ms)")
+    return float(m.group(1)) * DURATION_UNITS[m.group(2) or "s"]
+
+
+def load_json(path: str) -> dict:
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path) as f:
+        return json.load(f)
+
+
+# ── Process execution ──────────────────────────────────────────────
+
+
+async def run_command(command: str, timeout: float | None, sem: asyncio.Semaphore) -> dict:
+    """Run one bash command under the job cap; kill its process group on timeout."""
+    async with sem:
+        start = time.monotonic()
+        proc = await asyncio.create_subprocess_exec(
+            "bash", "-c", command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+            rc, timed_out = proc.returncode, False
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            out, _ = await proc.communicate()
+            rc, timed_out = None, True
+        return {
+            "exit": rc,
+            "timed_out": timed_out,
+            "output": (out or b"").decode(errors="replace"),
+            "seconds": time.monotonic() - start,
+        }
+
+
+def output_matches(output: str, expected: str) -> bool:
+    """#SmokeTest's `grep -q "$exp"`: any line matching, as a regex if it parses."""
+    try:
+        pattern = re.compile(expected)
+    except re.error:
+        return any(expected in line for line in output.splitlines())
+    return any(pattern.search(line) for line in output.splitlines())
+
+
+# ── EARL projection ────────────────────────────────────────────────
+
+
+def assertion(title: str, command: str, outcome: str, subject: str | None,
+              seconds: float | None = None, expected: str | None = None,
+              info: str | None = None) -> dict:
+    """One earl:Assertion in #SmokeTest.earl_report shape, with a real outcome."""
+    a = {
+        "@type": "earl:Assertion",
+        "earl:assertedBy": {"@id": ASSERTOR["@id"]},
+        "earl:mode": {"@id": "earl:automatic"},
+    }
+    if subject:
+        a["earl:subject"] = {"@id": subject}
+    a["earl:test"] = {
+        "@type": "earl:TestCase",
+        "dcterms:title": title,
+        "apercue:command": command,
+    }
+    result = {
+        "@type": "earl:TestResult",
+        "earl:outcome": {"@id": f"earl:{outcome}"},
+        "dcterms:date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if expected is not None:
+        result["earl:expected"] = expected
+    if seconds is not None:
+        result["time:hasDuration"] = {
+            "@type": "time:Duration",
+            "time:numericDuration": round(seconds, 3),
+            "time:unitType": {"@id": "time:unitSecond"},
+        }
+    if info and info.strip():
+        result["earl:info"] = info.strip()
+    a["earl:result"] = result
+    return a
+
+
+class Stream:
+    """Collects assertions and writes each as an NDJSON line as it lands."""
+
+    def __init__(self, out):
+        self.out = out
+        self.assertions = []
+        self.steps = []
+
+    def emit(self, a: dict, step: str) -> None:
+        self.assertions.append(a)
+        r = a["earl:result"]
+        seconds = r["time:hasDuration"]["time:numericDuration"] if "time:hasDuration" in r else None
+        self.steps.append((step, r["earl:outcome"]["@id"], seconds))
+        self.out.write(json.dumps(a) + "\n")
+        self.out.flush()
+
+
+def tail(output: str, lines: int = 5) -> str:
+    return "\n".join(output.rstrip().splitlines()[-lines:])
+
+
+# ── Bootstrap ──────────────────────────────────────────────────────
+
+
+def plan_deps(resources: dict) -> dict[str, list[str]]:
+    """depends_on within the plan. Out-of-plan deps are ignored, as in
+    #BootstrapPlan._depths."""
+    return {name: [d for d in res.get("depends_on") or {} if d in resources]
+            for name, res in resources.items()}
+
+
+def check_acyclic(deps: dict[str, list[str]]) -> None:
+    """Kahn pass over the in-plan deps; ValueError naming the cycle members."""
+    indeg = {name: len(ds) for name, ds in deps.items()}
+    dependents = {name: [] for name in deps}
+    for name, ds in deps.items():
+        for d in ds:
+            dependents[d].append(name)
+    queue = deque(name for name, n in indeg.items() if n == 0)
+    while queue:
+        for c in dependents[queue.popleft()]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                queue.append(c)
+    cycle = sorted(name for name, n in indeg.items() if n > 0)
+    if cycle:
+        raise ValueError(f"dependency cycle in bootstrap plan: {', '.join(cycle)}")
+
+
+async def bootstrap_resource(name: str, res: dict, sem, subject, stream: Stream,
+                             create_timeout: float | None, retry_delay: float) -> bool:
+    create = (res.get("lifecycle") or {}).get("create")
+    health = res.get("health")
+    seconds = 0.0
+    commands = [c for c in (create, health and health.get("command")) if c]
+
+    if create:
+        r = await run_command(create, create_timeout, sem)
+        seconds += r["seconds"]
+        if r["exit"] != 0:
+            why = "create timed out" if r["timed_out"] else f"create exited {r['exit']}"
+            stream.emit(assertion(name, "\n".join(commands), "failed", subject or name,
+                                  seconds, info=f"{why}\n{tail(r['output'])}"), name)
+            return False
+
+    if health:
+        timeout = parse_duration(health.get("timeout", "30s"))
+        retries = max(1, int(health.get("retries", 3)))
+        for attempt in range(1, retries + 1):
+            r = await run_command(health["command"], timeout, sem)
+            seconds += r["seconds"]
+            if r["exit"] == 0:
+                break
+            if attempt < retries:
+                await asyncio.sleep(retry_delay)
+                seconds += retry_delay
+        else:
+            why = "timed out" if r["timed_out"] else f"exited {r['exit']}"
+            stream.emit(assertion(name, "\n".join(commands), "failed", subject or name,
+                                  seconds, info=f"health check {why} after {retries} attempts\n"
+                                  f"{tail(r['output'])}"), name)
+            return False
+
+    stream.emit(assertion(name, "\n".join(commands), "passed", subject or name, seconds), name)
+    return True
+
+
+async def run_bootstrap(resources: dict, sem, subject, stream: Stream,
+                        create_timeout: float | None, retry_delay: float) -> bool:
+    """Launch every resource once its dependencies are up; False if any failed."""
+    in_plan = plan_deps(resources)
+    check_acyclic(in_plan)  # reject cycles before anything runs
+    tasks: dict[str, asyncio.Task] = {}
+
+    async def bring_up(name):
+        res = resources[name]
+        deps = in_plan[name]
+        if deps:
+            ok = await asyncio.gather(*(tasks[d] for d in deps))
+            failed = [d for d, up in zip(deps, ok) if not up]
+            if failed:
+                create = (res.get("lifecycle") or {}).get("create") or ""
+                stream.emit(assertion(name, create, "untested", subject or name,
+                                      info=f"dependency failed: {', '.join(sorted(failed))}"), name)
+                return False
+        return await bootstrap_resource(name, res, sem, subject, stream, create_timeout, retry_delay)
+
+    for name in resources:
+        tasks[name] = asyncio.ensure_future(bring_up(name))
+    results = await asyncio.gather(*tasks.values())
+    return all(results)
+
+
+# ── Smoke test ─────────────────────────────────────────────────────
+
+
+async def run_smoke(checks: list, sem, subject, stream: Stream, timeout: float | None,
+                    skip_reason: str | None = None) -> bool:
+    async def check(c):
+        if skip_reason:
+            stream.emit(assertion(c["label"], c["command"], "untested", subject,
+                                  expected=c["expected"], info=skip_reason), c["label"])
+            return False
+        r = await run_command(c["command"], timeout, sem)
+        ok = not r["timed_out"] and output_matches(r["output"], c["expected"])
+        info = None
+        if not ok:
+            info = "timed out" if r["timed_out"] else tail(r["output"])
+        stream.emit(assertion(c["label"], c["command"], "passed" if ok else "failed", subject,
+                              r["seconds"], expected=c["expected"], info=info), c["label"])
+        return ok
+
+    return all(await asyncio.gather(*(check(c) for c in checks)))
+
+
+async def run(args, stream: Stream) -> bool:
+    sem = asyncio.Semaphore(args.jobs)
+    ok = True
+    if args.bootstrap:
+        plan = load_json(args.bootstrap)
+        resources = plan.get("resources", plan)
+        ok = await run_bootstrap(resources, sem, args.subject, stream,
+                                 args.create_timeout, args.retry_delay)
+    if args.smoke:
+        smoke = load_json(args.smoke)
+        subject = args.subject or smoke.get("Subject")
+        ok = await run_smoke(smoke.get("checks") or [], sem, subject, stream,
+                             args.check_timeout,
+                             None if ok else "bootstrap failed") and ok
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Run #BootstrapPlan / #SmokeTest JSON concurrently, streaming EARL assertions"
+    )
+    parser.add_argument("--bootstrap", metavar="FILE",
+                        help="Exported #BootstrapPlan (or its resources map), or - for stdin")
+    parser.add_argument("--smoke", metavar="FILE", help="Exported #SmokeTest (needs checks)")
+    parser.add_argument("--jobs", type=int, default=8, help="Max concurrent commands (default: 8)")
+    parser.add_argument("--subject", help="earl:subject IRI (default: #SmokeTest Subject / resource name)")
+    parser.add_argument("--create-timeout", type=parse_duration, default=None, metavar="DURATION",
+                        help="Timeout for lifecycle.create (default: none)")
+    parser.add_argument("--check-timeout", type=parse_duration, default=30.0, metavar="DURATION",
+                        help="Timeout per #Check (default: 30s)")
+    parser.add_argument("--retry-delay", type=parse_duration, default=1.0, metavar="DURATION",
+                        help="Pause between health check attempts (default: 1s)")
+    parser.add_argument("--report", metavar="FILE", help="Also write the full EARL report as JSON-LD")
+    parser.add_argument("--context", metavar="FILE",
+                        help="JSON-LD context for --report (default: site/vocab/context.jsonld)")
+    args = parser.parse_args()
+
+    if not args.bootstrap and not args.smoke:
+        parser.error("nothing to run: pass --bootstrap and/or --smoke")
+    if args.jobs < 1:
+        parser.error("--jobs must be positive")
+
+    stream = Stream(sys.stdout)
+    started = time.monotonic()
+    try:
+        ok = asyncio.run(run(args, stream))
+    except ValueError as e:
+        parser.error(str(e))
+    wall = time.monotonic() - started
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"@context": load_context(args.context), "@graph": [ASSERTOR] + stream.assertions},
+                      f, indent=2)
+            f.write("\n")
+
+    for step, outcome, seconds in sorted(stream.steps, key=lambda s: -(s[2] or 0)):
+        shown = f"{seconds:8.2f}s" if seconds is not None else "        -"
+        sys.stderr.write(f"  {shown}  {outcome[5:]:<8}  {step}\n")
+    serial = sum(s[2] or 0 for s in stream.steps)
+    counts = {}
+    for _, outcome, _ in stream.steps:
+        counts[outcome[5:]] = counts.get(outcome[5:], 0) + 1
+    summary = ", ".join(f"{n} {k}" for k, n in sorted(counts.items()))
+    sys.stderr.write(f"Runner: {len(stream.steps)} steps ({summary}) in {wall:.2f}s "
+                     f"wall vs {serial:.2f}s serial\n")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
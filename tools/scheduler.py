@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Resource-constrained list scheduler — parallel rollout plans for large graphs.
+
+#DeploymentPlan and #BootstrapPlan gate each whole layer before the next
+one starts, and the bootstrap script creates resources one at a time
+inside a layer, so a rollout takes the sum of each layer's slowest
+resource. This scheduler starts every resource as soon as its own
+dependencies have finished, subject to:
+
+  --workers N         global cap on concurrent resources
+  --limit TYPE=N      cap on concurrent resources carrying @type TYPE
+
+Ready resources are started in order of CPM slack (least first), then
+latest start, then name — critical-path work never waits behind work that
+can afford to. Durations come from toposort.py's CPM output (--cpm),
+a {name: duration} map (--weights, as #CriticalPath.Weights), or 1 each.
+
+Output is the plan (start/finish/worker per resource, launch waves) with
+the predicted makespan next to the CPM lower bound and the layer-gated
+makespan, simulated under the same caps. --format script emits a bash
+bootstrap script that launches each resource's lifecycle.create in the
+background and waits only on its own dependencies and the slot it
+inherits.
+
+Usage:
+    python3 tools/scheduler.py ./self-charter/charter.cue --workers 4
+    python3 tools/scheduler.py graph.json --weights durations.json --limit Database=2 --limit Compute=8
+    python3 tools/toposort.py graph.json --fields earliest,latest,duration > cpm.json
+    python3 tools/scheduler.py graph.json --cpm cpm.json --workers 16
+    cue export ./infra/ -e bootstrap.resources > res.json
+    python3 tools/scheduler.py res.json --workers 4 --format script > bootstrap.sh
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import shlex
+import sys
+from collections import defaultdict
+
+from toposort import compute_cpm, load_resources, toposort
+
+
+def parse_limits(specs: list[str]) -> dict[str, int]:
+    """TYPE=N pairs -> {TYPE: N}."""
+    limits = {}
+    for spec in specs:
+        t, sep, n = spec.partition("=")
+        if not sep or not t or not n.isdigit() or int(n) < 1:
+            raise ValueError(f"bad --limit {spec!r} (want TYPE=N with N >= 1)")
+        limits[t] = int(n)
+    return limits
+
+
+def list_schedule(
+    resources: dict,
+    cpm: dict,
+    workers: int | None = None,
+    limits: dict[str, int] | None = None,
+) -> dict[str, dict]:
+    """Event-driven list scheduling over the dependency DAG.
+
+    At each event time, ready resources are taken in (slack, latest, name)
+    order and started while a worker and every limited @type slot they
+    carry are free; blocked ones stay ready. Time then advances to the
+    next finish. Returns {name: {start, finish, duration, slack, worker,
+    slots}}; slots maps each limited type to the slot index it held.
+    """
+    limits = limits or {}
+    duration, earliest, latest = cpm["duration"], cpm["earliest"], cpm["latest"]
+
+    waiting = {}
+    children = defaultdict(list)
+    for name, r in resources.items():
+        deps = r.get("depends_on") or {}
+        waiting[name] = len(deps)
+        for dep in deps:
+            children[dep].append(name)
+
+    def key(name):
+        return (latest[name] - earliest[name], latest[name], name)
+
+    ready = [key(n) for n, w in waiting.items() if w == 0]
+    heapq.heapify(ready)
+    running = []
+    free_workers: list[int] = []
+    next_worker = 0
+    free_slots = {t: list(range(n)) for t, n in limits.items()}
+    steps = {}
+    t = 0
+
+    while ready or running:
+        blocked = []
+        while ready and (workers is None or len(running) < workers):
+            item = heapq.heappop(ready)
+            name = item[2]
+            types = [ty for ty in sorted(resources[name].get("@type") or {}) if ty in limits]
+            if any(not free_slots[ty] for ty in types):
+                blocked.append(item)
+                continue
+            if free_workers:
+                worker = heapq.heappop(free_workers)
+            else:
+                worker, next_worker = next_worker, next_worker + 1
+            slots = {ty: heapq.heappop(free_slots[ty]) for ty in types}
+            finish = t + duration[name]
+            steps[name] = {
+                "start": t,
+                "finish": finish,
+                "duration": duration[name],
+                "slack": item[0],
+                "worker": worker,
+                "slots": slots,
+            }
+            heapq.heappush(running, (finish, worker, name))
+        for item in blocked:
+            heapq.heappush(ready, item)
+
+        t = running[0][0]
+        while running and running[0][0] == t:
+            _, worker, name = heapq.heappop(running)
+            heapq.heappush(free_workers, worker)
+            for ty, slot in steps[name]["slots"].items():
+                heapq.heappush(free_slots[ty], slot)
+            for child in children[name]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    heapq.heappush(ready, key(child))
+    return steps
+
+
+def layered_makespan(resources: dict, order: list[str], depth: dict, cpm: dict,
+                     workers: int | None = None, limits: dict[str, int] | None = None) -> int:
+    """Makespan of #DeploymentPlan's layer gates under the same caps.
+
+    Each layer is list-scheduled on its own (a layer has no edges inside
+    it) and the next layer starts only when it has finished.
+    """
+    layers = defaultdict(dict)
+    for name in order:
+        layers[depth[name]][name] = {"@type": resources[name].get("@type") or {}}
+    total = 0
+    for d in sorted(layers):
+        steps = list_schedule(layers[d], cpm, workers, limits)
+        total += max(s["finish"] for s in steps.values())
+    return total
+
+
+def build_plan(resources: dict, order: list[str], depth: dict, cpm: dict, steps: dict,
+               workers: int | None, limits: dict) -> dict:
+    """Plan document: steps in launch order, waves, and makespan comparison."""
+    ordered = sorted(steps, key=lambda n: (steps[n]["start"], steps[n]["worker"]))
+    waves = []
+    for name in ordered:
+        start = steps[name]["start"]
+        if not waves or waves[-1]["start"] != start:
+            waves.append({"start": start, "resources": []})
+        waves[-1]["resources"].append(name)
+
+    makespan = max((s["finish"] for s in steps.values()), default=0)
+    critical_path = max((cpm["earliest"][n] + cpm["duration"][n] for n in order), default=0)
+    layered = layered_makespan(resources, order, depth, cpm, workers, limits)
+
+    return {
+        "workers": workers,
+        "limits": limits,
+        "steps": [{"resource": n, **steps[n]} for n in ordered],
+        "waves": waves,
+        "summary": {
+            "resources": len(steps),
+            "makespan": makespan,
+            "critical_path": critical_path,
+            "layered_makespan": layered,
+            "speedup_vs_layered": round(layered / makespan, 3) if makespan else 1.0,
+            "max_parallel": max((len(w["resources"]) for w in waves), default=0),
+            "workers_used": len({s["worker"] for s in steps.values()}),
+        },
+    }
+
+
+def render_script(resources: dict, plan: dict) -> str:
+    """Bash bootstrap script that follows the plan's launch order.
+
+    Each lifecycle.create runs in the background. Before launching, the
+    script waits for the resource's dependencies and for whatever held its
+    worker and type slots before it, so the caps hold even when real
+    durations differ from the prediction. Resources without a create
+    command are pass-throughs: waiting on one waits on its dependencies.
+    """
+    steps = plan["steps"]
+    cmd = {
+        s["resource"]: (resources[s["resource"]].get("lifecycle") or {}).get("create")
+        for s in steps
+    }
+
+    effective: dict[str, set[str]] = {}
+
+    def targets(name):
+        if name not in effective:
+            if cmd[name]:
+                effective[name] = {name}
+            else:
+                effective[name] = set()
+                for dep in resources[name].get("depends_on") or {}:
+                    effective[name] |= targets(dep)
+        return effective[name]
+
+    s = plan["summary"]
+    lines = [
+        "#!/usr/bin/env bash",
+        f"# Generated by tools/scheduler.py: predicted makespan {s['makespan']} "
+        f"(critical path {s['critical_path']}, layer-gated {s['layered_makespan']})",
+        "set -uo pipefail",
+        "declare -A PID=() RC=()",
+        "await() {",
+        "\tlocal n",
+        "\tfor n in \"$@\"; do",
+        "\t\t[[ -n \"${PID[$n]:-}\" ]] || continue",
+        "\t\tif [[ -z \"${RC[$n]:-}\" ]]; then wait \"${PID[$n]}\"; RC[$n]=$?; fi",
+        "\t\tif [[ \"${RC[$n]}\" != 0 ]]; then echo \"FAILED: $n (exit ${RC[$n]})\" >&2; exit 1; fi",
+        "\tdone",
+        "}",
+        "launch() {",
+        "\techo \"Creating $1...\"",
+        "\tbash -c \"$2\" &",
+        "\tPID[$1]=$!",
+        "}",
+        "",
+    ]
+    prev_worker = {}
+    prev_slot = {}
+    launched = []
+    for step in steps:
+        name = step["resource"]
+        before = set(resources[name].get("depends_on") or {})
+        if step["worker"] in prev_worker:
+            before.add(prev_worker[step["worker"]])
+        for ty, slot in step["slots"].items():
+            if (ty, slot) in prev_slot:
+                before.add(prev_slot[(ty, slot)])
+        prev_worker[step["worker"]] = name
+        for ty, slot in step["slots"].items():
+            prev_slot[(ty, slot)] = name
+        if not cmd[name]:
+            continue
+        wait_on = sorted(set().union(*(targets(b) for b in before))) if before else []
+        if wait_on:
+            lines.append("await " + " ".join(shlex.quote(w) for w in wait_on))
+        lines.append(f"launch {shlex.quote(name)} {shlex.quote(cmd[name])}")
+        launched.append(name)
+
+    if launched:
+        lines.append("await " + " ".join(shlex.quote(n) for n in launched))
+    lines += ["echo \"Bootstrap complete.\"", ""]
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Resource-constrained parallel schedule with predicted makespan"
+    )
+    parser.add_argument("source", help="CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--workers", type=int, default=None, help="Global concurrency cap (default: unlimited)")
+    parser.add_argument("--limit", action="append", default=[], metavar="TYPE=N",
+                        help="Concurrency cap per @type (repeatable)")
+    parser.add_argument("--cpm", metavar="FILE",
+                        help="toposort.py JSON output with cpm earliest/latest/duration")
+    parser.add_argument("--weights", metavar="FILE", help="JSON {name: duration} (default: 1 each)")
+    parser.add_argument("--format", choices=("json", "script"), default="json",
+                        help="json: plan document; script: parallel bash bootstrap (default: json)")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be positive")
+    try:
+        limits = parse_limits(args.limit)
+    except ValueError as e:
+        parser.error(str(e))
+
+    resources = load_resources(args.source, args.expr)
+    order, depth = toposort(resources)
+    if args.cpm:
+        with open(args.cpm) as f:
+            cpm = json.load(f).get("cpm") or {}
+        missing = [k for k in ("earliest", "latest", "duration") if k not in cpm]
+        if missing:
+            parser.error(f"{args.cpm} lacks cpm {', '.join(missing)} (toposort.py --fields earliest,latest,duration)")
+    else:
+        weights = None
+        if args.weights:
+            with open(args.weights) as f:
+                weights = json.load(f)
+        cpm = compute_cpm(resources, order, weights)
+
+    steps = list_schedule(resources, cpm, args.workers, limits)
+    plan = build_plan(resources, order, depth, cpm, steps, args.workers, limits)
+
+    if args.format == "script":
+        sys.stdout.write(render_script(resources, plan))
+    else:
+        json.dump(plan, sys.stdout, indent=2)
+        print()
+
+    s = plan["summary"]
+    sys.stderr.write(f"Schedule: {s['resources']} resources, makespan {s['makespan']} "
+                     f"(critical path {s['critical_path']}, layer-gated {s['layered_makespan']}), "
+                     f"up to {s['max_parallel']} in parallel on {s['workers_used']} workers\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Batch subgraph extraction over CSR adjacency — #Subgraph without the CUE walk.
+
+#Subgraph in patterns/analysis.cue re-walks the whole graph for every
+query. This engine builds forward (dependents) and reverse (depends_on)
+adjacency once, in CSR form, and answers many radius-bounded BFS queries
+against it:
+
+  --mode descendants   what depends on the target (downstream)
+  --mode ancestors     what the target depends on (upstream)
+  --mode both          union of the two
+
+Radius follows #Subgraph by default: keep nodes at most N topology layers
+from the target. --hops bounds by BFS edge count instead (the "2-hop
+neighbourhood" question). --roots selects roots plus all their transitive
+dependents, like #Subgraph.Roots.
+
+Each answer is emitted as #Subgraph output (selected + edges), as an
+Input map ready for #Graph / #GraphLite, or as JSON-LD. Answers are
+cached per (target, direction, radius) in memory — "both" reuses the two
+single-direction walks — and on disk, keyed by a hash of the graph.
+
+Usage:
+    python3 tools/subgraph.py graph.json --target web-app --radius 2 --mode both
+    python3 tools/subgraph.py ./self-charter/charter.cue --target graph-engine,site-build --hops --radius 2
+    python3 tools/subgraph.py graph.json --roots auth --format input > sub.json
+    python3 tools/subgraph.py graph.json --queries alerts.json --format jsonld
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from toposort import load_resources, toposort
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = Path(__file__).resolve().parent.parent / ".cache" / "subgraph"
+MODES = ("descendants", "ancestors", "both")
+
+# Subset of vocab/context.cue covering the fields emitted here
+JSONLD_CONTEXT = {
+    "@base": "urn:resource:",
+    "dcterms": "http://purl.org/dc/terms/",
+    "apercue": "https://apercue.ca/vocab#",
+    "name": "dcterms:title",
+    "description": "dcterms:description",
+    "depends_on": {"@id": "dcterms:requires", "@type": "@id"},
+}
+
+
+def graph_key(resources: dict) -> str:
+    """Stable hash of graph structure (names + edges) for the answer cache."""
+    h = hashlib.sha256(f"subgraph-v{CACHE_VERSION}".encode())
+    for name in sorted(resources):
+        h.update(json.dumps([name, sorted(resources[name].get("depends_on") or {})]).encode())
+    return h.hexdigest()
+
+
+def to_csr(rows: list[list[int]]) -> tuple[list[int], list[int]]:
+    """Adjacency lists -> (row_ptr, col_idx)."""
+    ptr, idx = [0], []
+    for row in rows:
+        idx.extend(sorted(row))
+        ptr.append(len(idx))
+    return ptr, idx
+
+
+class SubgraphIndex:
+    """Forward/reverse CSR adjacency over one graph, with an answer cache.
+
+    Node ids are positions in topological order. cache maps a walk key
+    to the selected node names and may be preloaded from disk.
+    """
+
+    def __init__(self, resources: dict, cache: dict | None = None):
+        order, depth = toposort(resources)
+        self.names = order
+        self.index = {name: i for i, name in enumerate(order)}
+        self.depth = [depth[name] for name in order]
+
+        up = [[self.index[d] for d in resources[name].get("depends_on") or {}] for name in order]
+        down = [[] for _ in order]
+        for i, deps in enumerate(up):
+            for j in deps:
+                down[j].append(i)
+        self.up_ptr, self.up_idx = to_csr(up)
+        self.down_ptr, self.down_idx = to_csr(down)
+
+        self.cache = cache if cache is not None else {}
+        self.hits = 0
+        self.misses = 0
+
+    def walk(self, target: str, direction: str, radius: int | None = None, hops: bool = False) -> set[int]:
+        """Target plus everything reachable in one direction, radius-bounded.
+
+        With layers (the default) a node is kept when its depth is within
+        radius of the target's. Depth changes monotonically along a path,
+        so pruning during the BFS never hides a node that qualifies.
+        """
+        key = f"{direction}:{target}:{radius}:{'hops' if hops else 'layers'}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return {self.index[n] for n in cached}
+        self.misses += 1
+
+        ptr, idx = (self.down_ptr, self.down_idx) if direction == "descendants" else (self.up_ptr, self.up_idx)
+        start = self.index[target]
+        d0 = self.depth[start]
+        seen = {start}
+        frontier = [start]
+        level = 0
+        while frontier and not (hops and radius is not None and level >= radius):
+            level += 1
+            nxt = []
+            for v in frontier:
+                for k in range(ptr[v], ptr[v + 1]):
+                    w = idx[k]
+                    if w in seen:
+                        continue
+                    if not hops and radius is not None and abs(self.depth[w] - d0) > radius:
+                        continue
+                    seen.add(w)
+                    nxt.append(w)
+            frontier = nxt
+
+        self.cache[key] = [self.names[i] for i in sorted(seen)]
+        return seen
+
+    def select(self, query: dict) -> set[int]:
+        """Node ids for one query: {target, mode?, radius?, hops?} or {roots}."""
+        if query.get("roots"):
+            selected = set()
+            for root in query["roots"]:
+                selected |= self.walk(root, "descendants")
+            return selected
+        mode = query.get("mode", "descendants")
+        directions = ("descendants", "ancestors") if mode == "both" else (mode,)
+        selected = set()
+        for direction in directions:
+            selected |= self.walk(query["target"], direction, query.get("radius"), query.get("hops", False))
+        return selected
+
+    def induced_edges(self, selected: set[int]) -> list[tuple[int, int]]:
+        """(dep, dependent) pairs with both endpoints selected, in topological order."""
+        return [
+            (self.up_idx[k], i)
+            for i in sorted(selected)
+            for k in range(self.up_ptr[i], self.up_ptr[i + 1])
+            if self.up_idx[k] in selected
+        ]
+
+
+# ── Output formats ───────────────────────────────────────────────────────
+
+def as_subgraph(sg: SubgraphIndex, selected: set[int]) -> dict:
+    """Same shape as #Subgraph: selected set, induced edges, summary."""
+    edges = [{"source": sg.names[s], "target": sg.names[t]} for s, t in sg.induced_edges(selected)]
+    return {
+        "selected": {sg.names[i]: True for i in sorted(selected)},
+        "edges": edges,
+        "summary": {"total": len(selected), "edges": len(edges)},
+    }
+
+
+def as_input(sg: SubgraphIndex, resources: dict, selected: set[int]) -> dict:
+    """Induced subgraph as an Input map: depends_on trimmed to selected nodes."""
+    names = {sg.names[i] for i in selected}
+    out = {}
+    for i in sorted(selected):
+        name = sg.names[i]
+        r = dict(resources[name])
+        deps = {d: True for d in r.pop("depends_on", None) or {} if d in names}
+        if deps:
+            r["depends_on"] = deps
+        out[name] = r
+    return out
+
+
+def as_jsonld(sg: SubgraphIndex, resources: dict, selected: set[int], namespace: str) -> dict:
+    """Induced subgraph as JSON-LD, node shape as in #FederatedContext.jsonld."""
+    names = {sg.names[i] for i in selected}
+    graph = []
+    for i in sorted(selected):
+        name = sg.names[i]
+        r = resources[name]
+        node = {
+            "@type": sorted(r.get("@type") or {}),
+            "@id": namespace + name,
+            "dcterms:title": name,
+        }
+        if isinstance(r.get("description"), str):
+            node["dcterms:description"] = r["description"]
+        deps = [d for d in sorted(r.get("depends_on") or {}) if d in names]
+        if deps:
+            node["dcterms:requires"] = [{"@id": namespace + d} for d in deps]
+        graph.append(node)
+    return {"@context": JSONLD_CONTEXT, "@graph": graph}
+
+
+# ── Queries and cache ────────────────────────────────────────────────────
+
+def build_queries(args, resources: dict) -> list[tuple[str, dict]]:
+    """(label, query) pairs from --target / --roots / --queries."""
+    queries = []
+    if args.queries:
+        with open(args.queries) as f:
+            for q in json.load(f):
+                if isinstance(q.get("roots"), str):
+                    q["roots"] = [r for r in q["roots"].split(",") if r]
+                label = q.get("id") or q.get("target") or "roots:" + ",".join(q.get("roots") or [])
+                queries.append((label, q))
+    for spec in args.target or []:
+        for target in filter(None, spec.split(",")):
+            queries.append((target, {"target": target, "mode": args.mode, "radius": args.radius, "hops": args.hops}))
+    if args.roots:
+        roots = [r for spec in args.roots for r in spec.split(",") if r]
+        queries.append(("roots:" + ",".join(roots), {"roots": roots}))
+
+    seen = set()
+    for label, q in queries:
+        if label in seen:
+            raise ValueError(f"duplicate query {label!r}; give each an \"id\"")
+        seen.add(label)
+        if q.get("mode", "descendants") not in MODES:
+            raise ValueError(f"{label}: mode must be one of {', '.join(MODES)}")
+        if q.get("radius") is not None and q["radius"] < 0:
+            raise ValueError(f"{label}: radius must be >= 0")
+        for name in q.get("roots") or [q.get("target")]:
+            if name not in resources:
+                raise ValueError(f"{label}: unknown resource {name!r}")
+    return queries
+
+
+def load_cache(cache_dir: Path | None, key: str) -> dict:
+    if cache_dir is None:
+        return {}
+    path = cache_dir / f"{key}.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_cache(cache_dir: Path | None, key: str, cache: dict) -> None:
+    if cache_dir is None:
+        return
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{key}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, separators=(",", ":")))
+    tmp.replace(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Batch radius-bounded subgraph queries over CSR adjacency"
+    )
+    parser.add_argument("source", help="CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--target", action="append", metavar="NAME[,NAME...]",
+                        help="Target resource(s); one query per name (repeatable)")
+    parser.add_argument("--roots", action="append", metavar="NAME[,NAME...]",
+                        help="One query: roots plus all transitive dependents")
+    parser.add_argument("--queries", metavar="FILE",
+                        help='JSON list of {"id"?, "target", "mode"?, "radius"?, "hops"?} or {"id"?, "roots"}')
+    parser.add_argument("--mode", choices=MODES, default="descendants", help="Direction for --target (default: descendants)")
+    parser.add_argument("--radius", type=int, default=None, help="Bound for --target (default: unbounded)")
+    parser.add_argument("--hops", action="store_true", help="Radius counts BFS hops, not topology layers")
+    parser.add_argument("--format", choices=("subgraph", "input", "jsonld"), default="subgraph",
+                        help="subgraph: #Subgraph shape; input: Input map; jsonld: @graph (default: subgraph)")
+    parser.add_argument("--namespace", default="urn:resource:", help="@id prefix for --format jsonld")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE,
+                        help="Answer cache directory (default: .cache/subgraph)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk cache")
+    args = parser.parse_args()
+
+    resources = load_resources(args.source, args.expr)
+    try:
+        queries = build_queries(args, resources)
+    except ValueError as e:
+        parser.error(str(e))
+    if not queries:
+        parser.error("give --target, --roots or --queries")
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    key = graph_key(resources)
+    sg = SubgraphIndex(resources, load_cache(cache_dir, key))
+
+    results = {}
+    total = 0
+    for label, q in queries:
+        selected = sg.select(q)
+        total += len(selected)
+        if args.format == "input":
+            results[label] = as_input(sg, resources, selected)
+        elif args.format == "jsonld":
+            results[label] = as_jsonld(sg, resources, selected, args.namespace)
+        else:
+            results[label] = {"query": q, **as_subgraph(sg, selected)}
+
+    if sg.misses:
+        save_cache(cache_dir, key, sg.cache)
+
+    # One query prints its payload directly; a batch is keyed by label
+    out = next(iter(results.values())) if len(results) == 1 else results
+    json.dump(out, sys.stdout, indent=2)
+    print()
+
+    sys.stderr.write(f"Subgraph: {len(queries)} quer{'y' if len(queries) == 1 else 'ies'} over "
+                     f"{len(sg.names)} nodes, {total / len(queries):.1f} selected on average, "
+                     f"{sg.hits} cached walk{'s' if sg.hits != 1 else ''}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
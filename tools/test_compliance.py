@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Unit tests for compliance.py's bitset rule evaluator.
+
+Random rules over random typed DAGs are evaluated against a brute-force
+reading of #ComplianceCheck's assertions, violation order included.
+Stdlib only.
+
+Usage:
+    python3 tools/test_compliance.py
+"""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+from compliance import CHECK_ORDER, evaluate
+from eventlog import load_context
+from test_toposort import brute_ancestors, brute_dependents, random_dag
+
+TYPES = ("Compute", "Database", "Network", "Storage", "Monitor")
+
+
+def typed_dag(n: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    resources = random_dag(n, 0.08, seed)
+    for r in resources.values():
+        r["@type"] = {t: True for t in rng.sample(TYPES, rng.randint(1, 2))}
+    return resources
+
+
+def random_rule(rng: random.Random, i: int) -> dict:
+    rule = {"name": f"rule-{i}", "match_types": {t: True for t in rng.sample(TYPES, rng.randint(1, 2))},
+            "severity": rng.choice(("critical", "warning", "info"))}
+    for check in ("requires_dependent_type", "requires_dependency_type", "requires_transitive_dependency_type"):
+        if rng.random() < 0.4:
+            rule[check] = {t: True for t in rng.sample(TYPES, rng.randint(1, 2))}
+    for check in ("must_not_be_root", "must_not_be_leaf"):
+        if rng.random() < 0.3:
+            rule[check] = True
+    if rng.random() < 0.3:
+        rule["min_dependents"] = rng.randint(1, 5)
+    if rng.random() < 0.3:
+        rule["max_depth"] = rng.randint(1, 6)
+    if rng.random() < 0.3:
+        rule["conditional_severity"] = {"when_tagged": rng.choice(TYPES), "then_severity": "info"}
+    return rule
+
+
+def brute_rule(resources: dict, rule: dict) -> dict:
+    """#ComplianceCheck's results entry, one resource and one check at a time."""
+    ancestors, dependents = brute_ancestors(resources), brute_dependents(resources)
+
+    def types(names):
+        return {t for n in names for t in resources[n]["@type"]}
+
+    def depth(name):
+        return max((depth(d) + 1 for d in resources[name].get("depends_on") or {}), default=0)
+
+    match = [n for n, r in resources.items() if set(r["@type"]) & set(rule["match_types"])]
+    violations = []
+    for check in CHECK_ORDER:
+        if check not in rule:
+            continue
+        for name in match:
+            v = None
+            if check == "requires_dependent_type":
+                v = not types(dependents[name]) & set(rule[check])
+            elif check == "requires_dependency_type":
+                v = not types(resources[name].get("depends_on") or {}) & set(rule[check])
+            elif check == "requires_transitive_dependency_type":
+                v = not types(ancestors[name]) & set(rule[check])
+            elif check == "must_not_be_root":
+                v = not resources[name].get("depends_on")
+            elif check == "must_not_be_leaf":
+                v = not any(name in (r.get("depends_on") or {}) for r in resources.values())
+            elif check == "min_dependents" and len(dependents[name]) < rule[check]:
+                v = {"actual": len(dependents[name]), "required": rule[check]}
+            elif check == "max_depth" and depth(name) > rule[check]:
+                v = {"actual": depth(name), "required": rule[check]}
+            if v:
+                violations.append({"resource": name, "check": check, **(v if isinstance(v, dict) else {})})
+
+    severity = rule["severity"]
+    cond = rule.get("conditional_severity")
+    if cond and match and all(cond["when_tagged"] in resources[n]["@type"] for n in match):
+        severity = cond["then_severity"]
+    return {"name": rule["name"], "severity": severity, "matching": len(match),
+            "violations": violations, "passed": not violations}
+
+
+class EvaluateTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        context = load_context(None)
+        for seed in range(10):
+            rng = random.Random(seed)
+            resources = typed_dag(40, seed)
+            rules = [random_rule(rng, i) for i in range(8)]
+            report = evaluate(resources, rules, context)
+            self.assertEqual(report["results"], [brute_rule(resources, rule) for rule in rules], seed)
+            failed = [r for r in report["results"] if not r["passed"]]
+            self.assertEqual(report["summary"]["failed"], len(failed))
+            self.assertEqual(len(report["shacl_report"]["sh:result"]), sum(len(r["violations"]) for r in failed))
+            self.assertEqual(report["shacl_report"]["sh:conforms"], not failed)
+
+    def test_shacl_detail_for_quantitative_violations(self):
+        resources = {"a": {"name": "a", "@type": {"Compute": True}}}
+        rules = [{"name": "fanout", "match_types": {"Compute": True}, "severity": "critical", "min_dependents": 2}]
+        (result,) = evaluate(resources, rules, {})["shacl_report"]["sh:result"]
+        self.assertEqual(result["sh:resultSeverity"], {"@id": "sh:Violation"})
+        self.assertEqual(result["sh:detail"]["sh:resultMessage"], "actual: 0, required: 2")
+        self.assertEqual(result["sh:focusNode"], {"@id": "a"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Unit tests for contracts.py's bulk type-contract expansion.
+
+Covers required-field kinds and literals, structural_deps edges, grants,
+one compiled contract per @type combination, and that an invalid run
+writes no expansion. Stdlib only.
+
+Usage:
+    python3 tools/test_contracts.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import contracts
+from contracts import expand
+
+REGISTRY = {
+    "Host": {"description": "h", "requires": {"ip": "string", "cores": "int"}, "grants": ["ssh"]},
+    "Container": {"description": "c", "requires": {"runtime": "lxc"},
+                  "structural_deps": ["host"], "grants": ["restart"]},
+}
+
+
+class ExpandTest(unittest.TestCase):
+    def test_violations_edges_and_grants(self):
+        resources = {
+            "pve": {"name": "pve", "@type": {"Host": True}, "ip": "10.0.0.1", "cores": 8},
+            "bad": {"name": "bad", "@type": {"Host": True}, "ip": 10, "cores": True},
+            "ct": {"name": "ct", "@type": {"Container": True}, "runtime": "lxc", "host": "pve",
+                   "depends_on": {"bad": True}},
+            "ct2": {"name": "ct2", "@type": {"Container": True, "Host": True}, "ip": "x", "cores": 1,
+                    "runtime": "docker", "host": "ghost"},
+        }
+        report = expand(resources, REGISTRY)
+        self.assertEqual(
+            [(v["resource"], v["field"], v["problem"]) for v in report["violations"]],
+            [("bad", "ip", "kind"), ("bad", "cores", "kind"), ("ct2", "runtime", "value")],
+        )
+        self.assertEqual(report["Output"]["ct"]["depends_on"], {"bad": True, "pve": True})
+        self.assertEqual(report["Output"]["ct2"]["depends_on"], {"ghost": True})
+        self.assertNotIn("depends_on", report["Output"]["pve"])
+        self.assertEqual(report["unresolved"], [{"resource": "ct2", "field": "host", "target": "ghost"}])
+        self.assertEqual(report["grants"]["ct2"], {"restart": True, "ssh": True})
+        self.assertEqual(report["summary"]["contracts"], 3)
+        self.assertFalse(report["summary"]["valid"])
+
+    def test_unknown_types_are_listed_but_valid(self):
+        report = expand({"a": {"name": "a", "@type": {"Mystery": True}}}, REGISTRY)
+        self.assertEqual(report["summary"]["unknown_types"], ["Mystery"])
+        self.assertTrue(report["summary"]["valid"])
+
+
+class MainTest(unittest.TestCase):
+    def run_main(self, tmp: str, resources: dict, *flags: str) -> tuple[int, str]:
+        source, registry = os.path.join(tmp, "inv.json"), os.path.join(tmp, "reg.json")
+        for path, data in ((source, resources), (registry, REGISTRY)):
+            with open(path, "w") as f:
+                json.dump(data, f)
+        out = io.StringIO()
+        argv = ["contracts.py", source, "--registry", registry, *flags]
+        with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(out), \
+                contextlib.redirect_stderr(io.StringIO()):
+            rc = contracts.main()
+        return rc, out.getvalue()
+
+    def test_invalid_run_writes_no_expansion(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            expanded = os.path.join(tmp, "expanded.json")
+            rc, out = self.run_main(tmp, {
+                "x": {"name": "x", "@type": {"Container": True}, "runtime": "lxc", "host": "ghost"},
+            }, "--cue", "--out", expanded)
+            self.assertEqual(rc, 1)
+            self.assertEqual(out, "")
+            self.assertFalse(os.path.exists(expanded))
+
+    def test_valid_run_emits_expanded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rc, out = self.run_main(tmp, {
+                "pve": {"name": "pve", "@type": {"Host": True}, "ip": "10.0.0.1", "cores": 8},
+                "ct": {"name": "ct", "@type": {"Container": True}, "runtime": "lxc", "host": "pve"},
+            }, "--cue")
+        self.assertEqual(rc, 0)
+        self.assertTrue(out.startswith("package main\n"))
+        self.assertIn('"depends_on": {\n\t\t\t"pve": true', out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Unit tests for drift.py's streaming drift engine.
+
+Covers JSON and NDJSON input, severity rules and action templates,
+hash-state reuse between runs, missing versus null fields, and malformed
+input. Stdlib only.
+
+Usage:
+    python3 tools/test_drift.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+
+from drift import deep_diff, detect, empty_state, iter_resources, load_state
+
+DECLARED = {
+    "web": {"name": "web", "@type": {"Compute": True}, "replicas": 3, "spec": {"image": "web:2", "port": 80}},
+    "db": {"name": "db", "@type": {"Database": True}, "size": "large"},
+    "cache": {"name": "cache", "@type": {"Compute": True}, "replicas": 1},
+}
+OBSERVED = {
+    "web": {"name": "web", "@type": {"Compute": True}, "replicas": 2, "spec": {"image": "web:2", "port": 8080},
+            "uptime": 12},
+    "db": {"name": "db", "@type": {"Database": True}, "size": "large", "uptime": 99},
+    "queue": {"name": "queue", "@type": {"Compute": True}},
+}
+
+
+class DriftTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name: str, data) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            if name.endswith(".ndjson"):
+                f.writelines(json.dumps(r) + "\n" for r in data.values())
+            elif isinstance(data, str):
+                f.write(data)
+            else:
+                json.dump(data, f)
+        return path
+
+    def test_report_matches_brute_force_diff(self):
+        declared, observed = self.write("declared.json", DECLARED), self.write("observed.ndjson", OBSERVED)
+        report, _, stats = detect(declared, observed, [], None, {"uptime"}, empty_state())
+        self.assertEqual(report["missing"], {"cache": True})
+        self.assertEqual(report["extra"], {"queue": True})
+        self.assertEqual(
+            [(d["resource"], d["field"], d["declared"], d["observed"], d["severity"]) for d in report["drifts"]],
+            [("web", "replicas", 3, 2, "warning"), ("web", "spec.port", 80, 8080, "warning")],
+        )
+        self.assertEqual(stats, {"in_sync": 1, "reused": 0, "diffed": 1})
+        self.assertFalse(report["summary"]["in_sync"])
+
+    def test_rules_and_literal_braces_in_actions(self):
+        rules = [
+            {"field": "spec.*", "severity": "critical",
+             "action": "kubectl get {resource} -o jsonpath={.spec} # {field}: {declared} -> {observed}"},
+            {"type": "Compute", "severity": "info"},
+        ]
+        report, _, _ = detect(self.write("d.json", DECLARED), self.write("o.json", OBSERVED),
+                              rules, None, {"uptime"}, empty_state())
+        by_field = {d["field"]: d for d in report["drifts"]}
+        self.assertEqual(by_field["replicas"]["severity"], "info")
+        self.assertNotIn("action", by_field["replicas"])
+        self.assertEqual(by_field["spec.port"]["severity"], "critical")
+        self.assertEqual(by_field["spec.port"]["action"],
+                         "kubectl get web -o jsonpath={.spec} # spec.port: 80 -> 8080")
+
+    def test_state_reuses_unchanged_diffs(self):
+        declared, observed = self.write("d.json", DECLARED), self.write("o.json", OBSERVED)
+        first, state, _ = detect(declared, observed, [], None, {"uptime"}, empty_state())
+        second, _, stats = detect(declared, observed, [], None, {"uptime"}, json.loads(json.dumps(state)))
+        self.assertEqual(stats, {"in_sync": 1, "reused": 1, "diffed": 0})
+        self.assertEqual(second, first)
+
+    def test_fields_limit_the_comparison(self):
+        report, _, _ = detect(self.write("d.json", DECLARED), self.write("o.json", OBSERVED),
+                              [], {"replicas"}, set(), empty_state())
+        self.assertEqual([d["field"] for d in report["drifts"]], ["replicas"])
+
+    def test_missing_side_is_told_apart_from_null(self):
+        self.assertEqual(deep_diff({"a": {"b": 1}, "c": 1, "e": None}, {"a": {}, "d": 2, "e": 0}), [
+            {"field": "a.b", "declared": 1},
+            {"field": "c", "declared": 1},
+            {"field": "d", "observed": 2},
+            {"field": "e", "declared": None, "observed": 0},
+        ])
+        report, _, _ = detect(self.write("d.json", {"x": {"name": "x", "v": None}}),
+                              self.write("o.json", {"x": {"name": "x", "w": None}}),
+                              [{"severity": "info", "action": "set {field}={declared}"}], None, set(),
+                              empty_state())
+        self.assertEqual(report["drifts"], [
+            {"resource": "x", "field": "v", "declared": None, "severity": "info", "action": "set v=None"},
+            {"resource": "x", "field": "w", "observed": None, "severity": "info", "action": "set w="},
+        ])
+
+    def test_state_from_an_older_version_is_ignored(self):
+        path = self.write("state.json", {"declared": {}, "observed": {}, "diffs": {"x": {"types": [], "diffs": [
+            ["v", 1, None]]}}})
+        self.assertEqual(load_state(path), empty_state())
+
+    def test_malformed_json_raises_value_error_with_path(self):
+        for text in ('{"a": {"name": "a"}, "b": {"na', '{"a": {"name": "a"}  ', '{"a": 1 "b": 2}', '{"a" 1}', "[]",
+                     '{"a": {"name": "a"}, "b": 3}', '{"a": [1]}'):
+            path = self.write("bad.json", text)
+            with self.assertRaises(ValueError, msg=text) as cm:
+                list(iter_resources(path))
+            self.assertIn(path, str(cm.exception))
+
+    def test_ndjson_resource_must_be_an_object(self):
+        path = os.path.join(self.tmp.name, "bad.ndjson")
+        with open(path, "w") as f:
+            f.write('{"name": "a"}\n[1, 2]\n')
+        with self.assertRaisesRegex(ValueError, "bad.ndjson:2: resource is not a JSON object"):
+            list(iter_resources(path))
+
+    def test_empty_object_and_whitespace(self):
+        self.assertEqual(list(iter_resources(self.write("e.json", " {\n} "))), [])
+        path = self.write("w.json", '{ "a" :\n {"name": "a"} ,\n"b":{"name":"b"}\n}\n')
+        self.assertEqual([n for n, _ in iter_resources(path)], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
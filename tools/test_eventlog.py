@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Unit tests for eventlog.py's segmented log and incremental projector.
+
+Covers segment rollover, sequence and time-range reads against a plain
+filter, event validation, record() switching on and off, and that
+incremental projection matches a full rebuild. Stdlib only.
+
+Usage:
+    python3 tools/test_eventlog.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from eventlog import ENV_VAR, EventLog, make_event, project, record, summarize
+
+
+def events(n: int) -> list[dict]:
+    return [make_event(("merge", "validate", "project")[i % 3], f"d{i % 4}", f"d{(i + 1) % 4}",
+                       resources=[f"r{i}"], outcome=("success", "conflict")[i % 5 == 0],
+                       duration_ms=i * 1.5, input_size=i, timestamp=f"2026-03-{1 + i // 10:02d}T00:00:{i % 10:02d}+00:00")
+            for i in range(n)]
+
+
+class EventLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.log = EventLog(os.path.join(self.tmp.name, "log"), segment_events=7)
+
+    def test_segments_roll_over_and_reads_filter(self):
+        evs = events(30)
+        self.assertEqual([self.log.append(ev) for ev in evs], list(range(30)))
+        segments = self.log.segments()
+        self.assertEqual([s["count"] for s in segments], [7, 7, 7, 7, 2])
+        self.assertEqual([s["first_seq"] for s in segments], [0, 7, 14, 21, 28])
+        self.assertEqual(self.log.count(), 30)
+
+        since, until = "2026-03-02T00:00:00+00:00", "2026-03-03T00:00:05+00:00"
+        self.assertEqual([seq for seq, _ in self.log.read(12)], list(range(12, 30)))
+        self.assertEqual([seq for seq, _ in self.log.read(since=since, until=until)],
+                         [i for i, ev in enumerate(evs) if since <= ev["timestamp"] <= until])
+        self.assertEqual([ev for _, ev in self.log.read()], evs)
+
+    def test_make_event_rejects_unknown_type_and_outcome(self):
+        with self.assertRaises(ValueError):
+            make_event("delete", "a", "b")
+        with self.assertRaises(ValueError):
+            make_event("merge", "a", "b", outcome="failed")
+
+    def test_record_is_a_no_op_without_a_log(self):
+        with mock.patch.dict(os.environ, {ENV_VAR: ""}):
+            self.assertIsNone(record("merge", "a", "b"))
+            root = os.path.join(self.tmp.name, "env")
+            os.environ[ENV_VAR] = root
+            event = record("validate", "a/b", "c", started=0.0, input_size=3)
+        self.assertEqual(event["source_domain"], "a-b")
+        self.assertIn("duration_ms", event)
+        self.assertEqual(list(EventLog(root).read()), [(0, event)])
+
+    def test_unwritable_log_warns_instead_of_failing(self):
+        blocker = os.path.join(self.tmp.name, "file")
+        with open(blocker, "w") as f:
+            f.write("x")
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err):
+            self.assertIsNone(record("merge", "a", "b", log=os.path.join(blocker, "log")))
+        self.assertIn("eventlog: cannot append", err.getvalue())
+
+    def test_incremental_projection_matches_full_rebuild(self):
+        evs = events(20)
+        out = os.path.join(self.tmp.name, "report.jsonld")
+        context = os.path.join(self.tmp.name, "context.json")
+        with open(context, "w") as f:
+            json.dump({"@context": {"prov": "http://www.w3.org/ns/prov#"}}, f)
+        for ev in evs[:12]:
+            self.log.append(ev)
+        self.assertEqual(project(self.log, out, context_path=context)["new"], 12)
+        for ev in evs[12:]:
+            self.log.append(ev)
+        stats = project(self.log, out, context_path=context)
+        self.assertEqual((stats["events"], stats["new"]), (20, 8))
+        with open(out) as f:
+            incremental = json.load(f)
+
+        os.remove(out + ".state.json")
+        project(self.log, out, context_path=context)
+        with open(out) as f:
+            self.assertEqual(json.load(f), incremental)
+        self.assertEqual(project(self.log, out, agent="urn:agent:other", context_path=context)["new"], 20)
+
+        summary = summarize(self.log.read())
+        self.assertEqual(summary["total_events"], 20)
+        self.assertEqual(summary["by_outcome"]["conflict"], 4)
+        self.assertEqual(summary["duration_ms_by_type"]["merge"], sum(i * 1.5 for i in range(0, 20, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
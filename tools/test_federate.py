@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Unit tests for federate.py's streaming federation merge.
+
+Covers @id and namespace collisions, #FederatedMerge's cross-edge error
+order, the cross-domain closure against brute force, and the exit code
+for cycles and missing files. Stdlib only.
+
+Usage:
+    python3 tools/test_federate.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import federate
+from federate import Federation
+
+
+def domain(name: str, nodes: dict) -> tuple[str, str, dict, list]:
+    """(domain, namespace, context, @graph) with {local name: [required @ids]}."""
+    ns = f"urn:{name}:"
+    graph = [{"@id": ns + n, "dcterms:requires": [{"@id": r} for r in reqs]} for n, reqs in nodes.items()]
+    return name, ns, {"@base": ns}, graph
+
+
+class FederationTest(unittest.TestCase):
+    def test_collisions_keep_the_first_owner(self):
+        fed = Federation()
+        fed.add_domain(*domain("a", {"x": [], "y": []}))
+        fed.add_domain("b", "urn:a:", {}, [{"@id": "urn:a:y"}, {"@id": "urn:b:z"}])
+        fed.add_domain("c", "urn:c:", {}, [{"@id": "urn:a:y"}])
+        self.assertEqual(fed.id_owners, {"urn:a:y": ["a", "b", "c"]})
+        self.assertEqual(fed.ns_owners["urn:a:"], ["a", "b"])
+        self.assertEqual(fed.owner[fed.ids["urn:a:y"]], 0)
+        with self.assertRaisesRegex(ValueError, "given twice"):
+            fed.add_domain(*domain("a", {}))
+
+    def test_cross_edge_errors_follow_federated_merge_order(self):
+        fed = Federation()
+        fed.add_domain(*domain("a", {"x": []}))
+        fed.add_domain(*domain("b", {"y": []}))
+        errors = fed.add_cross_edges([
+            {"source_domain": "a", "source": "nope", "target_domain": "c", "target": "x"},
+            {"source_domain": "z", "source": "x", "target_domain": "b", "target": "nope2"},
+            {"source_domain": "a", "source": "x", "target_domain": "b", "target": "y"},
+        ])
+        # All source-domain errors, then target-domain, then source and target names
+        self.assertEqual([e["error"] for e in errors], [
+            "source domain 'z' not in Sources",
+            "target domain 'c' not in Sources",
+            "resource 'nope' not found in domain 'a'",
+            "resource 'nope2' not found in domain 'b'",
+        ])
+        deps, _, _ = fed.adjacency()
+        self.assertEqual(deps[fed.ids["urn:a:x"]], [fed.ids["urn:b:y"]])
+
+    def test_domain_closure_matches_brute_force(self):
+        rng = random.Random(4)
+        ids = [f"urn:d{i % 4}:n{i}" for i in range(60)]
+        requires = {nid: [ids[j] for j in range(i) if rng.random() < 0.05] for i, nid in enumerate(ids)}
+        fed = Federation()
+        for d in range(4):
+            ns = f"urn:d{d}:"
+            fed.add_domain(f"d{d}", ns, {}, [{"@id": nid, "dcterms:requires": [{"@id": r} for r in requires[nid]]}
+                                             for nid in ids if nid.startswith(ns)])
+        closure, cycle = fed.domain_closure(*fed.adjacency()[:2])
+        self.assertEqual(cycle, [])
+
+        def owner(nid):
+            return nid.split(":")[1]
+        expected = {f"d{d}": set() for d in range(4)}
+        for nid in ids:
+            seen, stack = set(), list(requires[nid])
+            while stack:
+                r = stack.pop()
+                if r not in seen:
+                    seen.add(r)
+                    stack.extend(requires[r])
+            expected[owner(nid)] |= {owner(r) for r in seen} - {owner(nid)}
+        self.assertEqual({d: set(c) for d, c in closure.items()}, expected)
+
+
+class MainTest(unittest.TestCase):
+    def run_main(self, *args: str) -> tuple[int, dict]:
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", ["federate.py", *args]), contextlib.redirect_stdout(out), \
+                contextlib.redirect_stderr(io.StringIO()):
+            rc = federate.main()
+        return rc, json.loads(out.getvalue())
+
+    def write(self, tmp: str, spec: tuple) -> str:
+        name, ns, context, graph = spec
+        path = os.path.join(tmp, name + ".json")
+        with open(path, "w") as f:
+            json.dump({"Domain": name, "Namespace": ns, "jsonld": {"@context": context, "@graph": graph}}, f)
+        return path
+
+    def test_cross_domain_cycle_is_invalid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            a = self.write(tmp, domain("a", {"x": ["urn:b:y"]}))
+            b = self.write(tmp, domain("b", {"y": []}))
+            rc, report = self.run_main(a, b)
+            self.assertEqual((rc, report["summary"]["valid"]), (0, True))
+            b = self.write(tmp, domain("b", {"y": ["urn:a:x"]}))
+            rc, report = self.run_main(a, b)
+        self.assertEqual(rc, 1)
+        self.assertEqual(report["cycle"], ["urn:a:x", "urn:b:y"])
+        self.assertFalse(report["summary"]["valid"])
+
+    def test_missing_file_is_a_usage_error(self):
+        err = io.StringIO()
+        with mock.patch.object(sys, "argv", ["federate.py", "/nonexistent/a.json"]), \
+                contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as cm:
+            federate.main()
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn("No such file", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
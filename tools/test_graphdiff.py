@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Unit tests for graphdiff.py's incremental closure delta.
+
+closure_delta recomputes ancestors only around changed edges; these
+tests compare it with full before/after closures over random edits of
+random DAGs. Stdlib only.
+
+Usage:
+    python3 tools/test_graphdiff.py
+"""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+from graphdiff import closure_delta, region_ancestors, structural_diff
+from test_toposort import brute_ancestors, brute_dependents, random_dag
+
+
+def random_edit(resources: dict, seed: int) -> dict:
+    """Add and drop edges, drop a node and add one, keeping a DAG."""
+    rng = random.Random(seed)
+    names = list(resources)
+    removed = rng.choice(names)
+    after = {}
+    for i, name in enumerate(names):
+        if name == removed:
+            continue
+        deps = {d for d in resources[name].get("depends_on") or {} if d != removed}
+        deps = {d for d in deps if rng.random() > 0.05}
+        deps |= {d for d in names[:i] if d != removed and rng.random() < 0.01}
+        r = {"name": name, "@type": {"Task": True}}
+        if deps:
+            r["depends_on"] = {d: True for d in sorted(deps)}
+        after[name] = r
+    parents = [n for n in after if rng.random() < 0.1]
+    after["added"] = {"name": "added", "@type": {"Task": True}, "depends_on": {p: True for p in parents}}
+    return after
+
+
+def expected_changes(before: dict, after: dict) -> dict:
+    """closure_delta's result, from full closures on both sides."""
+    anc_b, anc_a = brute_ancestors(before), brute_ancestors(after)
+    dep_b, dep_a = brute_dependents(before), brute_dependents(after)
+    changes = {}
+    for name in after:
+        kinds = {
+            "ancestors_added": anc_a[name] - anc_b.get(name, set()),
+            "ancestors_removed": anc_b.get(name, set()) - anc_a[name],
+            "dependents_added": dep_a[name] - dep_b.get(name, set()),
+            "dependents_removed": dep_b.get(name, set()) - dep_a[name],
+        }
+        kinds = {k: {m: True for m in sorted(v)} for k, v in sorted(kinds.items()) if v}
+        if kinds:
+            changes[name] = kinds
+    return dict(sorted(changes.items()))
+
+
+class ClosureDeltaTest(unittest.TestCase):
+    def test_matches_full_recomputation(self):
+        for seed in range(30):
+            before = random_dag(30, 0.15, seed)
+            after = random_edit(before, seed)
+            diff = structural_diff(before, after)
+            changes, recomputed = closure_delta(before, after, diff)
+            self.assertEqual(changes, expected_changes(before, after), seed)
+            self.assertLessEqual(recomputed, len(after))
+
+    def test_region_ancestors_cover_only_what_is_read(self):
+        resources = random_dag(40, 0.1, 3)
+        ancestors = brute_ancestors(resources)
+        region = {"n30", "n31"}
+        out = region_ancestors(resources, region, ["n12"])
+        outside = {d for n in region for d in resources[n].get("depends_on") or {}} - region
+        self.assertEqual(set(out), region | outside | {"n12"})
+        for name, ancs in out.items():
+            self.assertEqual(set(ancs), ancestors[name])
+
+    def test_unchanged_graph_recomputes_nothing(self):
+        before = random_dag(30, 0.15, 1)
+        changes, recomputed = closure_delta(before, before, structural_diff(before, before))
+        self.assertEqual((changes, recomputed), ({}, 0))
+
+    def test_removed_edge_drops_both_directions(self):
+        before = {
+            "a": {"name": "a"},
+            "b": {"name": "b", "depends_on": {"a": True}},
+            "c": {"name": "c", "depends_on": {"b": True}},
+        }
+        after = {**before, "b": {"name": "b"}}
+        changes, recomputed = closure_delta(before, after, structural_diff(before, after))
+        self.assertEqual(recomputed, 2)
+        self.assertEqual(changes, {
+            "a": {"dependents_removed": {"b": True, "c": True}},
+            "b": {"ancestors_removed": {"a": True}},
+            "c": {"ancestors_removed": {"a": True}},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
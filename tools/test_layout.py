@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Unit tests for layout.py's layered (Sugiyama) layout.
+
+The Fenwick crossing count is compared with a pairwise count, and random
+DAG layouts are checked for layering, spacing and edge routes. Also
+covers the layout cache and Mermaid id injectivity. Stdlib only.
+
+Usage:
+    python3 tools/test_layout.py
+"""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from layout import cached_layout, compute_layout, count_crossings, normalize, render_mermaid
+from test_toposort import random_dag
+from toposort import toposort
+
+
+def brute_crossings(layers: list[list[int]], down: dict) -> int:
+    """Pairs of edges between adjacent layers whose endpoints interleave."""
+    total = 0
+    for upper, lower in zip(layers, layers[1:]):
+        pu = {n: i for i, n in enumerate(upper)}
+        pl = {n: i for i, n in enumerate(lower)}
+        edges = [(pu[u], pl[v]) for u in upper for v in down[u]]
+        for i, (a1, b1) in enumerate(edges):
+            for a2, b2 in edges[i + 1:]:
+                if (a1 - a2) * (b1 - b2) < 0:
+                    total += 1
+    return total
+
+
+class LayoutTest(unittest.TestCase):
+    def test_crossing_count_matches_pairwise(self):
+        for seed in range(10):
+            resources = random_dag(30, 0.15, seed)
+            order, depth = toposort(resources)
+            layers, _, down, _ = normalize(resources, order, depth)
+            self.assertEqual(count_crossings(layers, down), brute_crossings(layers, down), seed)
+
+    def test_layout_is_layered_and_spaced(self):
+        for seed in range(10):
+            resources = random_dag(30, 0.15, seed)
+            order, depth = toposort(resources)
+            layers, _, down, _ = normalize(resources, order, depth)
+            initial = count_crossings(layers, down)
+            layout = compute_layout(resources, dx=120.0, dy=100.0)
+
+            self.assertLessEqual(layout["crossings"], initial)
+            self.assertEqual(set(layout["nodes"]), set(resources))
+            for name, (_, y) in layout["nodes"].items():
+                self.assertEqual(y, depth[name] * 100.0)
+            for layer in layout["layers"]:
+                xs = [layout["nodes"][n][0] for n in layer]
+                for a, b in zip(xs, xs[1:]):
+                    self.assertGreaterEqual(b - a, 120.0 - 0.01)
+            self.assertEqual(len(layout["edges"]), sum(len(r.get("depends_on") or {}) for r in resources.values()))
+            for dep, name, points in layout["edges"]:
+                self.assertEqual(len(points), depth[name] - depth[dep] + 1)
+                self.assertEqual(points[0], layout["nodes"][dep])
+                self.assertEqual(points[-1], layout["nodes"][name])
+
+    def test_cache_hit_returns_the_same_layout(self):
+        resources = random_dag(20, 0.2, 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            first, hit1 = cached_layout(resources, Path(tmp), dx=80.0)
+            second, hit2 = cached_layout(resources, Path(tmp), dx=80.0)
+            _, hit3 = cached_layout(resources, Path(tmp), dx=90.0)
+        self.assertEqual((hit1, hit2, hit3), (False, True, False))
+        self.assertEqual(second["nodes"], {k: list(v) for k, v in first["nodes"].items()})
+
+    def test_mermaid_ids_are_injective(self):
+        names = ["a-b", "a.b", "a_b", "a_hb", "a__b", "a_db", "ab"]
+        resources = {n: {"name": n} for n in names}
+        text = render_mermaid(resources, compute_layout(resources))
+        ids = [line.split("[")[0].strip() for line in text.splitlines()[1:] if "[" in line]
+        self.assertEqual(len(ids), len(names))
+        self.assertEqual(len(set(ids)), len(names))
+
+
+if __name__ == "__main__":
+    unittest.main()
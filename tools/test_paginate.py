@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Unit tests for paginate.py's paged JSON-LD export.
+
+Every page and index link is resolved as a JSON-LD processor would
+(against @base, else the document URL) and must name a written file.
+Also covers the AS2 page chain and page stability under edits. Stdlib only.
+
+Usage:
+    python3 tools/test_paginate.py
+"""
+
+from __future__ import annotations
+
+import unittest
+from urllib.parse import urljoin
+
+from paginate import context_base, paginate
+
+BASE = "https://example.org/data/"
+
+
+def resolve(link: str, doc_url: str, shared) -> str:
+    """IRI a link resolves to: against the context's @base if set, else doc_url."""
+    base = context_base(shared)
+    return urljoin(urljoin(doc_url, base) if base else doc_url, link)
+
+
+def links(doc: dict) -> list[str]:
+    """Every page/index link in an index or page document."""
+    out = [doc[k] for k in ("@id", "id", "partOf", "next", "first", "last") if k in doc]
+    out += [doc["dcterms:isPartOf"]["@id"]] if "dcterms:isPartOf" in doc else []
+    for s in doc.get("void:subset", []):
+        out += [s["@id"], s["void:dataDump"]["@id"]]
+    return out
+
+
+def graph(n: int, context) -> dict:
+    return {"@context": context, "dcterms:title": "g",
+            "@graph": [{"@id": f"node-{i}", "dcterms:title": str(i)} for i in range(n)]}
+
+
+class LinkResolutionTest(unittest.TestCase):
+    def check_links(self, files: dict, base: str, shared):
+        urls = {base + name for name in files}
+        for name, doc in files.items():
+            for link in links(doc):
+                self.assertIn(resolve(link, base + name, shared), urls, f"{name}: {link}")
+
+    def test_absolute_base_links_resolve_to_files(self):
+        shared = {"@base": "urn:resource:", "dcterms": "http://purl.org/dc/terms/"}
+        files = paginate(graph(40, shared), 4, BASE)
+        self.check_links(files, BASE, shared)
+        self.assertEqual(files["context.jsonld"], {"@context": shared})
+
+    def test_relative_links_need_a_context_without_base(self):
+        shared = {"dcterms": "http://purl.org/dc/terms/"}
+        self.check_links(paginate(graph(40, shared), 4), BASE, shared)
+        with self.assertRaisesRegex(ValueError, "--base"):
+            paginate(graph(40, {"@base": "urn:resource:"}), 4)
+
+    def test_activity_stream_chain(self):
+        doc = {"@context": "https://www.w3.org/ns/activitystreams", "type": "OrderedCollection",
+               "orderedItems": [{"type": "Create", "object": {"id": f"urn:x:{i}"}} for i in range(10)]}
+        files = paginate(doc, 4, BASE)
+        self.check_links(files, BASE, doc["@context"])
+        index = files["index.jsonld"]
+        self.assertEqual(index["totalItems"], 10)
+        # Newest first: follow next from index.first back to the oldest page
+        seen, url = [], index["first"]
+        while url:
+            page = files[url[len(BASE):]]
+            seen += [a["object"]["id"] for a in page["orderedItems"]]
+            url = page.get("next")
+        self.assertEqual(seen, [f"urn:x:{i}" for i in reversed(range(10))])
+        self.assertEqual([len(files[n]["orderedItems"]) for n in ("page-0000.jsonld", "page-0002.jsonld")], [4, 2])
+
+
+class PartitionTest(unittest.TestCase):
+    def test_editing_an_item_replaces_only_its_page(self):
+        doc = graph(200, {"@base": "urn:resource:"})
+        before = paginate(doc, 8, BASE)
+        doc["@graph"][100]["dcterms:title"] = "edited"
+        after = paginate(doc, 8, BASE)
+        pages_b = {n for n in before if n.startswith("page-")}
+        pages_a = {n for n in after if n.startswith("page-")}
+        self.assertEqual(len(pages_b - pages_a), 1)
+        self.assertEqual(len(pages_a - pages_b), 1)
+        order = [s["@id"][len(BASE):] for s in after["index.jsonld"]["void:subset"]]
+        self.assertEqual(set(order), pages_a)
+        items = [i for n in order for i in after[n]["@graph"]]
+        self.assertEqual(items, doc["@graph"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Unit tests for runner.py's bootstrap and smoke paths.
+
+Runs tiny plans of real bash commands: failing creates, health checks
+that time out or recover on retry, dependents of a failure, out-of-plan
+dependencies and cycles, and checks that --report only uses prefixes
+the shared vocab context defines. Needs bash; stdlib only.
+
+Usage:
+    python3 tools/test_runner.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from eventlog import load_context
+from runner import Stream, main, run_bootstrap, run_smoke
+
+
+def outcomes(stream: Stream) -> dict[str, str]:
+    return {step: outcome.split(":", 1)[1] for step, outcome, _ in stream.steps}
+
+
+def info(stream: Stream, step: str) -> str:
+    for a in stream.assertions:
+        if a["earl:test"]["dcterms:title"] == step:
+            return a["earl:result"].get("earl:info", "")
+    raise KeyError(step)
+
+
+class BootstrapTest(unittest.TestCase):
+    def bootstrap(self, resources: dict, create_timeout: float | None = None) -> tuple[bool, Stream]:
+        stream = Stream(io.StringIO())
+        ok = asyncio.run(run_bootstrap(resources, asyncio.Semaphore(4), None, stream,
+                                       create_timeout, retry_delay=0))
+        return ok, stream
+
+    def test_failed_create_marks_dependents_untested(self):
+        ok, stream = self.bootstrap({
+            "db": {"lifecycle": {"create": "echo boom; exit 3"}},
+            "api": {"depends_on": {"db": True}, "lifecycle": {"create": "true"}},
+            "web": {"depends_on": {"api": True}, "lifecycle": {"create": "true"}},
+            "dns": {"lifecycle": {"create": "true"}},
+        })
+        self.assertFalse(ok)
+        self.assertEqual(outcomes(stream), {"db": "failed", "api": "untested", "web": "untested", "dns": "passed"})
+        self.assertIn("create exited 3", info(stream, "db"))
+        self.assertIn("boom", info(stream, "db"))
+        self.assertIn("dependency failed: db", info(stream, "api"))
+        # Every line streamed to stdout is one assertion
+        self.assertEqual(len(stream.out.getvalue().splitlines()), 4)
+
+    def test_create_timeout_kills_the_command(self):
+        ok, stream = self.bootstrap({"slow": {"lifecycle": {"create": "sleep 30"}}}, create_timeout=0.2)
+        self.assertFalse(ok)
+        self.assertEqual(outcomes(stream), {"slow": "failed"})
+        self.assertIn("create timed out", info(stream, "slow"))
+        self.assertLess(stream.steps[0][2], 5)
+        duration = stream.assertions[0]["earl:result"]["time:hasDuration"]
+        self.assertEqual(duration["time:unitType"], {"@id": "time:unitSecond"})
+        self.assertEqual(duration["time:numericDuration"], stream.steps[0][2])
+
+    def test_health_timeout_exhausts_retries(self):
+        ok, stream = self.bootstrap({
+            "svc": {"health": {"command": "sleep 30", "timeout": "100ms", "retries": 2}},
+        })
+        self.assertFalse(ok)
+        self.assertIn("health check timed out after 2 attempts", info(stream, "svc"))
+
+    def test_health_passes_on_a_later_attempt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = os.path.join(tmp, "tries")
+            # Fails twice, then succeeds
+            command = f"echo x >> {marker}; [ $(wc -l < {marker}) -ge 3 ]"
+            ok, stream = self.bootstrap({
+                "svc": {"health": {"command": command, "timeout": "5s", "retries": 3}},
+            })
+            self.assertTrue(ok)
+            with open(marker) as f:
+                self.assertEqual(len(f.read().splitlines()), 3)
+        self.assertEqual(outcomes(stream), {"svc": "passed"})
+
+    def test_out_of_plan_dependency_is_ignored(self):
+        ok, stream = self.bootstrap({
+            "api": {"depends_on": {"external-dns": True}, "lifecycle": {"create": "true"}},
+        })
+        self.assertTrue(ok)
+        self.assertEqual(outcomes(stream), {"api": "passed"})
+
+    def test_cycle_is_rejected_before_anything_runs(self):
+        with self.assertRaisesRegex(ValueError, "cycle in bootstrap plan: a, b"):
+            self.bootstrap({
+                "a": {"depends_on": {"b": True}, "lifecycle": {"create": "true"}},
+                "b": {"depends_on": {"a": True}, "lifecycle": {"create": "true"}},
+                "c": {"lifecycle": {"create": "true"}},
+            })
+
+
+class ReportTest(unittest.TestCase):
+    def test_report_uses_the_shared_context(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checks, report = os.path.join(tmp, "verify.json"), os.path.join(tmp, "earl.json")
+            with open(checks, "w") as f:
+                json.dump({"checks": [{"label": "c", "command": "echo ok", "expected": "ok"}]}, f)
+            argv = ["runner.py", "--smoke", checks, "--report", report]
+            with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(io.StringIO()), \
+                    contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main(), 0)
+            with open(report) as f:
+                doc = json.load(f)
+        context = load_context(None)
+        self.assertEqual(doc["@context"], context)
+        used = {k.split(":")[0] for a in doc["@graph"] for node in (a, a.get("earl:result", {}))
+                for k in node if ":" in k and not k.startswith("@")}
+        self.assertLessEqual(used, set(context))
+
+
+class SmokeTest(unittest.TestCase):
+    def smoke(self, checks: list, timeout: float | None = None, skip: str | None = None):
+        stream = Stream(io.StringIO())
+        ok = asyncio.run(run_smoke(checks, asyncio.Semaphore(4), "urn:test", stream, timeout, skip))
+        return ok, stream
+
+    def test_expected_output_and_timeout(self):
+        ok, stream = self.smoke([
+            {"label": "match", "command": "echo status: ok", "expected": "ok$"},
+            {"label": "mismatch", "command": "echo down", "expected": "up"},
+            {"label": "hang", "command": "sleep 30", "expected": "x"},
+        ], timeout=0.2)
+        self.assertFalse(ok)
+        self.assertEqual(outcomes(stream), {"match": "passed", "mismatch": "failed", "hang": "failed"})
+        self.assertEqual(info(stream, "hang"), "timed out")
+        self.assertEqual(info(stream, "mismatch"), "down")
+
+    def test_skipped_after_failed_bootstrap(self):
+        ok, stream = self.smoke([{"label": "c", "command": "true", "expected": ""}], skip="bootstrap failed")
+        self.assertFalse(ok)
+        self.assertEqual(outcomes(stream), {"c": "untested"})
+        self.assertEqual(info(stream, "c"), "bootstrap failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Unit tests for scheduler.py's list scheduler and layer-gated baseline.
+
+Schedules of random DAGs are checked for dependency order, the worker
+cap and per-type caps, and against the CPM critical path. Stdlib only.
+
+Usage:
+    python3 tools/test_scheduler.py
+"""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+from scheduler import layered_makespan, list_schedule
+from test_toposort import random_dag
+from toposort import compute_cpm, toposort
+
+
+def typed_dag(n: int, seed: int) -> tuple[dict, dict]:
+    """Random DAG with one of three @types per node, plus random durations."""
+    rng = random.Random(seed)
+    resources = random_dag(n, 0.1, seed)
+    for r in resources.values():
+        r["@type"] = {rng.choice(("Compute", "Database", "Network")): True}
+    weights = {name: rng.randint(1, 9) for name in resources}
+    return resources, weights
+
+
+def peak(steps: dict, names) -> int:
+    """Most of names running at once ([start, finish) intervals)."""
+    events = sorted((t, d) for n in names
+                    for t, d in ((steps[n]["start"], 1), (steps[n]["finish"], -1)))
+    running = best = 0
+    for _, d in events:
+        running += d
+        best = max(best, running)
+    return best
+
+
+class ListScheduleTest(unittest.TestCase):
+    def check(self, resources, cpm, steps, workers, limits):
+        self.assertEqual(set(steps), set(resources))
+        for name, r in resources.items():
+            s = steps[name]
+            self.assertEqual(s["finish"], s["start"] + cpm["duration"][name])
+            self.assertGreaterEqual(s["start"], cpm["earliest"][name])
+            for dep in r.get("depends_on") or {}:
+                self.assertGreaterEqual(s["start"], steps[dep]["finish"], f"{name} before {dep}")
+        if workers is not None:
+            self.assertLessEqual(peak(steps, resources), workers)
+            self.assertLessEqual(max(s["worker"] for s in steps.values()), workers - 1)
+        for ty, cap in limits.items():
+            self.assertLessEqual(peak(steps, [n for n, r in resources.items() if ty in r["@type"]]), cap)
+
+    def test_caps_and_dependencies_hold(self):
+        for seed in range(15):
+            resources, weights = typed_dag(60, seed)
+            order, _ = toposort(resources)
+            cpm = compute_cpm(resources, order, weights)
+            for workers, limits in ((None, {}), (4, {}), (None, {"Database": 1}), (3, {"Compute": 2})):
+                steps = list_schedule(resources, cpm, workers, limits)
+                self.check(resources, cpm, steps, workers, limits)
+
+    def test_unlimited_schedule_meets_critical_path(self):
+        for seed in range(15):
+            resources, weights = typed_dag(60, seed)
+            order, _ = toposort(resources)
+            cpm = compute_cpm(resources, order, weights)
+            steps = list_schedule(resources, cpm)
+            critical = max(cpm["earliest"][n] + cpm["duration"][n] for n in resources)
+            self.assertEqual(max(s["finish"] for s in steps.values()), critical)
+            for name, s in steps.items():
+                self.assertEqual(s["start"], cpm["earliest"][name])
+
+    def test_single_worker_is_serial(self):
+        resources, weights = typed_dag(30, 3)
+        order, _ = toposort(resources)
+        cpm = compute_cpm(resources, order, weights)
+        steps = list_schedule(resources, cpm, workers=1)
+        self.assertEqual(max(s["finish"] for s in steps.values()), sum(weights.values()))
+
+
+class LayeredMakespanTest(unittest.TestCase):
+    def test_uncapped_is_sum_of_slowest_per_layer(self):
+        resources, weights = typed_dag(60, 5)
+        order, depth = toposort(resources)
+        cpm = compute_cpm(resources, order, weights)
+        slowest = {}
+        for name in order:
+            slowest[depth[name]] = max(slowest.get(depth[name], 0), weights[name])
+        self.assertEqual(layered_makespan(resources, order, depth, cpm), sum(slowest.values()))
+
+    def test_caps_apply_to_the_baseline(self):
+        # Three independent unit tasks: one layer, three rounds on one worker
+        resources = {n: {"name": n, "@type": {"Task": True}} for n in ("a", "b", "c")}
+        order, depth = toposort(resources)
+        cpm = compute_cpm(resources, order)
+        self.assertEqual(layered_makespan(resources, order, depth, cpm), 1)
+        self.assertEqual(layered_makespan(resources, order, depth, cpm, workers=1), 3)
+        self.assertEqual(layered_makespan(resources, order, depth, cpm, limits={"Task": 2}), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
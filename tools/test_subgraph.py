@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Unit tests for subgraph.py's CSR walks.
+
+Layer- and hop-bounded walks in both directions are compared with brute
+force over random DAGs, and the output formats and answer cache are
+checked. Stdlib only.
+
+Usage:
+    python3 tools/test_subgraph.py
+"""
+
+from __future__ import annotations
+
+import unittest
+
+from subgraph import SubgraphIndex, as_input, as_subgraph
+from test_toposort import brute_ancestors, brute_dependents, random_dag
+from toposort import toposort
+
+
+def within_hops(resources: dict, target: str, radius: int, upward: bool) -> set[str]:
+    """Nodes at most radius edges from target, one direction, by repeated expansion."""
+    children = {n: set() for n in resources}
+    for n, r in resources.items():
+        for d in r.get("depends_on") or {}:
+            children[d].add(n)
+    step = (lambda n: set(resources[n].get("depends_on") or {})) if upward else children.get
+    reached = {target}
+    for _ in range(radius):
+        reached |= {m for n in reached for m in step(n)}
+    return reached
+
+
+class WalkTest(unittest.TestCase):
+    def test_walks_match_brute_force(self):
+        for seed in range(10):
+            resources = random_dag(40, 0.1, seed)
+            _, depth = toposort(resources)
+            ancestors, dependents = brute_ancestors(resources), brute_dependents(resources)
+            sg = SubgraphIndex(resources)
+
+            def names(ids):
+                return {sg.names[i] for i in ids}
+            for target in ("n5", "n20", "n35"):
+                for radius in (0, 1, 2, None):
+                    down = {n for n in dependents[target] | {target}
+                            if radius is None or depth[n] - depth[target] <= radius}
+                    up = {n for n in ancestors[target] | {target}
+                          if radius is None or depth[target] - depth[n] <= radius}
+                    q = {"target": target, "radius": radius}
+                    self.assertEqual(names(sg.select({**q, "mode": "descendants"})), down)
+                    self.assertEqual(names(sg.select({**q, "mode": "ancestors"})), up)
+                    self.assertEqual(names(sg.select({**q, "mode": "both"})), down | up)
+                    if radius is not None:
+                        self.assertEqual(names(sg.select({**q, "mode": "ancestors", "hops": True})),
+                                         within_hops(resources, target, radius, upward=True))
+                        self.assertEqual(names(sg.select({**q, "mode": "descendants", "hops": True})),
+                                         within_hops(resources, target, radius, upward=False))
+            roots = names(sg.select({"roots": ["n0", "n1"]}))
+            self.assertEqual(roots, {"n0", "n1"} | dependents["n0"] | dependents["n1"])
+
+    def test_outputs_and_cache(self):
+        resources = random_dag(30, 0.15, 2)
+        cache = {}
+        sg = SubgraphIndex(resources, cache)
+        selected = sg.select({"target": "n10", "mode": "both", "radius": 2})
+        sub = as_subgraph(sg, selected)
+        inp = as_input(sg, resources, selected)
+        self.assertEqual(set(sub["selected"]), set(inp))
+        self.assertEqual(sorted((e["source"], e["target"]) for e in sub["edges"]),
+                         sorted((d, n) for n, r in inp.items() for d in r.get("depends_on") or {}))
+        for name, r in inp.items():
+            self.assertEqual(set(r.get("depends_on") or {}),
+                             set(resources[name].get("depends_on") or {}) & set(inp))
+
+        again = SubgraphIndex(resources, cache)
+        self.assertEqual(again.select({"target": "n10", "mode": "both", "radius": 2}), selected)
+        self.assertEqual((again.hits, again.misses), (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
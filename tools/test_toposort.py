@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Unit tests for toposort.py's reduction and reachability labels.
+
+Each algorithm is checked against a brute-force closure over small
+random DAGs. Stdlib only.
+
+Usage:
+    python3 tools/test_toposort.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from toposort import (
+    compute_gaps,
+    compute_reach,
+    expand_reach,
+    interval_labels,
+    parse_cue_block,
+    precompute,
+    reduce_resources,
+    rewrite_cue_deps,
+    run_reduce,
+    toposort,
+    transitive_reduction,
+    verify_reduction,
+    write_cue,
+)
+
+
+def random_dag(n: int, p: float, seed: int) -> dict:
+    """{name: resource} with each node depending on earlier ones at rate p."""
+    rng = random.Random(seed)
+    names = [f"n{i}" for i in range(n)]
+    resources = {}
+    for i, name in enumerate(names):
+        deps = {d: True for d in names[:i] if rng.random() < p}
+        r = {"name": name, "@type": {"Task": True}}
+        if deps:
+            r["depends_on"] = deps
+        resources[name] = r
+    return resources
+
+
+def brute_ancestors(resources: dict) -> dict[str, set[str]]:
+    """Every node's transitive dependencies, by DFS from each node."""
+    out = {}
+    for name in resources:
+        seen = set()
+        stack = list(resources[name].get("depends_on") or {})
+        while stack:
+            d = stack.pop()
+            if d not in seen:
+                seen.add(d)
+                stack.extend(resources[d].get("depends_on") or {})
+        out[name] = seen
+    return out
+
+
+def brute_dependents(resources: dict) -> dict[str, set[str]]:
+    ancestors = brute_ancestors(resources)
+    out = {name: set() for name in resources}
+    for name, ancs in ancestors.items():
+        for a in ancs:
+            out[a].add(name)
+    return out
+
+
+class TransitiveReductionTest(unittest.TestCase):
+    def test_shortcut_edge_is_redundant(self):
+        resources = {
+            "a": {"name": "a"},
+            "b": {"name": "b", "depends_on": {"a": True}},
+            "c": {"name": "c", "depends_on": {"a": True, "b": True}},
+        }
+        order, _ = toposort(resources)
+        self.assertEqual(transitive_reduction(resources, order),
+                         [{"source": "a", "target": "c", "via": "b"}])
+
+    def test_reduction_is_minimal_and_closure_preserving(self):
+        for seed in range(20):
+            resources = random_dag(25, 0.25, seed)
+            order, _ = toposort(resources)
+            redundant = transitive_reduction(resources, order)
+            reduced = reduce_resources(resources, redundant)
+
+            self.assertEqual(brute_ancestors(reduced), brute_ancestors(resources), seed)
+            self.assertEqual(verify_reduction(resources, reduced, order), [], seed)
+            for e in redundant:
+                self.assertIn(e["via"], resources[e["target"]]["depends_on"])
+                self.assertIn(e["source"], brute_ancestors(resources)[e["via"]])
+            # Minimal: dropping any remaining edge changes the closure
+            closure = brute_ancestors(reduced)
+            for name, r in reduced.items():
+                for dep in r.get("depends_on") or {}:
+                    smaller = dict(reduced)
+                    smaller[name] = {**r, "depends_on": {d: True for d in r["depends_on"] if d != dep}}
+                    self.assertNotEqual(brute_ancestors(smaller)[name], closure[name],
+                                        f"seed {seed}: {name} -> {dep} is redundant but kept")
+
+
+CUE_TASKS = """package main
+
+_tasks: {
+	"a": {
+		name: "a"
+		"@type": {Task: true}
+	}
+	"b": {
+		name: "b"
+		"@type": {Task: true}
+		depends_on: {"a": true}
+	}
+	"c": {
+		name: "c"
+		"@type": {Task: true}
+		depends_on: {"a": true, "b": true}
+	}
+	"d": {
+		name: "d"
+		"@type": {Task: true}
+		depends_on: {
+			"a": true
+			"c": true
+		}
+	}
+}
+"""
+
+
+class RewriteCueDepsTest(unittest.TestCase):
+    def test_rewrite_keeps_layout_and_minimal_edges(self):
+        resources = parse_cue_block(CUE_TASKS, "_tasks")
+        order, _ = toposort(resources)
+        redundant = transitive_reduction(resources, order)
+        self.assertEqual(sorted((e["target"], e["source"]) for e in redundant),
+                         [("c", "a"), ("d", "a")])
+
+        text = rewrite_cue_deps(CUE_TASKS, "_tasks", redundant)
+        self.assertIn('\t\tdepends_on: {"b": true}\n', text)
+        self.assertIn('\t\tdepends_on: {\n\t\t\t"c": true\n\t\t}\n', text)
+        self.assertEqual(parse_cue_block(text, "_tasks"), reduce_resources(resources, redundant))
+
+    def test_rewrite_without_redundant_edges_is_identity(self):
+        self.assertEqual(rewrite_cue_deps(CUE_TASKS, "_tasks", []), CUE_TASKS)
+
+    def test_reduce_write_rewrites_the_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.cue")
+            with open(path, "w") as f:
+                f.write(CUE_TASKS)
+            resources = parse_cue_block(CUE_TASKS, "_tasks")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+                rc = run_reduce(path, resources, "_tasks", write=True)
+            self.assertEqual(rc, 0)
+            self.assertEqual(json.loads(out.getvalue())["summary"],
+                             {"edges": 5, "redundant": 2, "minimal_edges": 3, "verified": True})
+            with open(path) as f:
+                rewritten = parse_cue_block(f.read(), "_tasks")
+        self.assertEqual(brute_ancestors(rewritten), brute_ancestors(resources))
+        self.assertEqual(sum(len(r.get("depends_on") or {}) for r in rewritten.values()), 3)
+
+
+class IntervalLabelsTest(unittest.TestCase):
+    def test_chain_is_one_interval(self):
+        # 0 -> 1 -> 2: post-order 2, 1, 0; each node covers a suffix
+        order, intervals = interval_labels([[1], [2], []], [0])
+        self.assertEqual(order, [2, 1, 0])
+        self.assertEqual(intervals, [[[0, 2]], [[0, 1]], [[0, 0]]])
+
+    def test_labels_match_brute_force_closure(self):
+        for seed in range(20):
+            resources = random_dag(40, 0.1, seed)
+            order, _ = toposort(resources)
+            labels = compute_reach(resources, order)
+            ancestors = brute_ancestors(resources)
+            dependents = brute_dependents(resources)
+            for name in resources:
+                self.assertEqual(set(expand_reach(labels["up"], name)), ancestors[name], (seed, name))
+                self.assertEqual(set(expand_reach(labels["down"], name)), dependents[name], (seed, name))
+
+    def test_matrix_keeps_reach_labels(self):
+        resources = random_dag(30, 0.15, 7)
+        order, _ = toposort(resources)
+        data = precompute(resources, {"depth", "reach", "matrix"})
+        self.assertEqual(data["reach"], compute_reach(resources, order))
+        self.assertEqual(len(data["matrix_bits"]), len(resources))
+        out = io.StringIO()
+        write_cue(out, data, {"depth", "reach", "matrix"})
+        self.assertIn("reach: {", out.getvalue())
+
+
+class ComputeGapsTest(unittest.TestCase):
+    def test_next_gate_breaks_phase_ties_by_name(self):
+        charter = {"gates": {
+            "zeta": {"phase": 1, "requires": {"missing-z": True}},
+            "alpha": {"phase": 1, "requires": {"missing-a": True}},
+            "done": {"phase": 0, "requires": {"a": True}},
+        }}
+        gaps = compute_gaps({"a": {"name": "a"}}, {"a": 0}, charter)
+        self.assertEqual(gaps["next_gate"], "alpha")
+
+
+if __name__ == "__main__":
+    unittest.main()
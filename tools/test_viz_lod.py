@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Unit tests for viz_lod.py's level-of-detail export.
+
+Chunks of random multi-component DAGs are checked for coverage, size,
+edge placement and bounding boxes, and the summaries for counts, edge
+weights and chunk references. Stdlib only.
+
+Usage:
+    python3 tools/test_viz_lod.py
+"""
+
+from __future__ import annotations
+
+import unittest
+
+from test_toposort import brute_ancestors, brute_dependents, random_dag
+from toposort import toposort
+from viz_lod import export_lod
+
+
+def forest(seed: int) -> dict:
+    """Three random DAGs of different sizes plus two orphans, in one map."""
+    resources = {}
+    for prefix, n in (("a", 60), ("b", 25), ("c", 8)):
+        for name, r in random_dag(n, 0.1, seed).items():
+            r = {**r, "name": prefix + name, "@type": {prefix.upper() + "Type": True}}
+            if "depends_on" in r:
+                r["depends_on"] = {prefix + d: True for d in r["depends_on"]}
+            resources[prefix + name] = r
+    resources["orphan1"] = {"name": "orphan1", "@type": {"Orphan": True}}
+    resources["orphan2"] = {"name": "orphan2"}
+    return resources
+
+
+def components(resources: dict) -> set[frozenset]:
+    """Weakly connected components, by flood fill over undirected edges."""
+    adj = {n: set() for n in resources}
+    for n, r in resources.items():
+        for d in r.get("depends_on") or {}:
+            adj[n].add(d)
+            adj[d].add(n)
+    seen, out = set(), set()
+    for n in resources:
+        if n not in seen:
+            comp, stack = set(), [n]
+            while stack:
+                m = stack.pop()
+                if m not in comp:
+                    comp.add(m)
+                    stack.extend(adj[m])
+            seen |= comp
+            out.add(frozenset(comp))
+    return out
+
+
+class ExportLodTest(unittest.TestCase):
+    def test_chunks_cover_every_node_and_edge_once(self):
+        for seed in range(5):
+            resources = forest(seed)
+            index, _, _, chunks = export_lod(resources, chunk_size=20)
+            chunk_of = {n["id"]: c["chunk"] for c in chunks for n in c["nodes"]}
+            component_of = {n["id"]: n["component"] for c in chunks for n in c["nodes"]}
+            self.assertEqual({frozenset(m for m in resources if component_of[m] == cid)
+                              for cid in set(component_of.values())}, components(resources))
+            self.assertEqual(sum(len(c["nodes"]) for c in chunks), len(resources))
+            self.assertEqual(set(chunk_of), set(resources))
+            ancestors, dependents = brute_ancestors(resources), brute_dependents(resources)
+
+            edges = []
+            for c, entry in zip(chunks, index["chunks"]):
+                self.assertLessEqual(len(c["nodes"]), 20)
+                self.assertEqual(entry["nodes"], len(c["nodes"]))
+                x0, y0, x1, y1 = entry["bbox"]
+                for n in c["nodes"]:
+                    self.assertTrue(x0 <= n["x"] <= x1 and y0 <= n["y"] <= y1)
+                    self.assertEqual(set(n["ancestors"]), ancestors[n["id"]])
+                    self.assertEqual(n["dependents"], len(dependents[n["id"]]))
+                for e in c["edges"]:
+                    self.assertEqual(chunk_of[e["target"]], c["chunk"])
+                    self.assertEqual(e.get("source_chunk", c["chunk"]), chunk_of[e["source"]])
+                    edges.append((e["source"], e["target"]))
+            self.assertEqual(sorted(edges), sorted((d, n) for n, r in resources.items()
+                                                   for d in r.get("depends_on") or {}))
+            self.assertEqual(index["metrics"]["components"], len(components(resources)))
+
+    def test_summaries_aggregate_members(self):
+        resources = forest(1)
+        _, depth = toposort(resources)
+        index, layers, types, chunks = export_lod(resources, chunk_size=20)
+        chunk_of = {n["id"]: c["chunk"] for c in chunks for n in c["nodes"]}
+        for summary, key in ((layers, lambda n: f"layer_{depth[n]}"),
+                             (types, lambda n: f"layer_{depth[n]}.{min(resources[n].get('@type') or ['Resource'])}")):
+            by_id = {s["id"]: s for s in summary["nodes"]}
+            self.assertEqual(sum(s["count"] for s in summary["nodes"]), len(resources))
+            for name in resources:
+                self.assertIn(chunk_of[name], by_id[key(name)]["chunks"])
+            cross = sum(1 for n, r in resources.items() for d in r.get("depends_on") or {} if key(d) != key(n))
+            self.assertEqual(sum(e["weight"] for e in summary["edges"]), cross)
+        self.assertEqual(index["metrics"]["total"], len(resources))
+        self.assertEqual(index["metrics"]["chunks"], len(chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
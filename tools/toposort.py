@@ -8,6 +8,7 @@ Input sources (in priority order):
   stdin (-):       JSON resource map piped in
   .json file:      JSON resource map from file
   .cue file:       Parse CUE _tasks struct directly (no cue eval needed)
+  .snap file:      Binary snapshot written by --snapshot (mmap, no parsing)
   directory:       cue export <dir> -e <expr> (slow — triggers full eval)
 
 Usage:
@@ -22,23 +23,95 @@ Usage:
 
     # Full CUE export (slow, triggers package eval):
     python3 tools/toposort.py ./self-charter/ _tasks --cue > precomputed.cue
+
+    # Every graph package at once (writes precomputed.cue next to each):
+    python3 tools/toposort.py --discover ./self-charter/ ./examples/
+
+    # Only what the consumer reads (auto scans the package for references):
+    python3 tools/toposort.py graph.json --fields depth,earliest --cue > precomputed.cue
+    python3 tools/toposort.py ./self-charter/charter.cue --fields auto --cue
+
+    # Pre-sorted criticality/risk rankings + betweenness and PageRank:
+    python3 tools/toposort.py graph.json --fields criticality,risk_score,pagerank --cue
+    python3 tools/toposort.py graph.json --fields betweenness --samples 500 > central.json
+
+    # Compact reachability labels instead of the O(V^2) ancestor/dependent sets:
+    python3 tools/toposort.py ./self-charter/charter.cue --fields depth,reach --cue
+
+    # Redundant depends_on edges; --write rewrites the source with the minimal set:
+    python3 tools/toposort.py ./self-charter/charter.cue --reduce
+    python3 tools/toposort.py ./self-charter/charter.cue --reduce --write
+
+    # Weakly connected components + orphans (union-find):
+    python3 tools/toposort.py graph.json --fields component,size,orphans --cue
+
+    # Inventory stream in, one node per line out (bounded memory):
+    inventory-export | python3 tools/toposort.py - --ndjson > topo.ndjson
+    python3 tools/toposort.py nodes.ndjson --ndjson --fields depth,earliest
+
+    # #GapAnalysis results for a charter (cue export -e _charter --out json):
+    python3 tools/toposort.py ./self-charter/charter.cue --charter charter.json --cue
+
+    # Reject unsafe identifiers and dangling depends_on before any CUE eval:
+    python3 tools/toposort.py graph.json --lint --fields depth > /dev/null
+
+    # Where the time goes: per-phase wall/CPU (or a Chrome trace), memory on request:
+    python3 tools/toposort.py graph.json --cue --profile profile.json > precomputed.cue
+    python3 tools/toposort.py graph.json --cue --profile profile.json --profile-memory > precomputed.cue
+    python3 tools/toposort.py graph.json --profile trace.json --profile-format chrome --cprofile prof/
+
+    # #VoIDDataset / #DataQualityReport statistics, exact triples from exports:
+    python3 tools/toposort.py ./self-charter/charter.cue --void --jsonld void.jsonld --cue
+
+    # Binary snapshot for repeated runs (CSR adjacency, @type masks, durations):
+    python3 tools/toposort.py graph.json --snapshot graph.snap --weights durations.json
+    python3 tools/toposort.py graph.snap --fields depth,earliest --cue
+
+    # Sparse dependency matrix (CSR, layer-ordered) + bit-packed sidecar:
+    python3 tools/toposort.py graph.json --matrix --matrix-bits reach.bin > topo.json
 """
 
 from __future__ import annotations
 
+import argparse
+import cProfile
+import hashlib
+import io
 import json
+import mmap
+import os
+import random
 import re
+import struct
 import subprocess
 import sys
+import time
+import tracemalloc
+import unicodedata
+from array import array
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import compress
 from pathlib import Path
 
+from eventlog import domain_of, record
+
+
+# A `key: true` set member; CUE allows quoted or bare identifier keys.
+CUE_TRUE_KEY = re.compile(r'(?:"([^"]+)"|([A-Za-z_$][\w$]*))\s*:\s*true')
+
+
+# A top-level `description: "..."` line inside a resource body.
+CUE_DESCRIPTION = re.compile(r'(?m)^\s*description:\s*("(?:[^"\\\n]|\\.)*")')
+
 
-def parse_cue_tasks(filepath: str) -> dict:
+def parse_cue_tasks(filepath: str, block: str = "_tasks") -> dict:
     """Parse _tasks struct from a CUE file using regex.
 
     Extracts resource names and depends_on keys from the standard _tasks
-    format. Works without the cue binary — pure string parsing.
+    format. Works without the cue binary — pure string parsing. `block`
+    selects another top-level struct with the same shape (e.g. _steps).
 
     Handles the standard pattern:
         "resource-name": {
@@ -48,15 +121,24 @@ def parse_cue_tasks(filepath: str) -> dict:
             description: "..."
         }
     """
-    text = Path(filepath).read_text()
+    resources = parse_cue_block(Path(filepath).read_text(), block)
+    if resources is None:
+        print(f"No {block} block found in {filepath}", file=sys.stderr)
+        sys.exit(1)
+    return resources
+
 
-    # Find the _tasks block
-    tasks_match = re.search(r'_tasks:\s*\{', text)
+def cue_resource_spans(text: str, block: str) -> list[tuple[str, int, int]] | None:
+    """Locate each resource body inside a `<block>: {` struct literal.
+
+    Returns [(name, start, end)] where text[start:end] is the body between
+    the resource's braces, or None when the block literal is absent.
+    """
+    tasks_match = re.search(r'(?m)^\s*' + re.escape(block) + r':\s*\{', text)
     if not tasks_match:
-        print(f"No _tasks block found in {filepath}", file=sys.stderr)
-        sys.exit(1)
+        return None
 
-    resources = {}
+    spans = []
     # Match top-level resource entries: "name": { ... }
     # We track brace depth to find complete resource blocks
     pos = tasks_match.end()
@@ -64,9 +146,9 @@ def parse_cue_tasks(filepath: str) -> dict:
 
     while pos < len(text) and brace_depth > 0:
         # Look for a resource key
-        key_match = re.match(r'\s*(?://[^\n]*\n\s*)*"([^"]+)":\s*\{', text[pos:])
+        key_match = re.match(r'\s*(?://[^\n]*\n\s*)*(?:"([^"]+)"|([A-Za-z_$][\w$]*)):\s*(?:[\w.#]+\s*&\s*)*\{', text[pos:])
         if key_match and brace_depth == 1:
-            rname = key_match.group(1)
+            rname = key_match.group(1) or key_match.group(2)
             block_start = pos + key_match.end()
 
             # Find the closing brace for this resource
@@ -78,36 +160,8 @@ def parse_cue_tasks(filepath: str) -> dict:
                 elif text[i] == '}':
                     depth -= 1
                 i += 1
-            block = text[block_start:i - 1]
-
-            # Extract depends_on keys
-            deps = {}
-            # Multi-key: depends_on: {"a": true, "b": true}
-            deps_match = re.search(r'depends_on:\s*\{([^}]*)\}', block)
-            if deps_match:
-                for dep_key in re.findall(r'"([^"]+)":\s*true', deps_match.group(1)):
-                    deps[dep_key] = True
-            else:
-                # Single-key shorthand: depends_on: "key": true
-                deps_short = re.search(r'depends_on:\s*"([^"]+)":\s*true', block)
-                if deps_short:
-                    deps[deps_short.group(1)] = True
-
-            # Extract @type keys
-            types = {}
-            type_match = re.search(r'"@type":\s*\{([^}]*)\}', block)
-            if type_match:
-                for type_key in re.findall(r'(\w+):\s*true', type_match.group(1)):
-                    types[type_key] = True
-
-            resources[rname] = {
-                "name": rname,
-                "@type": types,
-            }
-            if deps:
-                resources[rname]["depends_on"] = deps
-
-            pos = block_start + (i - 1 - block_start) + 1
+            spans.append((rname, block_start, i - 1))
+            pos = i
         else:
             # Skip character, track braces
             if pos < len(text):
@@ -117,20 +171,78 @@ def parse_cue_tasks(filepath: str) -> dict:
                     brace_depth -= 1
             pos += 1
 
+    return spans
+
+
+def parse_cue_block(text: str, block: str) -> dict | None:
+    """Parse one resource-map struct out of CUE source text.
+
+    Returns None when no `<block>: {` literal exists (e.g. the block is
+    built by a comprehension). See parse_cue_tasks for the accepted shape.
+    """
+    spans = cue_resource_spans(text, block)
+    if spans is None:
+        return None
+
+    resources = {}
+    for rname, start, end in spans:
+        body = text[start:end]
+
+        # Extract depends_on keys
+        deps = {}
+        # Multi-key: depends_on: {"a": true, "b": true}
+        deps_match = re.search(r'depends_on:\s*\{([^}]*)\}', body)
+        if deps_match:
+            for quoted, bare in CUE_TRUE_KEY.findall(deps_match.group(1)):
+                deps[quoted or bare] = True
+        else:
+            # Single-key shorthand: depends_on: "key": true
+            deps_short = re.search(r'depends_on:\s*' + CUE_TRUE_KEY.pattern, body)
+            if deps_short:
+                deps[deps_short.group(1) or deps_short.group(2)] = True
+
+        # Extract @type keys
+        types = {}
+        type_match = re.search(r'"@type":\s*\{([^}]*)\}', body)
+        if type_match:
+            for quoted, bare in CUE_TRUE_KEY.findall(type_match.group(1)):
+                types[quoted or bare] = True
+
+        resources[rname] = {
+            "name": rname,
+            "@type": types,
+        }
+        if deps:
+            resources[rname]["depends_on"] = deps
+        desc_match = CUE_DESCRIPTION.search(body)
+        if desc_match:
+            resources[rname]["description"] = json.loads(desc_match.group(1))
+
     return resources
 
 
 def load_resources(source: str, expr: str | None = None) -> dict:
-    """Load resources from JSON stdin, file, CUE file, or CUE export."""
+    """Load resources from JSON stdin, file, NDJSON file, CUE file, or CUE export."""
     if source == "-":
         return json.load(sys.stdin)
 
+    if source.endswith(SNAPSHOT_SUFFIX):
+        with Snapshot(source) as snap:
+            return snap.resources()
+
+    if source.endswith(NDJSON_SUFFIXES):
+        with open(source) as f:
+            return {
+                r["name"]: {"name": r["name"], "@type": r.get("@type") or {}, "depends_on": r.get("depends_on") or {}}
+                for r in iter_ndjson(f, source)
+            }
+
     if source.endswith(".json"):
         with open(source) as f:
             return json.load(f)
 
     if source.endswith(".cue"):
-        return parse_cue_tasks(source)
+        return parse_cue_tasks(source, expr or "_tasks")
 
     # CUE export (slow — triggers full package evaluation)
     cmd = ["cue", "export", source, "-e", expr or "_tasks", "--out", "json"]
@@ -240,6 +352,1595 @@ def compute_cpm(resources: dict, order: list[str], weights: dict | None = None)
     return {"earliest": earliest, "latest": latest, "duration": dur}
 
 
+def layer_order(order: list[str], depth: dict[str, int]) -> list[str]:
+    """Order nodes by (depth, name): each topology layer is a contiguous block."""
+    return sorted(order, key=lambda n: (depth[n], n))
+
+
+def ancestor_bitsets(resources: dict, order: list[str]) -> list[int]:
+    """Transitive ancestors as int bitsets over positions in `order`.
+
+    `order` must be topological. Bit j of result[i] is set when order[j]
+    is an ancestor of order[i]. One OR per edge — O(V+E) big-int ops.
+    """
+    index = {name: i for i, name in enumerate(order)}
+    bits = [0] * len(order)
+    for i, name in enumerate(order):
+        acc = 0
+        for dep in resources[name].get("depends_on") or {}:
+            j = index[dep]
+            acc |= bits[j] | (1 << j)
+        bits[i] = acc
+    return bits
+
+
+def iter_bits(value: int):
+    """Yield set bit positions of a non-negative int in ascending order."""
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+def compute_matrix(resources: dict, order: list[str], depth: dict[str, int]) -> tuple[dict, list[int]]:
+    """Sparse adjacency + reachability matrices in CSR form.
+
+    Rows and columns follow layer_order(), so both matrices are strictly
+    lower-triangular with one diagonal block per topology layer. Row i
+    lists the columns j that order[i] depends on (adjacency) or reaches
+    transitively (reachability). Returns (matrix dict, reachability bitsets).
+    """
+    lorder = layer_order(order, depth)
+    index = {name: i for i, name in enumerate(lorder)}
+    reach = ancestor_bitsets(resources, lorder)
+
+    adj_ptr, adj_idx = [0], []
+    reach_ptr, reach_idx = [0], []
+    for i, name in enumerate(lorder):
+        adj_idx.extend(sorted(index[d] for d in resources[name].get("depends_on") or {}))
+        adj_ptr.append(len(adj_idx))
+        reach_idx.extend(iter_bits(reach[i]))
+        reach_ptr.append(len(reach_idx))
+
+    layers = [i for i, name in enumerate(lorder) if i == 0 or depth[name] != depth[lorder[i - 1]]]
+    matrix = {
+        "format": "csr",
+        "shape": [len(lorder), len(lorder)],
+        "order": lorder,
+        "layers": layers,
+        "adjacency": {"row_ptr": adj_ptr, "col_idx": adj_idx},
+        "reachability": {"row_ptr": reach_ptr, "col_idx": reach_idx},
+    }
+    return matrix, reach
+
+
+MATRIX_MAGIC = b"APRM"
+MATRIX_VERSION = 1
+
+
+def write_matrix_bits(path: str, reach: list[int]) -> None:
+    """Bit-packed reachability sidecar for progressive rendering.
+
+    Layout (little-endian):
+      0   4s  magic "APRM"
+      4   H   version
+      6   H   reserved (0)
+      8   I   n (rows == columns, layer order as in the JSON "order")
+      12  I   row_bytes = ceil(n / 8)
+      16  ... n rows of row_bytes; bit j of a row is byte j // 8, bit j % 8
+
+    Rows are fixed-size, so a client can fetch any row range with an
+    HTTP Range request and render layer blocks as they arrive.
+    """
+    n = len(reach)
+    row_bytes = (n + 7) // 8
+    with open(path, "wb") as f:
+        f.write(struct.pack("<4sHHII", MATRIX_MAGIC, MATRIX_VERSION, 0, n, row_bytes))
+        for row in reach:
+            f.write(row.to_bytes(row_bytes, "little"))
+
+
+# ── Transitive reduction (--reduce) ──────────────────────────────────────
+
+def transitive_reduction(resources: dict, order: list[str]) -> list[dict]:
+    """depends_on edges implied by another path: the minimal edge set's complement.
+
+    An edge name -> dep is redundant when dep is already an ancestor of
+    another direct dependency of name. Uses the ancestor bitsets, so the
+    test is one OR per edge plus a bit check. Returns [{source: dep,
+    target: name, via: sibling}] where via is a sibling dependency that
+    already reaches dep.
+    """
+    index = {name: i for i, name in enumerate(order)}
+    bits = ancestor_bitsets(resources, order)
+    redundant = []
+    for name in order:
+        deps = sorted(resources[name].get("depends_on") or {})
+        if len(deps) < 2:
+            continue
+        covered = 0
+        for d in deps:
+            covered |= bits[index[d]]
+        for d in deps:
+            j = index[d]
+            if covered >> j & 1:
+                via = next(e for e in deps if bits[index[e]] >> j & 1)
+                redundant.append({"source": d, "target": name, "via": via})
+    return redundant
+
+
+def reduce_resources(resources: dict, redundant: list[dict]) -> dict:
+    """Copy of resources with the redundant depends_on entries removed."""
+    drop = defaultdict(set)
+    for e in redundant:
+        drop[e["target"]].add(e["source"])
+    reduced = {}
+    for name, r in resources.items():
+        if name in drop:
+            r = dict(r)
+            r["depends_on"] = {d: v for d, v in r["depends_on"].items() if d not in drop[name]}
+        reduced[name] = r
+    return reduced
+
+
+def verify_reduction(resources: dict, reduced: dict, order: list[str]) -> list[str]:
+    """Names whose depth or ancestor set differs after reduction (empty = proven equal).
+
+    order is a topological order of the original graph, which stays valid
+    for its edge subset, so both closures are bitsets over the same positions.
+    """
+    _, depth = toposort(resources)
+    _, reduced_depth = toposort(reduced)
+    before = ancestor_bitsets(resources, order)
+    after = ancestor_bitsets(reduced, order)
+    return [
+        name for i, name in enumerate(order)
+        if before[i] != after[i] or depth[name] != reduced_depth[name]
+    ]
+
+
+def rewrite_cue_deps(text: str, block: str, redundant: list[dict]) -> str:
+    """Drop redundant entries from `depends_on: {...}` literals in a CUE block.
+
+    Keeps each literal's own layout: the remaining entries are rejoined
+    with the separator the literal already used.
+    """
+    drop = defaultdict(set)
+    for e in redundant:
+        drop[e["target"]].add(e["source"])
+    for name, start, end in reversed(cue_resource_spans(text, block) or []):
+        if name not in drop:
+            continue
+        m = re.search(r'depends_on:\s*\{([^}]*)\}', text[start:end])
+        if not m:
+            continue
+        inner = m.group(1)
+        entries = list(CUE_TRUE_KEY.finditer(inner))
+        sep = inner[entries[0].end():entries[1].start()] if len(entries) > 1 else ", "
+        keep = [e.group(0) for e in entries if (e.group(1) or e.group(2)) not in drop[name]]
+        new_inner = inner[:entries[0].start()] + sep.join(keep) + inner[entries[-1].end():]
+        lo, hi = start + m.start(1), start + m.end(1)
+        text = text[:lo] + new_inner + text[hi:]
+    return text
+
+
+def run_reduce(source: str, resources: dict, block: str, write: bool) -> int:
+    """Report redundant edges, verify the reduction, optionally rewrite source."""
+    order, _ = toposort(resources)
+    redundant = transitive_reduction(resources, order)
+    reduced = reduce_resources(resources, redundant)
+    mismatched = verify_reduction(resources, reduced, order)
+    edges = sum(len(r.get("depends_on") or {}) for r in resources.values())
+
+    json.dump({
+        "redundant": redundant,
+        "summary": {
+            "edges": edges,
+            "redundant": len(redundant),
+            "minimal_edges": edges - len(redundant),
+            "verified": not mismatched,
+        },
+    }, sys.stdout, indent=2)
+    print()
+
+    if mismatched:
+        sys.stderr.write(f"Reduce: verification FAILED for {', '.join(mismatched[:10])}; nothing written\n")
+        return 1
+    wrote = ""
+    if write and redundant:
+        path = Path(source)
+        if source.endswith(".cue"):
+            path.write_text(rewrite_cue_deps(path.read_text(), block, redundant))
+        else:
+            path.write_text(json.dumps(reduced, indent=2) + "\n")
+        wrote = f", rewrote {source}"
+    sys.stderr.write(f"Reduce: {len(redundant)} of {edges} edges redundant, "
+                     f"depth and ancestors verified identical{wrote}\n")
+    return 0
+
+
+# ── Compact reachability labels ──────────────────────────────────────────
+
+def interval_labels(children: list[list[int]], roots: list[int]) -> tuple[list[int], list[list[list[int]]]]:
+    """Multi-interval reachability labels over a DFS spanning forest.
+
+    Numbers nodes in DFS post-order from roots; in a DAG everything a node
+    reaches finishes before it, so its spanning-tree subtree is one
+    contiguous range ending at its own number. Non-tree edges add more
+    ranges; adjacent ranges are merged. Node v reaches w iff post[w] lies
+    in one of v's intervals. Returns (post-order list of node ids,
+    intervals per node id as [[lo, hi], ...]).
+    """
+    n = len(children)
+    post = [-1] * n
+    order = []
+    seen = [False] * n
+    for root in roots:
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [(root, iter(children[root]))]
+        while stack:
+            node, it = stack[-1]
+            for child in it:
+                if not seen[child]:
+                    seen[child] = True
+                    stack.append((child, iter(children[child])))
+                    break
+            else:
+                stack.pop()
+                post[node] = len(order)
+                order.append(node)
+
+    intervals = [None] * n
+    for v in order:
+        spans = [[post[v], post[v]]]
+        for c in children[v]:
+            spans.extend(intervals[c])
+        spans.sort()
+        merged = [spans[0]]
+        for lo, hi in spans[1:]:
+            if lo <= merged[-1][1] + 1:
+                if hi > merged[-1][1]:
+                    merged[-1] = [merged[-1][0], hi]
+            else:
+                merged.append([lo, hi])
+        intervals[v] = merged
+    return order, intervals
+
+
+def compute_reach(resources: dict, order: list[str]) -> dict:
+    """Compact stand-in for the full ancestors/dependents maps.
+
+    down labels cover each node plus its dependents, up labels each node
+    plus its ancestors, each over its own post-order numbering:
+    {down|up: {order: [name, ...], intervals: {name: [[lo, hi], ...]}}}.
+    "a is an ancestor of b" is post_down[b] in down.intervals[a], and a
+    set expands in O(|set|) from a node's intervals and order.
+    """
+    index = {name: i for i, name in enumerate(order)}
+    up = [[index[d] for d in sorted(resources[name].get("depends_on") or {})] for name in order]
+    down = [[] for _ in order]
+    for i, deps in enumerate(up):
+        for j in deps:
+            down[j].append(i)
+
+    labels = {}
+    for direction, children in (("down", down), ("up", up)):
+        starts = [i for i in range(len(order)) if not (up if direction == "down" else down)[i]]
+        post_order, intervals = interval_labels(children, starts)
+        labels[direction] = {
+            "order": [order[i] for i in post_order],
+            "intervals": {order[i]: intervals[i] for i in range(len(order))},
+        }
+    return labels
+
+
+def expand_reach(labels: dict, name: str) -> dict[str, bool]:
+    """Set a node reaches in one label direction, excluding itself."""
+    names = labels["order"]
+    return {
+        names[k]: True
+        for lo, hi in labels["intervals"][name]
+        for k in range(lo, hi + 1)
+        if names[k] != name
+    }
+
+
+# ── Risk and centrality ──────────────────────────────────────────────────
+
+def descendant_bitsets(resources: dict, order: list[str]) -> list[int]:
+    """Transitive dependents per node as int bitsets over positions in order.
+
+    Mirror of ancestor_bitsets(): bit j of result[i] is set when order[j]
+    depends on order[i], directly or not. Reverse pass, one OR per edge.
+    """
+    index = {name: i for i, name in enumerate(order)}
+    children = [[] for _ in order]
+    for i, name in enumerate(order):
+        for dep in resources[name].get("depends_on") or {}:
+            children[index[dep]].append(i)
+    bits = [0] * len(order)
+    for i in reversed(range(len(order))):
+        acc = 0
+        for c in children[i]:
+            acc |= bits[c] | (1 << c)
+        bits[i] = acc
+    return bits
+
+
+def compute_risk(resources: dict, order: list[str]) -> dict:
+    """#CriticalityRank and #RiskScore results, pre-sorted, in O(V+E) big-int ops.
+
+    Both CUE patterns count transitive dependents by scanning every
+    resource's _ancestors for every resource. Here the count is the
+    popcount of each descendant bitset. `direct` mirrors #RiskScore, which
+    reads Graph.dependents — the transitive set — so the scores match.
+    Ties are broken by name so the order is stable.
+    """
+    counts = {
+        name: bin(bits).count("1")
+        for name, bits in zip(order, descendant_bitsets(resources, order))
+    }
+    criticality = sorted(
+        ({"name": n, "dependents": c} for n, c in counts.items()),
+        key=lambda r: (-r["dependents"], r["name"]),
+    )
+    risk_score = sorted(
+        ({"name": n, "direct": c, "transitive": c, "score": c * (c + 1)} for n, c in counts.items()),
+        key=lambda r: (-r["score"], r["name"]),
+    )
+    return {"criticality": criticality, "risk_score": risk_score}
+
+
+def compute_betweenness(resources: dict, order: list[str], samples: int | None = None) -> dict[str, float]:
+    """Brandes betweenness centrality over depends_on edges.
+
+    Normalized by 1/((n-1)(n-2)) like a directed networkx run. Exact is
+    O(V·E); samples=k uses k pivot sources (seeded, so reruns agree) and
+    scales by n/k, which is what makes 10k+ node graphs tractable.
+    """
+    n = len(order)
+    index = {name: i for i, name in enumerate(order)}
+    adj = [[index[d] for d in resources[name].get("depends_on") or {}] for name in order]
+    sources = range(n)
+    if samples and samples < n:
+        sources = sorted(random.Random(0).sample(range(n), samples))
+
+    bc = [0.0] * n
+    for s in sources:
+        # Per-source state is keyed by visited node only: in a DAG most
+        # sources reach a small slice of the graph.
+        stack = []
+        preds = defaultdict(list)
+        sigma = {s: 1}
+        dist = {s: 0}
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            stack.append(v)
+            for w in adj[v]:
+                if w not in dist:
+                    dist[w] = dist[v] + 1
+                    sigma[w] = 0
+                    queue.append(w)
+                if dist[w] == dist[v] + 1:
+                    sigma[w] += sigma[v]
+                    preds[w].append(v)
+        delta = defaultdict(float)
+        while stack:
+            w = stack.pop()
+            for v in preds[w]:
+                delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+            if w != s:
+                bc[w] += delta[w]
+
+    scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    if len(sources) < n:
+        scale *= n / len(sources)
+    return {name: bc[i] * scale for i, name in enumerate(order)}
+
+
+def compute_pagerank(
+    resources: dict,
+    order: list[str],
+    damping: float = 0.85,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> dict[str, float]:
+    """Dependency PageRank: each resource passes rank to what it depends on.
+
+    Rank pools in the foundations many things lean on, weighted by how
+    important the dependents are themselves. Sparse power iteration over
+    adjacency lists, O(V+E) per round; mass held by resources with no
+    dependencies is spread uniformly. Stops when the L1 change < n·tol.
+    """
+    n = len(order)
+    if n == 0:
+        return {}
+    index = {name: i for i, name in enumerate(order)}
+    out = [[index[d] for d in resources[name].get("depends_on") or {}] for name in order]
+    dangling = [i for i, targets in enumerate(out) if not targets]
+
+    rank = [1.0 / n] * n
+    for _ in range(max_iter):
+        base = (1 - damping) / n + damping * sum(rank[i] for i in dangling) / n
+        nxt = [base] * n
+        for i, targets in enumerate(out):
+            if targets:
+                share = damping * rank[i] / len(targets)
+                for j in targets:
+                    nxt[j] += share
+        err = sum(abs(a - b) for a, b in zip(nxt, rank))
+        rank = nxt
+        if err < n * tol:
+            break
+    return {name: rank[i] for i, name in enumerate(order)}
+
+
+# ── Connected components ─────────────────────────────────────────────────
+
+def compute_components(resources: dict) -> dict:
+    """Weakly connected components by union-find (path halving, union by size).
+
+    Near-linear in V+E. Labels follow #ConnectedComponents: each component
+    is named after its lexicographically first member. Returns
+    {component: {name: label}, size: {label: n}, orphans: {name: True}},
+    where orphans are the single-member components.
+    """
+    parent = {name: name for name in resources}
+    size = dict.fromkeys(resources, 1)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for name, r in resources.items():
+        for dep in r.get("depends_on") or {}:
+            a, b = find(name), find(dep)
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+
+    label = {}
+    for name in resources:
+        root = find(name)
+        if root not in label or name < label[root]:
+            label[root] = name
+    component = {name: label[find(name)] for name in resources}
+    sizes = {label[root]: size[root] for root in label}
+    return {
+        "component": component,
+        "size": dict(sorted(sizes.items())),
+        "orphans": {lbl: True for lbl, n in sorted(sizes.items()) if n == 1},
+    }
+
+
+# ── NDJSON streaming (--ndjson) ──────────────────────────────────────────
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+NDJSON_FIELDS = ("depth", "ancestors", "dependents", "earliest", "latest", "duration")
+
+
+def iter_ndjson(stream, label: str = "stdin"):
+    """Yield one resource dict per non-blank line; each must carry a string name."""
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        r = json.loads(line)
+        if not isinstance(r.get("name"), str):
+            raise ValueError(f"{label}:{lineno}: resource has no string `name`")
+        yield r
+
+
+class CompactGraph:
+    """Interned names and CSR adjacency, built without keeping resource dicts.
+
+    Node ids are interning order. up_ptr/up_idx list each node's
+    depends_on, down_ptr/down_idx its direct dependents. Names referenced
+    by depends_on but never defined are kept in `undefined`.
+    """
+
+    def __init__(self):
+        self.index: dict[str, int] = {}
+        self.names: list[str] = []
+        self.defined = bytearray()
+        self._src = array("i")
+        self._dst = array("i")
+
+    def _intern(self, name: str) -> int:
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names)
+            self.names.append(sys.intern(name))
+            self.defined.append(0)
+        return i
+
+    def add(self, name: str, deps) -> None:
+        i = self._intern(name)
+        self.defined[i] = 1
+        for dep in deps:
+            self._src.append(i)
+            self._dst.append(self._intern(dep))
+
+    @classmethod
+    def from_ndjson(cls, stream, label: str = "stdin") -> CompactGraph:
+        g = cls()
+        for r in iter_ndjson(stream, label):
+            g.add(r["name"], r.get("depends_on") or {})
+        return g.freeze()
+
+    @classmethod
+    def from_resources(cls, resources: dict) -> CompactGraph:
+        g = cls()
+        for name, r in resources.items():
+            g.add(name, r.get("depends_on") or {})
+        return g.freeze()
+
+    def freeze(self) -> CompactGraph:
+        """Counting-sort the edge list into both CSR directions."""
+        n = len(self.names)
+        self.undefined = [self.names[i] for i in range(n) if not self.defined[i]]
+        self.up_ptr, self.up_idx = self._csr(n, self._src, self._dst)
+        self.down_ptr, self.down_idx = self._csr(n, self._dst, self._src)
+        del self._src, self._dst, self.defined
+        return self
+
+    @staticmethod
+    def _csr(n: int, rows: array, cols: array) -> tuple[array, array]:
+        ptr = array("i", bytes(4 * (n + 1)))
+        for r in rows:
+            ptr[r + 1] += 1
+        for i in range(n):
+            ptr[i + 1] += ptr[i]
+        fill = array("i", ptr[:n])
+        idx = array("i", bytes(4 * len(cols)))
+        for r, c in zip(rows, cols):
+            idx[fill[r]] = c
+            fill[r] += 1
+        return ptr, idx
+
+
+def stream_ndjson(graph: CompactGraph, out, fields=NDJSON_FIELDS, weights: dict | None = None) -> dict:
+    """Write one JSON line per node as soon as its selected values are final.
+
+    Kahn's forward pass fixes depth, earliest and the ancestor count of a
+    node when it is dequeued. Each ancestor bitset is dropped once all of
+    the node's dependents have consumed it, so live memory follows the
+    frontier rather than V². Without latest/dependents, lines are written
+    during that pass in topological order. Otherwise the reverse pass
+    writes them (reverse topological order), once latest and the
+    dependent count are known. Durations come from weights ({name:
+    duration}, default 1), as in compute_cpm.
+    Returns {nodes, depth} totals for the summary line.
+    """
+    n = len(graph.names)
+    names = graph.names
+    up_ptr, up_idx = graph.up_ptr, graph.up_idx
+    down_ptr, down_idx = graph.down_ptr, graph.down_idx
+    want_anc = "ancestors" in fields
+    forward_only = not {"latest", "dependents"} & set(fields)
+    dumps = json.dumps
+
+    def line(i, **values):
+        row = {"name": names[i]}
+        row.update((k, v) for k, v in values.items() if v is not None)
+        out.write(dumps(row) + "\n")
+
+    if weights:
+        dur = [weights.get(m, 1) for m in names]
+        cpm_type = "q" if all(isinstance(d, int) for d in dur) else "d"
+    else:
+        dur, cpm_type = None, "q"
+    indeg = array("i", (up_ptr[i + 1] - up_ptr[i] for i in range(n)))
+    pending_down = array("i", (down_ptr[i + 1] - down_ptr[i] for i in range(n)))
+    depth = array("i", bytes(4 * n))
+    earliest = array(cpm_type, bytes(8 * n))
+    anc_count = array("i", bytes(4 * n)) if want_anc and not forward_only else None
+    live: dict[int, int] = {}
+    order = array("i")
+    queue = deque(i for i in range(n) if indeg[i] == 0)
+
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        count = None
+        if want_anc:
+            bits = 0
+            for k in range(up_ptr[i], up_ptr[i + 1]):
+                d = up_idx[k]
+                bits |= live[d] | (1 << d)
+                pending_down[d] -= 1
+                if pending_down[d] == 0:
+                    del live[d]
+            if pending_down[i]:
+                live[i] = bits
+            count = bin(bits).count("1")
+            if anc_count is not None:
+                anc_count[i] = count
+        finish = earliest[i] + (dur[i] if dur else 1)
+        for k in range(down_ptr[i], down_ptr[i + 1]):
+            c = down_idx[k]
+            if depth[c] < depth[i] + 1:
+                depth[c] = depth[i] + 1
+            if earliest[c] < finish:
+                earliest[c] = finish
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                queue.append(c)
+        if forward_only:
+            line(i,
+                 depth=depth[i] if "depth" in fields else None,
+                 earliest=earliest[i] if "earliest" in fields else None,
+                 duration=(dur[i] if dur else 1) if "duration" in fields else None,
+                 ancestor_count=count)
+
+    if len(order) != n:
+        raise ValueError(f"cycle: {n - len(order)} nodes never became ready")
+
+    if not forward_only:
+        total = max((earliest[i] + (dur[i] if dur else 1) for i in range(n)), default=0)
+        want_desc = "dependents" in fields
+        pending_up = array("i", (up_ptr[i + 1] - up_ptr[i] for i in range(n)))
+        latest = array(cpm_type, bytes(8 * n))
+        for i in reversed(order):
+            lo = None
+            bits = 0
+            for k in range(down_ptr[i], down_ptr[i + 1]):
+                c = down_idx[k]
+                lo = latest[c] if lo is None or latest[c] < lo else lo
+                if want_desc:
+                    bits |= live[c] | (1 << c)
+                    pending_up[c] -= 1
+                    if pending_up[c] == 0:
+                        del live[c]
+            latest[i] = (lo if lo is not None else total) - (dur[i] if dur else 1)
+            if want_desc and pending_up[i]:
+                live[i] = bits
+            line(i,
+                 depth=depth[i] if "depth" in fields else None,
+                 earliest=earliest[i] if "earliest" in fields else None,
+                 latest=latest[i] if "latest" in fields else None,
+                 duration=(dur[i] if dur else 1) if "duration" in fields else None,
+                 ancestor_count=anc_count[i] if anc_count is not None else None,
+                 dependent_count=bin(bits).count("1") if want_desc else None)
+
+    return {"nodes": n, "depth": sum(depth)}
+
+
+# ── Binary snapshot (--snapshot) ─────────────────────────────────────────
+
+SNAPSHOT_MAGIC = b"APGS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snap"
+SNAPSHOT_HEADER = struct.Struct("<4sHHIIII32s")
+SNAPSHOT_SECTIONS = (
+    "source", "names", "name_ptr", "order", "depth",
+    "up_ptr", "up_idx", "down_ptr", "down_idx",
+    "duration", "type_names", "type_ptr", "type_masks", "closure",
+)
+SNAPSHOT_FLAG_CLOSURE = 1
+
+
+# Byte value -> its 8 bits as 0/1 bytes, least significant first (closure rows).
+BYTE_BITS = [bytes((v >> k) & 1 for k in range(8)) for v in range(256)]
+
+
+class SnapshotError(ValueError):
+    """Unreadable, incompatible or stale snapshot."""
+
+
+def source_digest(source: str) -> bytes:
+    """sha256 of a source file, or of a package dir's .cue files; zeros for stdin."""
+    h = hashlib.sha256()
+    if source == "-":
+        return bytes(32)
+    path = Path(source)
+    if path.is_dir():
+        for f, text in package_texts(path).items():
+            h.update(f.name.encode() + b"\0" + text.encode())
+    else:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.digest()
+
+
+def write_snapshot(path: str, resources: dict, source: str, weights: dict | None = None,
+                   closure: bool = False) -> dict:
+    """Write a versioned, mmap-able binary snapshot of the graph.
+
+    Layout (little-endian, every section 8-byte aligned):
+      header   4s magic "APGS", H version, H flags (1 = closure present),
+               I nodes, I edges, I types, I mask_bytes, 32s source sha256
+      table    one (Q offset, Q length) per SNAPSHOT_SECTIONS entry
+      source   source path (utf-8), for staleness checks
+      names    utf-8 names in source order; name_ptr: I[n+1] byte offsets
+      order    I[n] node ids in topological order; depth: I[n] per node id
+      up_*     CSR depends_on per node id (I[n+1] ptr, I[e] idx)
+      down_*   CSR direct dependents per node id
+      duration d[n] (weights, default 1)
+      type_*   type names as names/name_ptr; type_masks: mask_bytes per node
+      closure  optional: n rows of ceil(n/8) bytes, row i = ancestors of the
+               node at topological position i, bit j = position j
+    Returns {nodes, edges, types, bytes}.
+    """
+    order, depth = toposort(resources)
+    names = list(resources)
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    types = sorted({t for r in resources.values() for t in r.get("@type") or {}})
+    tix = {t: i for i, t in enumerate(types)}
+    mask_bytes = (len(types) + 7) // 8
+
+    up = [[index[d] for d in resources[name].get("depends_on") or {}] for name in names]
+    down = [[] for _ in names]
+    for i, deps in enumerate(up):
+        for j in deps:
+            down[j].append(i)
+
+    def csr(rows):
+        ptr = array("I", [0])
+        idx = array("I")
+        for row in rows:
+            idx.extend(row)
+            ptr.append(len(idx))
+        return ptr, idx
+
+    def blob(strings):
+        data = [s.encode() for s in strings]
+        ptr = array("I", [0])
+        for d in data:
+            ptr.append(ptr[-1] + len(d))
+        return b"".join(data), ptr
+
+    def le(a: array) -> bytes:
+        if sys.byteorder != "little":
+            a = array(a.typecode, a)
+            a.byteswap()
+        return a.tobytes()
+
+    name_blob, name_ptr = blob(names)
+    type_blob, type_ptr = blob(types)
+    up_ptr, up_idx = csr(up)
+    down_ptr, down_idx = csr(down)
+    masks = bytearray()
+    for name in names:
+        m = 0
+        for t in resources[name].get("@type") or {}:
+            m |= 1 << tix[t]
+        masks += m.to_bytes(mask_bytes, "little")
+    sections = {
+        "source": os.path.abspath(source).encode() if source != "-" else b"",
+        "names": name_blob,
+        "name_ptr": le(name_ptr),
+        "order": le(array("I", (index[m] for m in order))),
+        "depth": le(array("I", (depth[m] for m in names))),
+        "up_ptr": le(up_ptr), "up_idx": le(up_idx),
+        "down_ptr": le(down_ptr), "down_idx": le(down_idx),
+        "duration": le(array("d", (float((weights or {}).get(m, 1)) for m in names))),
+        "type_names": type_blob,
+        "type_ptr": le(type_ptr),
+        "type_masks": bytes(masks),
+        "closure": b"",
+    }
+    if closure:
+        row_bytes = (n + 7) // 8
+        sections["closure"] = b"".join(b.to_bytes(row_bytes, "little") for b in ancestor_bitsets(resources, order))
+
+    offset = SNAPSHOT_HEADER.size + 16 * len(SNAPSHOT_SECTIONS)
+    table = []
+    for key in SNAPSHOT_SECTIONS:
+        offset += -offset % 8
+        table.append((offset, len(sections[key])))
+        offset += len(sections[key])
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                     SNAPSHOT_FLAG_CLOSURE if closure else 0,
+                                     n, len(up_idx), len(types), mask_bytes, source_digest(source)))
+        f.write(b"".join(struct.pack("<QQ", off, length) for off, length in table))
+        for key, (off, _) in zip(SNAPSHOT_SECTIONS, table):
+            f.write(bytes(off - f.tell()))
+            f.write(sections[key])
+    os.replace(tmp, path)
+    return {"nodes": n, "edges": len(up_idx), "types": len(types), "bytes": offset}
+
+
+class Snapshot:
+    """Read-only, mmap-backed view of a write_snapshot() file.
+
+    Arrays are memoryviews straight onto the mapping, so opening costs
+    the header parse (plus the source re-hash when verify is on) whatever
+    the graph size. Node ids are source order; `order` is topological.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"{path}: empty file")
+        if len(self._mm) < SNAPSHOT_HEADER.size:
+            self.close()
+            raise SnapshotError(f"{path}: truncated header")
+        magic, version, self.flags, self.n, self.edges, self.type_count, self.mask_bytes, digest = (
+            SNAPSHOT_HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise SnapshotError(f"{path}: not a v{SNAPSHOT_VERSION} graph snapshot")
+        self._table = {
+            key: struct.unpack_from("<QQ", self._mm, SNAPSHOT_HEADER.size + 16 * k)
+            for k, key in enumerate(SNAPSHOT_SECTIONS)
+        }
+        self.source = bytes(self._bytes("source")).decode()
+        if verify and self.source and os.path.exists(self.source) and digest != source_digest(self.source):
+            self.close()
+            raise SnapshotError(f"{path}: stale, {self.source} changed since the snapshot was written")
+
+        self.name_ptr = self._array("name_ptr", "I")
+        self.order = self._array("order", "I")
+        self.depth = self._array("depth", "I")
+        self.up_ptr, self.up_idx = self._array("up_ptr", "I"), self._array("up_idx", "I")
+        self.down_ptr, self.down_idx = self._array("down_ptr", "I"), self._array("down_idx", "I")
+        self.duration = self._array("duration", "d")
+        self._names = self._bytes("names")
+        type_ptr = self._array("type_ptr", "I")
+        type_blob = self._bytes("type_names")
+        self.types = [bytes(type_blob[type_ptr[k]:type_ptr[k + 1]]).decode() for k in range(self.type_count)]
+        self._masks = self._bytes("type_masks")
+        self._closure = self._bytes("closure") if self.flags & SNAPSHOT_FLAG_CLOSURE else None
+        self._index = None
+        self._name_list = None
+
+    def _bytes(self, key: str) -> memoryview:
+        off, length = self._table[key]
+        return memoryview(self._mm)[off:off + length]
+
+    def _array(self, key: str, fmt: str):
+        view = self._bytes(key)
+        if sys.byteorder == "little":
+            return view.cast(fmt)
+        a = array(fmt, view)
+        a.byteswap()
+        return a
+
+    def name(self, i: int) -> str:
+        return bytes(self._names[self.name_ptr[i]:self.name_ptr[i + 1]]).decode()
+
+    def names(self) -> list[str]:
+        if self._name_list is None:
+            self._name_list = [self.name(i) for i in range(self.n)]
+        return self._name_list
+
+    def index(self, name: str) -> int:
+        if self._index is None:
+            self._index = {m: i for i, m in enumerate(self.names())}
+        return self._index[name]
+
+    def deps(self, i: int):
+        return self.up_idx[self.up_ptr[i]:self.up_ptr[i + 1]]
+
+    def dependents(self, i: int):
+        return self.down_idx[self.down_ptr[i]:self.down_ptr[i + 1]]
+
+    def type_names(self, i: int) -> list[str]:
+        m = int.from_bytes(self._masks[i * self.mask_bytes:(i + 1) * self.mask_bytes], "little")
+        return [self.types[k] for k in iter_bits(m)]
+
+    def ancestors(self, i: int) -> list[int] | None:
+        """Ancestor node ids from the closure section (None if it was not written)."""
+        if self._closure is None:
+            return None
+        pos = getattr(self, "_pos", None)
+        if pos is None:
+            pos = self._pos = {v: k for k, v in enumerate(self.order)}
+        row_bytes = (self.n + 7) // 8
+        k = pos[i]
+        row = int.from_bytes(self._closure[k * row_bytes:(k + 1) * row_bytes], "little")
+        return [self.order[j] for j in iter_bits(row)]
+
+    def topo(self) -> tuple[list[str], dict[str, int]]:
+        """The stored (order, depth), as toposort() returns them; no sort is run."""
+        names = self.names()
+        order = [names[i] for i in self.order]
+        return order, {names[i]: self.depth[i] for i in range(self.n)}
+
+    def ancestor_map(self) -> dict[str, dict[str, bool]]:
+        """compute_ancestors() from the closure section, or one CSR pass without it."""
+        names = self.names()
+        rows = [None] * self.n
+        if self._closure is not None:
+            # Expand each row to one byte per bit, then compress() picks the names
+            topo_names = [names[i] for i in self.order]
+            row_bytes = (self.n + 7) // 8
+            for k, i in enumerate(self.order):
+                bits = b"".join(map(BYTE_BITS.__getitem__, self._closure[k * row_bytes:(k + 1) * row_bytes]))
+                rows[i] = dict.fromkeys(compress(topo_names, bits), True)
+        else:
+            for i in self.order:
+                acc = {}
+                for d in self.deps(i):
+                    acc[names[d]] = True
+                    acc.update(rows[d])
+                rows[i] = acc
+        return dict(zip(names, rows))
+
+    def cpm(self, weights: dict | None = None) -> dict:
+        """compute_cpm() over the CSR arrays and stored order."""
+        names = self.names()
+        dur = [(weights or {}).get(m, 1) for m in names]
+        earliest = [0] * self.n
+        for i in self.order:
+            for d in self.deps(i):
+                if earliest[i] < earliest[d] + dur[d]:
+                    earliest[i] = earliest[d] + dur[d]
+        total = max((earliest[i] + dur[i] for i in range(self.n)), default=0)
+        latest = [0] * self.n
+        for i in reversed(self.order):
+            down = self.dependents(i)
+            latest[i] = (min(latest[c] for c in down) if len(down) else total) - dur[i]
+        return {
+            "earliest": {names[i]: earliest[i] for i in self.order},
+            "latest": {names[i]: latest[i] for i in reversed(self.order)},
+            "duration": dict(zip(names, dur)),
+        }
+
+    def weights(self) -> dict | None:
+        """{name: duration} when any duration differs from 1, else None."""
+        if all(d == 1 for d in self.duration):
+            return None
+        return {self.name(i): int(d) if d.is_integer() else d for i, d in enumerate(self.duration)}
+
+    def resources(self) -> dict:
+        """Materialize the resource map (name, @type, depends_on) in source order."""
+        names = self.names()
+        return {
+            names[i]: {
+                "name": names[i],
+                "@type": {t: True for t in self.type_names(i)},
+                "depends_on": {names[j]: True for j in self.deps(i)},
+            }
+            for i in range(self.n)
+        }
+
+    def close(self) -> None:
+        for attr in ("name_ptr", "order", "depth", "up_ptr", "up_idx", "down_ptr", "down_idx",
+                     "duration", "_names", "_masks", "_closure"):
+            view = getattr(self, attr, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if getattr(self, "_mm", None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Identifier lint (--lint) ─────────────────────────────────────────────
+
+# vocab/resource.cue #SafeID and #SafeLabel, anchored the same way.
+SAFE_ID = re.compile(r"[a-zA-Z][a-zA-Z0-9_.-]*\Z")
+SAFE_LABEL = re.compile(r"[a-zA-Z][a-zA-Z0-9_-]*\Z")
+ZERO_WIDTH = {"\u200b", "\u200c", "\u200d", "\u2060", "\ufeff", "\u00ad"}
+BIDI_CONTROLS = {"\u061c", "\u200e", "\u200f"} | {chr(c) for c in range(0x202A, 0x202F)} \
+    | {chr(c) for c in range(0x2066, 0x206A)}
+
+
+def classify_char(ch: str) -> str:
+    """Why a character breaks #SafeID/#SafeLabel, most dangerous first."""
+    if ch in BIDI_CONTROLS:
+        return "bidi-override"
+    if ch in ZERO_WIDTH:
+        return "zero-width"
+    if ord(ch) > 0x7F:
+        folded = unicodedata.normalize("NFKD", ch).encode("ascii", "ignore")
+        script = unicodedata.name(ch, "").split(" ")[0]
+        if folded or script in ("CYRILLIC", "GREEK", "ARMENIAN", "CHEROKEE", "FULLWIDTH"):
+            return "homoglyph"
+        return "non-ascii"
+    return "pattern"
+
+
+def locate(text: str | None, value: str, ch_index: int) -> tuple[int, int] | None:
+    """(line, column) of value's offending character at its first quoted (else bare) occurrence."""
+    if not text:
+        return None
+    at = text.find(json.dumps(value, ensure_ascii=False))
+    if at >= 0:
+        at += 1
+    else:
+        at = text.find(value)
+        if at < 0:
+            return None
+    at += ch_index
+    line = text.count("\n", 0, at) + 1
+    return line, at - (text.rfind("\n", 0, at) + 1) + 1
+
+
+def check_identifier(value, pattern, what: str, resource: str, field: str, text: str | None) -> dict | None:
+    if isinstance(value, str) and pattern.match(value):
+        return None
+    issue = {"resource": resource, "field": field, "value": value}
+    if not isinstance(value, str) or not value:
+        issue["problem"] = "pattern"
+        issue["message"] = f"{what} {value!r} must be a non-empty string"
+        return issue
+    bad = next((i for i, ch in enumerate(value) if ord(ch) > 0x7F), None)
+    if bad is None:
+        bad = next((i for i, ch in enumerate(value) if not pattern.match("a" + ch)), 0)
+    ch = value[bad]
+    issue["problem"] = classify_char(ch) if ord(ch) > 0x7F else "pattern"
+    issue["message"] = (
+        f"{what} {value!r} does not match {'#SafeID' if pattern is SAFE_ID else '#SafeLabel'}: "
+        + (f"U+{ord(ch):04X} {unicodedata.name(ch, 'unnamed')} ({issue['problem']})"
+           if ord(ch) > 0x7F else f"{ch!r} at offset {bad}")
+    )
+    pos = locate(text, value, bad)
+    if pos:
+        issue["line"], issue["column"] = pos
+    return issue
+
+
+def lint_resources(resources: dict, text: str | None = None) -> list[dict]:
+    """#SafeID/#SafeLabel and #Graph.valid checks, before any CUE evaluation.
+
+    Checks every resource key and `name`, depends_on key, @type and tags
+    label, and that every depends_on target exists. text is the raw
+    source, used only to attach line/column positions.
+    """
+    issues = []
+
+    def add(issue):
+        if issue:
+            issues.append(issue)
+
+    for key, r in resources.items():
+        add(check_identifier(key, SAFE_ID, "resource key", key, "key", text))
+        if not isinstance(r, dict):
+            issues.append({"resource": key, "field": "key", "value": key, "problem": "pattern",
+                           "message": f"resource {key!r} is not a struct"})
+            continue
+        if "name" in r and r["name"] != key:
+            add(check_identifier(r["name"], SAFE_ID, "name", key, "name", text))
+        for label in r.get("@type") or {}:
+            add(check_identifier(label, SAFE_LABEL, "@type label", key, "@type", text))
+        for label in r.get("tags") or {}:
+            add(check_identifier(label, SAFE_LABEL, "tag", key, "tags", text))
+        for dep in r.get("depends_on") or {}:
+            issue = check_identifier(dep, SAFE_ID, "depends_on key", key, "depends_on", text)
+            if issue is None and dep not in resources:
+                issue = {"resource": key, "field": "depends_on", "value": dep, "problem": "undefined",
+                         "message": f"depends_on {dep!r} is not a resource (#Graph.valid would be false)"}
+                pos = locate(text, dep, 0)
+                if pos:
+                    issue["line"], issue["column"] = pos
+            add(issue)
+    return issues
+
+
+def format_issue(source: str, issue: dict) -> str:
+    where = source
+    if "line" in issue:
+        where += f":{issue['line']}:{issue['column']}"
+    return f"{where}: {issue['resource'].encode('ascii', 'backslashreplace').decode()}: {issue['message']}"
+
+
+# ── Dataset statistics (--void) ──────────────────────────────────────────
+
+def compute_dataset_stats(resources: dict, depth: dict[str, int]) -> dict:
+    """Every #VoIDDataset and #DataQualityReport statistic in one pass.
+
+    Returns {"void": ..., "quality": ...} shaped like the patterns'
+    Precomputed inputs. type_counts keeps first-seen type order, and
+    triples is #VoIDDataset's estimate (3 per resource, plus 1 per edge
+    and per description).
+    """
+    type_counts: dict[str, int] = {}
+    links = has_deps = has_desc = 0
+    has_dependent = set()
+    for r in resources.values():
+        for t in r.get("@type") or {}:
+            type_counts[t] = type_counts.get(t, 0) + 1
+        deps = r.get("depends_on")
+        if deps is not None:
+            has_deps += 1
+            links += len(deps)
+            has_dependent.update(deps)
+        if r.get("description") is not None:
+            has_desc += 1
+    n = len(resources)
+    roots = sum(1 for d in depth.values() if d == 0)
+    return {
+        "void": {
+            "entities": n,
+            "triples": 3 * n + links + has_desc,
+            "classes": len(type_counts),
+            "type_counts": type_counts,
+            "links": links,
+            "has_depends_on": has_deps,
+            "has_description": has_desc,
+        },
+        "quality": {
+            "entities": n,
+            "roots": roots,
+            "leaves": sum(1 for name in resources if name not in has_dependent),
+            "layers": len(set(depth.values())),
+            "non_roots": n - roots,
+        },
+    }
+
+
+def jsonld_triples(doc) -> set[tuple]:
+    """Distinct RDF triples of a JSON-LD document with an inline @context.
+
+    Covers what the W3C projections emit: prefixes and term definitions
+    (including "@type": "@id" coercion), @base, @type, @id, @value,
+    @list, @set, nested and top-level @graph nodes. Blank nodes get
+    fresh labels. Remote contexts are not fetched.
+    """
+    ctx = {}
+    for c in doc.get("@context", []) if isinstance(doc.get("@context"), list) else [doc.get("@context") or {}]:
+        if isinstance(c, dict):
+            ctx.update(c)
+    base = ctx.get("@base", "")
+    triples = set()
+    bnodes = iter(range(1 << 62))
+
+    def expand(term: str, vocab: bool = True) -> str:
+        if vocab and term in ctx:
+            d = ctx[term]
+            term = d.get("@id", term) if isinstance(d, dict) else d
+        prefix, sep, local = term.partition(":")
+        if sep and prefix in ctx and isinstance(ctx[prefix], str) and not local.startswith("//"):
+            return ctx[prefix] + local
+        if not sep and not vocab:
+            return base + term
+        return term
+
+    def as_list(v):
+        return v if isinstance(v, list) else [v]
+
+    def obj(value, coerce_id: bool):
+        """RDF object for one JSON-LD value (None when it produces no triple)."""
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            if "@value" in value:
+                if value["@value"] is None:
+                    return None
+                return ("lit", json.dumps(value["@value"]), value.get("@type"), value.get("@language"))
+            if "@list" in value:
+                head = "rdf:nil"
+                for item in reversed(value["@list"]):
+                    o = obj(item, coerce_id)
+                    if o is None:
+                        continue
+                    cell = f"_:b{next(bnodes)}"
+                    triples.add((cell, "rdf:first", o))
+                    triples.add((cell, "rdf:rest", head))
+                    head = cell
+                return head
+            return node(value)
+        if coerce_id and isinstance(value, str):
+            return expand(value, vocab=False)
+        return ("lit", json.dumps(value), None, None)
+
+    def node(n: dict) -> str:
+        subject = expand(n["@id"], vocab=False) if "@id" in n else f"_:b{next(bnodes)}"
+        for key, value in n.items():
+            if key == "@type":
+                for t in as_list(value):
+                    triples.add((subject, "rdf:type", expand(t)))
+                continue
+            if key == "@graph":
+                for child in as_list(value):
+                    node(child)
+                continue
+            if key.startswith("@"):
+                continue
+            d = ctx.get(key)
+            if d is None and ":" not in key and "@vocab" not in ctx:
+                continue  # unmapped term: dropped by JSON-LD expansion
+            coerce_id = isinstance(d, dict) and d.get("@type") == "@id"
+            predicate = expand(key)
+            for item in as_list(value):
+                if isinstance(item, dict) and "@set" in item:
+                    items = as_list(item["@set"])
+                else:
+                    items = [item]
+                for it in items:
+                    o = obj(it, coerce_id)
+                    if o is not None:
+                        triples.add((subject, predicate, o))
+        return subject
+
+    top = {k: v for k, v in doc.items() if k != "@context"}
+    if set(top) <= {"@graph"}:
+        for child in as_list(top.get("@graph", [])):
+            node(child)
+    else:
+        node(top)
+    return triples
+
+
+def count_jsonld_triples(paths: list[str]) -> int:
+    """Exact triple count across JSON-LD exports (rdflib when installed)."""
+    try:
+        import rdflib
+    except ImportError:
+        rdflib = None
+    total = 0
+    for path in paths:
+        with open(path) as f:
+            doc = json.load(f)
+        if rdflib is not None:
+            g = rdflib.Graph()
+            g.parse(data=json.dumps(doc), format="json-ld")
+            total += len(g)
+        else:
+            total += len(jsonld_triples(doc))
+    return total
+
+
+def write_dataset_cue(out, stats: dict) -> None:
+    """Write compute_dataset_stats() output as _precomputed_void / _precomputed_quality."""
+    v = stats["void"]
+    lines = ["_precomputed_void: {"]
+    for key in ("entities", "triples", "classes"):
+        lines.append(f"\t{key}: {v[key]}")
+    lines.append("\ttype_counts: {")
+    lines += [f"\t\t{json.dumps(t)}: {c}" for t, c in v["type_counts"].items()]
+    lines.append("\t}")
+    for key in ("links", "has_depends_on", "has_description", "exact_triples"):
+        if key in v:
+            lines.append(f"\t{key}: {v[key]}")
+    lines += ["}", "", "_precomputed_quality: {"]
+    lines += [f"\t{key}: {value}" for key, value in stats["quality"].items()]
+    lines.append("}")
+    out.write("\n".join(lines) + "\n")
+
+
+# ── Charter gap analysis (--charter) ─────────────────────────────────────
+
+def compute_gaps(resources: dict, depth: dict[str, int], charter: dict) -> dict:
+    """#GapAnalysis's graph-dependent results for #GapAnalysis.Precomputed.
+
+    One pass builds the name set and a type index; every required
+    resource, type, root and gate requirement is then a hash lookup.
+    Gate readiness follows #GapAnalysis (its direct depends_on gates are
+    satisfied), and next_gate is the lowest-phase unsatisfied gate, ties
+    broken by gate name as in #GapAnalysis's sort.
+    """
+    types = {}
+    for r in resources.values():
+        for t in r.get("@type") or {}:
+            types.setdefault(t, 0)
+            types[t] += 1
+
+    scope = charter.get("scope") or {}
+    missing_resources = {n: True for n in scope.get("required_resources") or {} if n not in resources}
+    missing_types = {t: True for t in scope.get("required_types") or {} if t not in types}
+
+    root = scope.get("root")
+    roots = [root] if isinstance(root, str) else list(root or {})
+    root_satisfied = all(depth.get(n) == 0 for n in roots)
+
+    gates = charter.get("gates") or {}
+    gate_status = {}
+    for gname, gate in gates.items():
+        missing = {n: True for n in gate.get("requires") or {} if n not in resources}
+        gate_status[gname] = {"missing": missing, "satisfied": not missing}
+    for gname, gate in gates.items():
+        deps_met = all(gate_status.get(d, {}).get("satisfied") for d in gate.get("depends_on") or {})
+        gate_status[gname]["ready"] = deps_met and gate_status[gname]["satisfied"]
+
+    pending = [g for g, gs in gate_status.items() if not gs["satisfied"] and "phase" in gates[g]]
+    next_gate = min(pending, key=lambda g: (gates[g]["phase"], g)) if pending else ""
+
+    return {
+        "missing_resources": missing_resources,
+        "missing_types": missing_types,
+        "root_satisfied": root_satisfied,
+        "gate_status": gate_status,
+        "next_gate": next_gate,
+    }
+
+
+def write_gaps_cue(out, gaps: dict, name: str = "_precomputed_gaps") -> None:
+    """Write compute_gaps() output as CUE for #GapAnalysis.Precomputed."""
+    lines = [
+        f"{name}: {{",
+        f"\tmissing_resources: {to_cue_struct(gaps['missing_resources'])}",
+        f"\tmissing_types: {to_cue_struct(gaps['missing_types'])}",
+        f"\troot_satisfied: {json.dumps(gaps['root_satisfied'])}",
+        "\tgate_status: {",
+    ]
+    for gname, gs in gaps["gate_status"].items():
+        lines.append(
+            f'\t\t"{gname}": {{missing: {to_cue_struct(gs["missing"])}, '
+            f"satisfied: {json.dumps(gs['satisfied'])}, ready: {json.dumps(gs['ready'])}}}"
+        )
+    lines += ["\t}", f"\tnext_gate: {json.dumps(gaps['next_gate'])}", "}"]
+    out.write("\n".join(lines) + "\n")
+
+
+# ── Phase profiling (--profile) ──────────────────────────────────────────
+
+class Profiler:
+    """Wall time and CPU time per named phase, plus tracemalloc peak on request.
+
+    Library use:
+        prof = Profiler(memory=True)
+        with prof.phase("parse"):
+            resources = load_resources(path)
+        data = precompute(resources, profiler=prof)
+        prof.graph_stats(resources, data)
+        json.dump(prof.report(), f)          # or prof.chrome_trace()
+
+    A disabled profiler (the default everywhere) makes phase() a no-op.
+    tracemalloc slows allocation-heavy phases several-fold and skews their
+    timings, so memory is off unless asked for. With cprofile_dir, each
+    phase also dumps <dir>/<phase>.prof.
+    """
+
+    def __init__(self, enabled: bool = True, memory: bool = False, cprofile_dir: str | None = None):
+        self.enabled = enabled
+        self.memory = memory and enabled
+        self.cprofile_dir = cprofile_dir if enabled else None
+        self.phases: list[dict] = []
+        self.stats: dict = {}
+        self._t0 = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_dir:
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        if self.memory:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        prof = cProfile.Profile() if self.cprofile_dir else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        if prof:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof:
+                prof.disable()
+            entry = {
+                "phase": name,
+                "start_ms": round((wall - self._t0) * 1000, 3),
+                "wall_ms": round((time.perf_counter() - wall) * 1000, 3),
+                "cpu_ms": round((time.process_time() - cpu) * 1000, 3),
+            }
+            if self.memory:
+                entry["peak_kb"] = round((tracemalloc.get_traced_memory()[1] - mem_start) / 1024, 1)
+            if prof:
+                entry["cprofile"] = os.path.join(self.cprofile_dir, f"{name}.prof")
+                prof.dump_stats(entry["cprofile"])
+            self.phases.append(entry)
+
+    def graph_stats(self, resources, data: dict | None = None) -> dict:
+        """V, E, max depth, widest layer and closure size (when ancestors or reach were computed).
+
+        resources is the resource map or an open Snapshot. Without data
+        (paths that do not run precompute) only V and E are filled in.
+        """
+        depth = (data or {}).get("depth", {})
+        widths = defaultdict(int)
+        for d in depth.values():
+            widths[d] += 1
+        closure = None
+        if data and "ancestors" in data:
+            closure = sum(len(a) for a in data["ancestors"].values())
+        if isinstance(resources, Snapshot):
+            nodes, edges = resources.n, resources.edges
+        else:
+            nodes, edges = len(resources), sum(len(r.get("depends_on") or {}) for r in resources.values())
+        self.stats = {
+            "nodes": nodes,
+            "edges": edges,
+            "max_depth": max(depth.values(), default=0) if data else None,
+            "widest_layer": max(widths.values(), default=0) if data else None,
+            "closure_size": closure,
+        }
+        return self.stats
+
+    def report(self) -> dict:
+        return {
+            "phases": self.phases,
+            "total_wall_ms": round(sum(p["wall_ms"] for p in self.phases), 3),
+            "graph": self.stats,
+        }
+
+    def chrome_trace(self) -> dict:
+        """Chrome trace-event format (chrome://tracing, Perfetto): one complete event per phase."""
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+                   "args": {"name": "toposort.py"}}]
+        for p in self.phases:
+            events.append({
+                "name": p["phase"],
+                "cat": "toposort",
+                "ph": "X",
+                "ts": round(p["start_ms"] * 1000),
+                "dur": round(p["wall_ms"] * 1000),
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {k: v for k, v in p.items() if k not in ("phase", "start_ms", "wall_ms")},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.stats}
+
+    def write(self, path: str, fmt: str = "json") -> None:
+        doc = self.chrome_trace() if fmt == "chrome" else self.report()
+        if path == "-":
+            json.dump(doc, sys.stderr, indent=2)
+            sys.stderr.write("\n")
+            return
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+
+
+# ── Field selection (--fields) ───────────────────────────────────────────
+
+TOPO_FIELDS = ("depth", "ancestors", "dependents", "reach")
+CPM_FIELDS = ("earliest", "latest", "duration")
+RISK_FIELDS = ("criticality", "risk_score")
+CENTRALITY_FIELDS = ("betweenness", "pagerank")
+COMPONENT_FIELDS = ("component", "size", "orphans")
+ALL_FIELDS = ("depth", "ancestors", "dependents") + CPM_FIELDS
+KNOWN_FIELDS = TOPO_FIELDS + CPM_FIELDS + RISK_FIELDS + CENTRALITY_FIELDS + COMPONENT_FIELDS + ("matrix",)
+
+# One CUE struct per group: _precomputed, _precomputed_cpm, _precomputed_risk, ...
+FIELD_GROUPS = (
+    ("topo", TOPO_FIELDS),
+    ("cpm", CPM_FIELDS),
+    ("risk", RISK_FIELDS),
+    ("centrality", CENTRALITY_FIELDS),
+    ("components", COMPONENT_FIELDS),
+    ("matrix", ("matrix",)),
+)
+
+# What a bare reference (`Precomputed: _precomputed`) selects, where it is
+# not the whole group: reach labels are an opt-in alternative to the sets.
+BARE_FIELDS = {"topo": ("depth", "ancestors", "dependents")}
+
+# `//` comments, but not the `//` inside "https://..." string values
+CUE_COMMENT_RE = re.compile(r'(?m)(?:^|(?<=\s))//.*$')
+
+
+def parse_fields(spec: str) -> set[str]:
+    """Parse a comma-separated --fields list; "all" selects the six Precomputed maps."""
+    fields = set()
+    for f in filter(None, (p.strip() for p in spec.split(","))):
+        if f == "all":
+            fields.update(ALL_FIELDS)
+        elif f in KNOWN_FIELDS:
+            fields.add(f)
+        else:
+            raise ValueError(f"unknown field {f!r} (choose from {', '.join(KNOWN_FIELDS)}, all, auto)")
+    return fields
+
+
+def package_texts(pkg_dir) -> dict[Path, str]:
+    """Source of every .cue file in a package dir, minus generated precomputed*.cue."""
+    return {
+        f: f.read_text()
+        for f in sorted(Path(pkg_dir).glob("*.cue"))
+        if not f.name.startswith("precomputed")
+    }
+
+
+def referenced_fields(texts, block: str = "_tasks") -> set[str]:
+    """Precomputed fields a package actually reads for one graph block.
+
+    `_precomputed.depth` selects just depth. A bare `_precomputed` (handed
+    to #GraphLite, #CriticalPathPrecomputed, ...) selects its whole struct,
+    since the consuming pattern decides what it reads — except reach,
+    which must be named (`_precomputed.reach`) to replace the full sets. Any reference to
+    the matrix struct selects "matrix". Comments are ignored.
+    """
+    names = precomputed_names(block)
+    fields = set()
+    for text in texts:
+        text = CUE_COMMENT_RE.sub("", text)
+        for group, members in FIELD_GROUPS:
+            name = names[group]
+            ref = re.compile(r'(?<![\w$#])' + re.escape(name) + r'(?![\w$])(?:\.(\w+))?')
+            for m in ref.finditer(text):
+                if m.group(1) in members:
+                    fields.add(m.group(1))
+                else:
+                    fields.update(BARE_FIELDS.get(group, members))
+    return fields
+
+
+def precompute(resources: dict | None, fields=ALL_FIELDS, samples: int | None = None,
+               weights: dict | None = None, profiler: Profiler | None = None,
+               snapshot: Snapshot | None = None) -> dict:
+    """Compute only what the selected fields need.
+
+    order and depth always come out of the sort. ancestors is computed
+    when ancestors or dependents is selected (dependents inverts it),
+    CPM when any of earliest/latest/duration is, risk rankings and
+    components when any of theirs is, and each centrality and the matrix
+    only when named. samples is passed to compute_betweenness() and
+    weights to compute_cpm(). Each computation is a profiler phase.
+
+    With an open snapshot, order and depth are read as stored, ancestors
+    come from its closure section and CPM runs over its CSR arrays.
+    resources may then be None; the resource map is materialized only for
+    the other fields.
+    """
+    phase = (profiler or Profiler(enabled=False)).phase
+    with phase("sort"):
+        order, depth = snapshot.topo() if snapshot is not None else toposort(resources)
+    data = {"order": order, "depth": depth}
+    if any(f in fields for f in ("reach", "matrix") + RISK_FIELDS + CENTRALITY_FIELDS + COMPONENT_FIELDS) \
+            and resources is None:
+        with phase("resources"):
+            resources = snapshot.resources()
+    if "ancestors" in fields or "dependents" in fields:
+        with phase("ancestors"):
+            if snapshot is not None:
+                data["ancestors"] = snapshot.ancestor_map()
+            else:
+                data["ancestors"] = compute_ancestors(resources, order)
+        if "dependents" in fields:
+            with phase("dependents"):
+                data["dependents"] = compute_dependents(data["ancestors"])
+    if "reach" in fields:
+        with phase("reach"):
+            data["reach"] = compute_reach(resources, order)
+    if any(f in fields for f in CPM_FIELDS):
+        with phase("cpm"):
+            if snapshot is not None:
+                data["cpm"] = snapshot.cpm(weights)
+            else:
+                data["cpm"] = compute_cpm(resources, order, weights)
+    if any(f in fields for f in RISK_FIELDS):
+        with phase("risk"):
+            data["risk"] = compute_risk(resources, order)
+    if any(f in fields for f in CENTRALITY_FIELDS):
+        data["centrality"] = {}
+        if "betweenness" in fields:
+            with phase("betweenness"):
+                data["centrality"]["betweenness"] = compute_betweenness(resources, order, samples)
+        if "pagerank" in fields:
+            with phase("pagerank"):
+                data["centrality"]["pagerank"] = compute_pagerank(resources, order)
+    if any(f in fields for f in COMPONENT_FIELDS):
+        with phase("components"):
+            data["components"] = compute_components(resources)
+    if "matrix" in fields:
+        with phase("matrix"):
+            data["matrix"], data["matrix_bits"] = compute_matrix(resources, order, depth)
+    return data
+
+
+# ── CUE output ───────────────────────────────────────────────────────────
+
 def to_cue_struct(data: dict) -> str:
     """Format Python dict as CUE struct literal."""
     if not data:
@@ -248,66 +1949,515 @@ def to_cue_struct(data: dict) -> str:
     return "{" + pairs + "}"
 
 
-def main():
-    if len(sys.argv) < 2 or "--help" in sys.argv or "-h" in sys.argv:
-        print(__doc__.strip())
-        sys.exit(0 if "--help" in sys.argv or "-h" in sys.argv else 1)
+def to_cue_list(items: list) -> str:
+    """Format a flat list of ints or strings as a CUE list literal."""
+    return "[" + ", ".join(json.dumps(v) for v in items) + "]"
 
-    source = sys.argv[1]
-    expr = sys.argv[2] if len(sys.argv) > 2 and not sys.argv[2].startswith("--") else "_tasks"
-    as_cue = "--cue" in sys.argv
 
-    resources = load_resources(source, expr)
-    order, depth = toposort(resources)
-    ancestors = compute_ancestors(resources, order)
-    dependents = compute_dependents(ancestors)
-    cpm = compute_cpm(resources, order)
-
-    if as_cue:
-        print("package main\n")
-        print("_precomputed: {")
-        print("\tdepth: {")
-        for name in order:
-            print(f'\t\t"{name}": {depth[name]}')
-        print("\t}")
-        print("\tancestors: {")
-        for name in order:
-            print(f'\t\t"{name}": {to_cue_struct(ancestors[name])}')
-        print("\t}")
-        print("\tdependents: {")
-        for name in order:
-            print(f'\t\t"{name}": {to_cue_struct(dependents[name])}')
-        print("\t}")
-        print("}\n")
-        print("_precomputed_cpm: {")
-        print("\tearliest: {")
-        for name in order:
-            print(f'\t\t"{name}": {cpm["earliest"][name]}')
-        print("\t}")
-        print("\tlatest: {")
-        for name in order:
-            print(f'\t\t"{name}": {cpm["latest"][name]}')
-        print("\t}")
-        print("\tduration: {")
-        for name in order:
-            print(f'\t\t"{name}": {cpm["duration"][name]}')
-        print("\t}")
-        print("}")
+def to_cue_float(value: float) -> str:
+    """Format a float for CUE, trimmed to 10 decimal places."""
+    return repr(round(value, 10))
+
+
+def precomputed_names(block: str = "_tasks") -> dict[str, str]:
+    """CUE field names for a graph block's precomputed data, per FIELD_GROUPS.
+
+    _tasks keeps the historical _precomputed / _precomputed_cpm names;
+    any other block _x gets _precomputed_x / _precomputed_cpm_x so several
+    graphs can share one package.
+    """
+    suffix = "" if block == "_tasks" else "_" + block.lstrip("_")
+    return {
+        group: ("_precomputed" if group == "topo" else f"_precomputed_{group}") + suffix
+        for group, _ in FIELD_GROUPS
+    }
+
+
+def write_cue(out, data: dict, fields=ALL_FIELDS, block="_tasks") -> None:
+    """Write the selected precomputed fields for one graph as CUE (no package clause).
+
+    data is the dict returned by precompute(). Structs with no selected
+    field are left out entirely.
+    """
+    order = data["order"]
+
+    def map_lines(field, values, fmt, keys=order):
+        return [f"\t{field}: {{", *(f'\t\t"{n}": {fmt(values[n])}' for n in keys), "\t}"]
+
+    def list_lines(field, rows):
+        return [
+            f"\t{field}: [",
+            *("\t\t{" + ", ".join(f"{k}: {json.dumps(v)}" for k, v in row.items()) + "}," for row in rows),
+            "\t]",
+        ]
+
+    def matrix_lines(matrix):
+        lines = [f"\torder: {to_cue_list(matrix['order'])}", f"\tlayers: {to_cue_list(matrix['layers'])}"]
+        for key in ("adjacency", "reachability"):
+            lines += [
+                f"\t{key}: {{",
+                f"\t\trow_ptr: {to_cue_list(matrix[key]['row_ptr'])}",
+                f"\t\tcol_idx: {to_cue_list(matrix[key]['col_idx'])}",
+                "\t}",
+            ]
+        return lines
+
+    def reach_lines(labels):
+        lines = ["\treach: {"]
+        for direction in ("down", "up"):
+            lines += [
+                f"\t\t{direction}: {{",
+                f"\t\t\torder: {to_cue_list(labels[direction]['order'])}",
+                "\t\t\tintervals: {",
+                *(f'\t\t\t\t"{n}": {json.dumps(labels[direction]["intervals"][n])}' for n in order),
+                "\t\t\t}",
+                "\t\t}",
+            ]
+        return lines + ["\t}"]
+
+    def field_lines(group, field):
+        if field == "reach":
+            return reach_lines(data["reach"])
+        if group == "topo":
+            return map_lines(field, data[field], str if field == "depth" else to_cue_struct)
+        if group == "cpm":
+            return map_lines(field, data["cpm"][field], str)
+        if group == "risk":
+            return list_lines(field, data["risk"][field])
+        if group == "centrality":
+            return map_lines(field, data["centrality"][field], to_cue_float)
+        if group == "components":
+            values = data["components"][field]
+            if field == "component":
+                return map_lines(field, values, json.dumps)
+            if field == "size":
+                return map_lines(field, values, str, keys=values)
+            return [f"\t{field}: {to_cue_struct(values)}"]
+        return matrix_lines(data["matrix"])
+
+    names = precomputed_names(block)
+    first = True
+    for group, members in FIELD_GROUPS:
+        selected = [f for f in members if f in fields]
+        if not selected:
+            continue
+        if not first:
+            print(file=out)
+        first = False
+        print(f"{names[group]}: {{", file=out)
+        for field in selected:
+            for line in field_lines(group, field):
+                print(line, file=out)
+        print("}", file=out)
+
+
+# ── Package discovery (--discover) ───────────────────────────────────────
+
+GRAPH_INPUT_RE = re.compile(r'#Graph(?:Lite)?\s*&\s*\{\s*Input:\s*(_[A-Za-z0-9_]+)')
+PACKAGE_RE = re.compile(r'(?m)^package\s+([A-Za-z_][A-Za-z0-9_]*)')
+SKIP_DIRS = {"cue.mod", "node_modules", "_public"}
+
+
+def discover_graphs(paths: list[str]) -> dict[str, dict]:
+    """Find every #Graph / #GraphLite Input block under the given paths.
+
+    A path may be a .cue file (its package directory is scanned) or a
+    directory (searched recursively, skipping hidden dirs and cue.mod).
+    Returns {package_dir: {"package": name, "blocks": {block: file}}} for
+    blocks defined as a literal struct somewhere in the same package.
+    """
+    dirs = set()
+    for p in map(Path, paths):
+        if p.is_file():
+            dirs.add(p.parent)
+            continue
+        for f in p.rglob("*.cue"):
+            rel = f.relative_to(p).parts[:-1]
+            if any(part in SKIP_DIRS or part.startswith(".") for part in rel):
+                continue
+            dirs.add(f.parent)
+
+    found = {}
+    for d in sorted(dirs):
+        texts = package_texts(d)
+        wanted = {m for text in texts.values() for m in GRAPH_INPUT_RE.findall(text)}
+        blocks = {}
+        package = None
+        for f, text in texts.items():
+            for block in sorted(wanted - set(blocks)):
+                if re.search(r'(?m)^\s*' + re.escape(block) + r':\s*\{', text):
+                    blocks[block] = str(f)
+                    pkg = PACKAGE_RE.search(text)
+                    package = package or (pkg.group(1) if pkg else None)
+        if blocks and package:
+            found[str(d)] = {"package": package, "blocks": blocks}
+    return found
+
+
+def precompute_package(
+    pkg_dir: str,
+    package: str,
+    blocks: dict[str, str],
+    fields: set[str] | None = None,
+    samples: int | None = None,
+) -> dict:
+    """Precompute every graph block of one package into <pkg_dir>/precomputed.cue.
+
+    Runs in a worker process under --discover. fields=None selects, per
+    block, only the fields the package references (see referenced_fields).
+    Blocks that parse to an empty map (comprehension-built inputs) or that
+    nothing references are skipped, not errors.
+    """
+    texts = list(package_texts(pkg_dir).values()) if fields is None else []
+    out = io.StringIO()
+    out.write(f"package {package}\n")
+    stats = {"dir": pkg_dir, "graphs": {}, "skipped": [], "error": None}
+    try:
+        for block, filepath in sorted(blocks.items()):
+            wanted = referenced_fields(texts, block) if fields is None else fields
+            if not wanted:
+                stats["skipped"].append(f"{block} (unreferenced)")
+                continue
+            resources = parse_cue_block(Path(filepath).read_text(), block)
+            if not resources:
+                stats["skipped"].append(block)
+                continue
+            data = precompute(resources, wanted, samples)
+            out.write("\n")
+            write_cue(out, data, wanted, block)
+            stats["graphs"][block] = (len(data["order"]), sorted(wanted, key=KNOWN_FIELDS.index))
+    except SystemExit as e:
+        # toposort() exits on cycles; report it per package instead
+        stats["error"] = f"exit {e.code}"
+        return stats
+
+    if stats["graphs"]:
+        (Path(pkg_dir) / "precomputed.cue").write_text(out.getvalue())
+    return stats
+
+
+def run_discover(
+    paths: list[str],
+    jobs: int | None,
+    fields: set[str] | None,
+    samples: int | None = None,
+) -> int:
+    """Precompute all discovered graph packages in one process pool."""
+    found = discover_graphs(paths)
+    if not found:
+        print(f"No #Graph/#GraphLite inputs found under {' '.join(paths)}", file=sys.stderr)
+        return 1
+
+    jobs = jobs or min(len(found), os.cpu_count() or 1)
+    args = [(d, info["package"], info["blocks"], fields, samples) for d, info in found.items()]
+    if jobs <= 1:
+        results = [precompute_package(*a) for a in args]
     else:
-        result = {
-            "depth": depth,
-            "ancestors": ancestors,
-            "dependents": dependents,
-            "cpm": cpm,
-        }
-        json.dump(result, sys.stdout, indent=2)
-        print()
-
-    total_ancestors = sum(len(a) for a in ancestors.values())
-    critical = [n for n in order if cpm["latest"][n] - cpm["earliest"][n] == 0]
-    sys.stderr.write(f"Toposort: {len(order)} nodes, {sum(depth.values())} total depth, "
-                     f"{total_ancestors} ancestor entries, "
-                     f"{len(critical)} critical path nodes\n")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(precompute_package, *zip(*args)))
+
+    failed = 0
+    for r in results:
+        if r["error"]:
+            failed += 1
+            sys.stderr.write(f"  FAIL {r['dir']}: {r['error']}\n")
+            continue
+        graphs = ", ".join(
+            f"{b} ({n}: {','.join(f)})" for b, (n, f) in r["graphs"].items()
+        ) or "nothing to write"
+        skipped = f"; skipped {', '.join(r['skipped'])}" if r["skipped"] else ""
+        sys.stderr.write(f"  {r['dir']}/precomputed.cue: {graphs}{skipped}\n")
+    sys.stderr.write(f"Toposort: {len(results) - failed}/{len(results)} packages precomputed "
+                     f"({jobs} worker{'s' if jobs != 1 else ''})\n")
+    return 1 if failed else 0
+
+
+def run_ndjson(source: str, expr: str, fields: set[str], weights: dict | None = None) -> int:
+    """--ndjson: compact ingest, streamed per-node output, one summary line."""
+    unsupported = sorted(fields - set(NDJSON_FIELDS))
+    if unsupported:
+        sys.stderr.write(f"--ndjson supports {','.join(NDJSON_FIELDS)}; not {','.join(unsupported)}\n")
+        return 2
+    if source == "-":
+        graph = CompactGraph.from_ndjson(sys.stdin)
+    elif source.endswith(NDJSON_SUFFIXES):
+        with open(source) as f:
+            graph = CompactGraph.from_ndjson(f, source)
+    else:
+        graph = CompactGraph.from_resources(load_resources(source, expr))
+    if graph.undefined:
+        shown = ", ".join(graph.undefined[:10]) + (" ..." if len(graph.undefined) > 10 else "")
+        sys.stderr.write(f"Undefined dependencies ({len(graph.undefined)}): {shown}\n")
+        return 2
+    try:
+        totals = stream_ndjson(graph, sys.stdout, [f for f in NDJSON_FIELDS if f in fields], weights)
+    except ValueError as e:
+        sys.stderr.write(f"Cycle detected! {e}\n")
+        return 2
+    sys.stderr.write(f"Toposort: {totals['nodes']} nodes, {totals['depth']} total depth "
+                     f"({len(graph.up_idx)} edges, streamed)\n")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("source", nargs="?", help="CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("expr", nargs="?", default="_tasks",
+                        help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--cue", action="store_true", help="Emit CUE instead of JSON")
+    parser.add_argument("--fields", metavar="LIST",
+                        help="Comma-separated fields to compute and emit: "
+                             f"{','.join(KNOWN_FIELDS)}, all, or auto (what the package "
+                             "references). Default: all; auto under --discover")
+    parser.add_argument("--samples", type=int, default=None, metavar="K",
+                        help="Approximate betweenness from K seeded pivot sources (default: exact, O(V*E))")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Also emit sparse (CSR) adjacency + reachability matrices in layer order")
+    parser.add_argument("--matrix-bits", metavar="FILE",
+                        help="Write the reachability matrix as a bit-packed binary sidecar")
+    parser.add_argument("--reduce", action="store_true",
+                        help="Report redundant depends_on edges (transitive reduction) and verify "
+                             "the minimal set keeps depth and ancestors; replaces normal output")
+    parser.add_argument("--write", action="store_true",
+                        help="With --reduce: rewrite the .cue block or .json source with the minimal edge set")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Stream one JSON line per node (depth, CPM, ancestor/dependent counts); "
+                             "with -, stdin is read as NDJSON too")
+    parser.add_argument("--weights", metavar="FILE",
+                        help="JSON {name: duration} for CPM (default: 1 each, or a .snap source's durations)")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="Write a binary, mmap-able graph snapshot (load it back as the source); "
+                             "replaces normal output")
+    parser.add_argument("--snapshot-closure", action="store_true",
+                        help="With --snapshot: also store the ancestor closure bitsets (n^2/8 bytes)")
+    parser.add_argument("--lint", action="store_true",
+                        help="Check keys, depends_on and @type/tags against #SafeID/#SafeLabel and "
+                             "that every dependency exists; exit 1 on any issue before computing")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Write per-phase wall/CPU time and graph stats (- for stderr)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile: also record the tracemalloc peak per phase "
+                             "(slows allocation-heavy phases)")
+    parser.add_argument("--profile-format", choices=("json", "chrome"), default="json",
+                        help="json: phase report; chrome: trace-event JSON for chrome://tracing or Perfetto")
+    parser.add_argument("--cprofile", metavar="DIR",
+                        help="With --profile: also dump a cProfile <phase>.prof per phase into DIR")
+    parser.add_argument("--void", action="store_true",
+                        help="Also emit #VoIDDataset / #DataQualityReport statistics "
+                             "(_precomputed_void, _precomputed_quality) from one pass")
+    parser.add_argument("--jsonld", action="append", default=[], metavar="FILE",
+                        help="With --void: count exact triples in these JSON-LD exports (repeatable)")
+    parser.add_argument("--charter", metavar="FILE",
+                        help="Exported #Charter JSON; also emit #GapAnalysis results (_precomputed_gaps)")
+    parser.add_argument("--discover", nargs="+", metavar="PATH",
+                        help="Precompute every #Graph/#GraphLite input under PATHs; "
+                             "writes precomputed.cue into each package")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Worker processes for --discover (default: one per package, up to CPU count)")
+    if len(sys.argv) < 2:
+        parser.print_help()
+        sys.exit(1)
+    args = parser.parse_args()
+
+    auto = args.fields == "auto" or (args.fields is None and args.discover)
+    fields = None
+    if not auto:
+        try:
+            fields = parse_fields(args.fields) if args.fields else set(ALL_FIELDS)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.matrix:
+            fields.add("matrix")
+
+    if args.profile and (args.discover or args.ndjson):
+        parser.error("--profile covers single-graph runs; not valid with --discover or --ndjson")
+    if args.discover:
+        sys.exit(run_discover(args.discover, args.jobs, fields, args.samples))
+    if args.source is None:
+        parser.error("source is required unless --discover is given")
+
+    if args.ndjson and args.lint:
+        parser.error("--lint needs the whole resource map; not valid with --ndjson")
+    if args.ndjson:
+        rejected = [flag for flag, given in (
+            ("--cue", args.cue), ("--charter", args.charter), ("--void", args.void),
+            ("--jsonld", args.jsonld), ("--matrix-bits", args.matrix_bits), ("--reduce", args.reduce),
+            ("--write", args.write), ("--snapshot", args.snapshot),
+            ("--snapshot-closure", args.snapshot_closure), ("--fields auto", auto),
+        ) if given]
+        if rejected:
+            parser.error(f"--ndjson streams per-node lines only; not valid with {', '.join(rejected)}")
+        weights = None
+        if args.weights:
+            with open(args.weights) as f:
+                weights = json.load(f)
+        sys.exit(run_ndjson(args.source, args.expr, fields or set(ALL_FIELDS), weights))
+
+    if auto:
+        if args.source == "-" or args.source.endswith((".json", SNAPSHOT_SUFFIX)):
+            parser.error("--fields auto needs a .cue file or package dir to scan")
+        pkg_dir = Path(args.source)
+        pkg_dir = pkg_dir.parent if pkg_dir.is_file() else pkg_dir
+        fields = referenced_fields(package_texts(pkg_dir).values())
+        if args.matrix:
+            fields.add("matrix")
+        sys.stderr.write(f"Fields (auto): {','.join(sorted(fields, key=KNOWN_FIELDS.index)) or 'none'}\n")
+
+    if (args.cprofile or args.profile_memory) and not args.profile:
+        parser.error("--cprofile and --profile-memory are only valid with --profile")
+    profiler = Profiler(enabled=bool(args.profile), memory=args.profile_memory, cprofile_dir=args.cprofile)
+    started = time.perf_counter()
+
+    def write_profile(data: dict | None = None) -> None:
+        if not args.profile:
+            return
+        profiler.graph_stats(snap if resources is None else resources, data)
+        profiler.write(args.profile, args.profile_format)
+        slowest = max(profiler.phases, key=lambda p: p["wall_ms"])
+        sys.stderr.write(f"Profile: {len(profiler.phases)} phases, "
+                         f"{profiler.report()['total_wall_ms']:.1f} ms, slowest {slowest['phase']} "
+                         f"({slowest['wall_ms']:.1f} ms){'' if args.profile == '-' else ' -> ' + args.profile}\n")
+
+    weights = None
+    if args.weights:
+        with open(args.weights) as f:
+            weights = json.load(f)
+    snap = None
+    resources = None
+    with profiler.phase("parse"):
+        if args.source.endswith(SNAPSHOT_SUFFIX):
+            try:
+                snap = Snapshot(args.source)
+            except SnapshotError as e:
+                parser.error(str(e))
+            weights = weights or snap.weights()
+        else:
+            resources = load_resources(args.source, args.expr)
+
+    def resource_map() -> dict:
+        """The resource map; from a snapshot, built only when a step needs it."""
+        nonlocal resources
+        if resources is None:
+            with profiler.phase("resources"):
+                resources = snap.resources()
+        return resources
+
+    if args.lint:
+        text = None
+        if args.source != "-" and Path(args.source).is_file() and not args.source.endswith(SNAPSHOT_SUFFIX):
+            text = Path(args.source).read_text()
+        resource_map()
+        with profiler.phase("lint"):
+            issues = lint_resources(resources, text)
+        for issue in issues:
+            sys.stderr.write(format_issue(args.source, issue) + "\n")
+        if issues:
+            sys.stderr.write(f"Lint: {len(issues)} issues in {len(resources)} resources\n")
+            sys.exit(1)
+
+    if args.snapshot:
+        resource_map()
+        with profiler.phase("snapshot"):
+            stats = write_snapshot(args.snapshot, resources, args.source, weights, args.snapshot_closure)
+        sys.stderr.write(f"Snapshot: {stats['nodes']} nodes, {stats['edges']} edges, "
+                         f"{stats['types']} types, {stats['bytes']} bytes"
+                         f"{' with closure' if args.snapshot_closure else ''} -> {args.snapshot}\n")
+        write_profile()
+        sys.exit(0)
+    if args.snapshot_closure:
+        parser.error("--snapshot-closure is only valid with --snapshot")
+    if args.reduce:
+        if args.write and (args.source == "-" or not args.source.endswith((".cue", ".json"))):
+            parser.error("--write needs a .cue or .json source file")
+        resource_map()
+        with profiler.phase("reduce"):
+            rc = run_reduce(args.source, resources, args.expr, args.write)
+        write_profile()
+        sys.exit(rc)
+    if args.write:
+        parser.error("--write is only valid with --reduce")
+
+    # The sidecar needs the matrix computed even when it isn't emitted
+    data = precompute(resources, fields | {"matrix"} if args.matrix_bits else fields, args.samples, weights,
+                      profiler, snap)
+    if args.matrix_bits:
+        with profiler.phase("matrix_bits"):
+            write_matrix_bits(args.matrix_bits, data["matrix_bits"])
+
+    gaps = None
+    if args.charter:
+        with open(args.charter) as f, profiler.phase("gaps"):
+            gaps = compute_gaps(resource_map(), data["depth"], json.load(f))
+
+    dataset = None
+    if args.void:
+        with profiler.phase("void"):
+            dataset = compute_dataset_stats(resource_map(), data["depth"])
+            if args.jsonld:
+                dataset["void"]["exact_triples"] = count_jsonld_triples(args.jsonld)
+    elif args.jsonld:
+        parser.error("--jsonld is only valid with --void")
+
+    with profiler.phase("emit"):
+        if args.cue:
+            print("package main\n")
+            write_cue(sys.stdout, data, fields)
+            if gaps is not None:
+                print()
+                write_gaps_cue(sys.stdout, gaps)
+            if dataset is not None:
+                print()
+                write_dataset_cue(sys.stdout, dataset)
+        else:
+            result = {f: data[f] for f in TOPO_FIELDS if f in fields}
+            for group, members in FIELD_GROUPS[1:-1]:
+                values = {f: data[group][f] for f in members if f in fields}
+                if values:
+                    result[group] = values
+            if "matrix" in fields:
+                result["matrix"] = data["matrix"]
+            if gaps is not None:
+                result["gaps"] = gaps
+            if dataset is not None:
+                result.update(dataset)
+            json.dump(result, sys.stdout, indent=2)
+            print()
+        sys.stdout.flush()
+    if snap is not None:
+        snap.close()
+
+    order, depth = data["order"], data["depth"]
+    summary = f"Toposort: {len(order)} nodes, {sum(depth.values())} total depth"
+    if "ancestors" in data:
+        summary += f", {sum(len(a) for a in data['ancestors'].values())} ancestor entries"
+    if "cpm" in data:
+        cpm = data["cpm"]
+        critical = [n for n in order if cpm["latest"][n] - cpm["earliest"][n] == 0]
+        summary += f", {len(critical)} critical path nodes"
+    if "risk" in data and data["risk"]["risk_score"]:
+        top = data["risk"]["risk_score"][0]
+        summary += f", top risk {top['name']} ({top['score']})"
+    if "components" in data:
+        comps = data["components"]
+        summary += f", {len(comps['size'])} components ({len(comps['orphans'])} orphans)"
+    if gaps is not None:
+        open_gates = sum(not gs["satisfied"] for gs in gaps["gate_status"].values())
+        summary += (f", {len(gaps['missing_resources'])} missing resources, "
+                    f"{open_gates}/{len(gaps['gate_status'])} gates open")
+    if dataset is not None:
+        v = dataset["void"]
+        summary += f", {v['classes']} classes, {v.get('exact_triples', v['triples'])} triples"
+        summary += " (exact)" if "exact_triples" in v else " (estimated)"
+    sys.stderr.write(summary + "\n")
+    domain = domain_of(args.source)
+    record("project", domain, domain, started, input_size=len(order),
+           output_size=len(order), description="toposort " + ",".join(sorted(fields)))
+
+    write_profile(data)
 
 
 if __name__ == "__main__":
@@ -18,9 +18,12 @@ import argparse
 import json
 import subprocess
 import sys
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from eventlog import domain_of, record
+
 
 # ── Test definitions ──────────────────────────────────────────────────────
 
@@ -354,6 +357,7 @@ class Result:
 
 def validate_directory(directory: str, projections: list[Projection]) -> list[Result]:
     """Validate all projections against a CUE directory."""
+    started = time.perf_counter()
     results = []
     for proj in projections:
         data = cue_export(directory, proj.expression)
@@ -367,6 +371,14 @@ def validate_directory(directory: str, projections: list[Projection]) -> list[Re
         if is_warn:
             detail = f"{detail} [known: {proj.known_issue}]"
         results.append(Result(proj.name, directory, passed, detail, warn=is_warn))
+
+    checked = [r for r in results if "skipped" not in r.detail]
+    failed = [r for r in checked if not r.passed and not r.warn]
+    domain = domain_of(directory)
+    record("validate", domain, domain, started,
+           outcome="conflict" if failed else "success",
+           input_size=len(checked), output_size=len(failed),
+           description=f"W3C round-trip: {len(checked) - len(failed)}/{len(checked)} projections conform")
     return results
 
 
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Level-of-detail visualization export for large graphs.
+
+#VizData produces one flat node/edge payload that the explorer loads whole.
+Past a few thousand nodes that stalls the browser. This exporter builds on
+toposort.py and splits the same data into levels:
+
+  level 0  summary-layers.json   one node per topology layer
+  level 1  summary-types.json    one node per (layer, primary @type)
+  level 2  chunks/chunk-NNNN.json  full #VizNode/#VizEdge payloads, grouped
+                                   by connected component and layer band
+
+index.json ties the levels together: every summary node lists the chunks
+that hold its members, so a client fetches detail only where it zooms in.
+Node positions are precomputed from depth (y) and in-layer order (x) —
+the client draws, it does not lay out.
+
+Output shapes match #VizLODIndex, #VizLODSummary and #VizLODChunk in
+vocab/viz-contract.cue.
+
+Usage:
+    python3 tools/viz_lod.py ./self-charter/charter.cue site/data/lod/
+    python3 tools/viz_lod.py graph.json out/ --chunk-size 1000
+    cat graph.json | python3 tools/viz_lod.py - out/
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from toposort import (
+    compute_ancestors,
+    compute_components,
+    compute_dependents,
+    load_resources,
+    toposort,
+)
+
+LOD_VERSION = 1
+
+
+def primary_type(resource: dict) -> str:
+    """First @type label in sorted order — the bucket used for aggregation."""
+    types = resource.get("@type") or {}
+    return min(types) if types else "Resource"
+
+
+def weak_components(resources: dict) -> dict[str, int]:
+    """Label weakly connected components (edge direction ignored).
+
+    Component ids are dense and ordered by size (largest first), ties
+    broken by the lexicographically first member, so ids are stable
+    across runs on the same graph.
+    """
+    comps = compute_components(resources)
+    ranked = sorted(comps["size"], key=lambda label: (-comps["size"][label], label))
+    cid = {label: i for i, label in enumerate(ranked)}
+    return {name: cid[label] for name, label in comps["component"].items()}
+
+
+def layout_positions(
+    order: list[str],
+    depth: dict[str, int],
+    component: dict[str, int],
+    dx: float,
+    dy: float,
+) -> dict[str, tuple[float, float]]:
+    """Assign (x, y) per node: components side by side, layers top-down.
+
+    Each component gets a horizontal band as wide as its widest layer, so
+    chunk bounding boxes never overlap between components.
+    """
+    rows = defaultdict(lambda: defaultdict(list))
+    for name in order:
+        rows[component[name]][depth[name]].append(name)
+
+    pos = {}
+    offset = 0.0
+    for cid in sorted(rows):
+        layers = rows[cid]
+        width = max(len(members) for members in layers.values())
+        for d, members in layers.items():
+            # Center narrower layers inside the component band
+            pad = (width - len(members)) * dx / 2
+            for i, name in enumerate(sorted(members)):
+                pos[name] = (offset + pad + i * dx, d * dy)
+        offset += (width + 1) * dx
+    return pos
+
+
+def build_chunks(
+    order: list[str],
+    depth: dict[str, int],
+    component: dict[str, int],
+    chunk_size: int,
+) -> list[list[str]]:
+    """Group nodes into chunks of at most chunk_size.
+
+    Components larger than chunk_size are split into consecutive layer
+    bands (a single over-wide layer is sliced). Smaller components are
+    packed together so orphans don't become thousands of tiny files.
+    """
+    comps = defaultdict(list)
+    for name in order:
+        comps[component[name]].append(name)
+
+    chunks = []
+    packed: list[str] = []
+    for cid in sorted(comps):
+        members = comps[cid]
+        if len(members) <= chunk_size:
+            if packed and len(packed) + len(members) > chunk_size:
+                chunks.append(packed)
+                packed = []
+            packed.extend(members)
+            continue
+
+        by_layer = defaultdict(list)
+        for name in members:
+            by_layer[depth[name]].append(name)
+        band: list[str] = []
+        for d in sorted(by_layer):
+            layer = by_layer[d]
+            if band and len(band) + len(layer) > chunk_size:
+                chunks.append(band)
+                band = []
+            while len(layer) > chunk_size:
+                chunks.append(layer[:chunk_size])
+                layer = layer[chunk_size:]
+            band.extend(layer)
+        if band:
+            chunks.append(band)
+
+    if packed:
+        chunks.append(packed)
+    return chunks
+
+
+def summarize(
+    resources: dict,
+    chunk_of: dict[str, int],
+    pos: dict[str, tuple[float, float]],
+    dy: float,
+    key,
+) -> dict:
+    """Aggregate nodes and edges into summary buckets chosen by key(name).
+
+    Summary nodes carry member counts, a type histogram, the mean member
+    position and the chunk ids needed to expand them. Edges between
+    buckets are merged with a weight.
+    """
+    buckets: dict[str, dict] = {}
+    for name, r in resources.items():
+        bid, layer = key(name)
+        b = buckets.get(bid)
+        if b is None:
+            b = buckets[bid] = {
+                "id": bid, "layer": layer, "count": 0, "types": defaultdict(int),
+                "_x": 0.0, "chunks": set(),
+            }
+        b["count"] += 1
+        b["types"][primary_type(r)] += 1
+        b["_x"] += pos[name][0]
+        b["chunks"].add(chunk_of[name])
+
+    weights: dict[tuple[str, str], int] = defaultdict(int)
+    for name, r in resources.items():
+        target = key(name)[0]
+        for dep in r.get("depends_on") or {}:
+            source = key(dep)[0]
+            if source != target:
+                weights[(source, target)] += 1
+
+    nodes = []
+    for b in sorted(buckets.values(), key=lambda b: (b["layer"], b["id"])):
+        nodes.append({
+            "id": b["id"],
+            "layer": b["layer"],
+            "count": b["count"],
+            "types": dict(sorted(b["types"].items())),
+            "x": round(b["_x"] / b["count"], 2),
+            "y": b["layer"] * dy,
+            "chunks": sorted(b["chunks"]),
+        })
+    edges = [
+        {"source": s, "target": t, "weight": w}
+        for (s, t), w in sorted(weights.items())
+    ]
+    return {"nodes": nodes, "edges": edges}
+
+
+def export_lod(
+    resources: dict,
+    chunk_size: int = 500,
+    dx: float = 40.0,
+    dy: float = 120.0,
+) -> tuple[dict, dict, dict, list[dict]]:
+    """Compute all LOD payloads. Returns (index, layers, types, chunks)."""
+    order, depth = toposort(resources)
+    ancestors = compute_ancestors(resources, order)
+    dependents = compute_dependents(ancestors)
+    component = weak_components(resources)
+    pos = layout_positions(order, depth, component, dx, dy)
+    groups = build_chunks(order, depth, component, chunk_size)
+
+    chunk_of = {name: cid for cid, members in enumerate(groups) for name in members}
+    has_dependents = {dep for r in resources.values() for dep in (r.get("depends_on") or {})}
+
+    chunks = []
+    table = []
+    for cid, members in enumerate(groups):
+        nodes = []
+        edges = []
+        for name in members:
+            r = resources[name]
+            n_deps = len(dependents[name])
+            node = {
+                "id": name,
+                "name": name,
+                "types": sorted(r.get("@type") or {}),
+                "depth": depth[name],
+                "ancestors": sorted(ancestors[name]),
+                "dependents": n_deps,
+                "risk_score": n_deps * (n_deps + 1),
+                "component": component[name],
+                "x": pos[name][0],
+                "y": pos[name][1],
+            }
+            if isinstance(r.get("description"), str):
+                node["description"] = r["description"]
+            nodes.append(node)
+            # Each edge lives in its target's chunk; source_chunk tells the
+            # client where the other endpoint is when it isn't loaded yet.
+            for dep in sorted(r.get("depends_on") or {}):
+                edge = {"source": dep, "target": name}
+                if chunk_of[dep] != cid:
+                    edge["source_chunk"] = chunk_of[dep]
+                edges.append(edge)
+
+        xs = [n["x"] for n in nodes]
+        ys = [n["y"] for n in nodes]
+        layers = [n["depth"] for n in nodes]
+        file = f"chunks/chunk-{cid:04d}.json"
+        chunks.append({"chunk": cid, "nodes": nodes, "edges": edges})
+        table.append({
+            "chunk": cid,
+            "file": file,
+            "components": sorted({n["component"] for n in nodes}),
+            "layers": [min(layers), max(layers)],
+            "nodes": len(nodes),
+            "edges": len(edges),
+            "bbox": [min(xs), min(ys), max(xs), max(ys)],
+        })
+
+    layer_summary = summarize(
+        resources, chunk_of, pos, dy,
+        lambda n: (f"layer_{depth[n]}", depth[n]),
+    )
+    type_summary = summarize(
+        resources, chunk_of, pos, dy,
+        lambda n: (f"layer_{depth[n]}.{primary_type(resources[n])}", depth[n]),
+    )
+
+    xs = [p[0] for p in pos.values()] or [0.0]
+    ys = [p[1] for p in pos.values()] or [0.0]
+    index = {
+        "version": LOD_VERSION,
+        "levels": [
+            {"level": 0, "name": "layers", "file": "summary-layers.json"},
+            {"level": 1, "name": "types", "file": "summary-types.json"},
+            {"level": 2, "name": "detail", "file": "chunks/"},
+        ],
+        "chunks": table,
+        "layout": {
+            "dx": dx,
+            "dy": dy,
+            "bbox": [min(xs), min(ys), max(xs), max(ys)],
+        },
+        "metrics": {
+            "total": len(resources),
+            "maxDepth": max(depth.values(), default=0),
+            "edges": sum(len(r.get("depends_on") or {}) for r in resources.values()),
+            "roots": sum(1 for d in depth.values() if d == 0),
+            "leaves": sum(1 for n in resources if n not in has_dependents),
+            "components": len(set(component.values())),
+            "chunks": len(chunks),
+        },
+    }
+    return index, layer_summary, type_summary, chunks
+
+
+def write_lod(outdir: Path, index: dict, layers: dict, types: dict, chunks: list[dict]) -> None:
+    """Write the LOD tree. Chunks are compact JSON — they are the bulk."""
+    (outdir / "chunks").mkdir(parents=True, exist_ok=True)
+    (outdir / "index.json").write_text(json.dumps(index, indent=2) + "\n")
+    (outdir / "summary-layers.json").write_text(json.dumps(layers, indent=2) + "\n")
+    (outdir / "summary-types.json").write_text(json.dumps(types, indent=2) + "\n")
+    for entry, chunk in zip(index["chunks"], chunks):
+        with open(outdir / entry["file"], "w") as f:
+            json.dump(chunk, f, separators=(",", ":"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Export chunked level-of-detail visualization data"
+    )
+    parser.add_argument("source", help="CUE file, JSON file, package dir, or - for stdin")
+    parser.add_argument("outdir", help="Directory to write index.json, summaries and chunks/")
+    parser.add_argument("--expr", default="_tasks", help="CUE expression for package dirs (default: _tasks)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Max nodes per detail chunk (default: 500)")
+    parser.add_argument("--dx", type=float, default=40.0, help="Horizontal node spacing")
+    parser.add_argument("--dy", type=float, default=120.0, help="Vertical layer spacing")
+    args = parser.parse_args()
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    resources = load_resources(args.source, args.expr)
+    index, layers, types, chunks = export_lod(resources, args.chunk_size, args.dx, args.dy)
+    write_lod(Path(args.outdir), index, layers, types, chunks)
+
+    m = index["metrics"]
+    sys.stderr.write(f"VizLOD: {m['total']} nodes, {m['components']} components, "
+                     f"{len(layers['nodes'])} layers, {len(types['nodes'])} type buckets, "
+                     f"{m['chunks']} chunks → {args.outdir}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -49,4 +49,9 @@ package vocab
 
 	// Optional description of what happened
 	description?: string
+
+	// Optional timing and size metrics (tools/eventlog.py records these)
+	duration_ms?: number & >=0
+	input_size?:  int & >=0
+	output_size?: int & >=0
 }
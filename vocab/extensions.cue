@@ -132,6 +132,24 @@ _extension_terms: [...#ExtensionTerm] & [
 		"rdfs:range":   {"@id": "xsd:string"}
 		"rdfs:isDefinedBy": {"@id": "apercue:pattern/ContextEventLog"}
 	},
+	{
+		"@id":          "apercue:inputSize"
+		"@type":        "owl:DatatypeProperty"
+		"rdfs:label":   "input size"
+		"rdfs:comment": "Size of what the operation consumed, in the operation's own unit (resources, domains or bytes). No W3C property records an activity's input volume."
+		"rdfs:domain":  {"@id": "apercue:ContextEvent"}
+		"rdfs:range":   {"@id": "xsd:nonNegativeInteger"}
+		"rdfs:isDefinedBy": {"@id": "apercue:pattern/ContextEventLog"}
+	},
+	{
+		"@id":          "apercue:outputSize"
+		"@type":        "owl:DatatypeProperty"
+		"rdfs:label":   "output size"
+		"rdfs:comment": "Size of what the operation produced, in the operation's own unit (resources, entries or bytes)."
+		"rdfs:domain":  {"@id": "apercue:ContextEvent"}
+		"rdfs:range":   {"@id": "xsd:nonNegativeInteger"}
+		"rdfs:isDefinedBy": {"@id": "apercue:pattern/ContextEventLog"}
+	},
 
 	// ── Form Projection (patterns/form.cue) ─────────────────────────
 
@@ -40,3 +40,81 @@ package vocab
 		leaves:   int
 	}
 }
+
+// ── Level-of-detail payloads (tools/viz_lod.py) ─────────────────────────
+// Large graphs are split into summary levels plus detail chunks so the
+// client loads only what is on screen. Positions are precomputed.
+
+// #VizLODNode — #VizNode with precomputed layout and chunk routing.
+#VizLODNode: {
+	#VizNode
+	risk_score: int
+	component:  int // Weakly connected component id (0 = largest)
+	x:          number
+	y:          number
+}
+
+// #VizLODEdge — Edge stored in its target's chunk.
+// source_chunk is set when the source node lives in another chunk.
+#VizLODEdge: {
+	#VizEdge
+	source_chunk?: int
+}
+
+// #VizLODChunk — One detail chunk (chunks/chunk-NNNN.json).
+#VizLODChunk: {
+	chunk: int
+	nodes: [...#VizLODNode]
+	edges: [...#VizLODEdge]
+}
+
+// #VizLODSummary — Aggregated level (per layer, or per layer and @type).
+#VizLODSummary: {
+	nodes: [...{
+		id:    #SafeID // "layer_N" or "layer_N.Type"
+		layer: int
+		count: int
+		types: [#SafeLabel]: int
+		x: number
+		y: number
+		chunks: [...int] // Detail chunks holding this bucket's members
+	}]
+	edges: [...{
+		source: #SafeID
+		target: #SafeID
+		weight: int
+	}]
+}
+
+// #VizLODIndex — Entry point (index.json).
+#VizLODIndex: {
+	version: int
+	levels: [...{
+		level: int
+		name:  string
+		file:  string
+	}]
+	chunks: [...{
+		chunk: int
+		file:  string
+		components: [...int]
+		layers: [int, int]
+		nodes: int
+		edges: int
+		bbox: [number, number, number, number]
+	}]
+	layout: {
+		dx: number
+		dy: number
+		bbox: [number, number, number, number]
+	}
+	metrics: {
+		total:      int
+		maxDepth:   int
+		edges:      int
+		roots:      int
+		leaves:     int
+		components: int
+		chunks:     int
+	}
+}